@@ -0,0 +1,237 @@
+"""Offline benchmarks for the pull pipeline, on synthetic registry pages.
+
+    uv run python benchmarks/bench_pipeline.py --out bench.json
+    uv run python benchmarks/bench_pipeline.py --compare bench.json
+
+Results are written as JSON (one entry per case: median/min seconds, item count and
+throughput) together with the git commit, so runs on two commits can be compared
+with `--compare`, which exits non-zero when a case slowed down past `--threshold`.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import UTC, date, datetime, timedelta
+
+from invest_registry.clients.france import (
+    PER_PAGE_MAX,
+    FranceSearchParams,
+    collect_companies,
+    normalize_france_result,
+)
+from invest_registry.models import CompanyRecord, FranceSearchResponse
+from invest_registry.pagination import paginate
+from invest_registry.results import ResultView
+from invest_registry.scoring import ScoringFeatures, ScoringWeights, score_features, top_k
+from invest_registry.storage import load_cached_records, save_cached_records
+from invest_registry.synthetic import CREATION_SPAN_YEARS, synthetic_page, synthetic_results
+
+TODAY = date(2025, 1, 1)  # fixed, so corpora (and selectivities) are identical across runs
+SIZES = (1_000, 10_000, 100_000)
+QUICK_SIZES = (1_000, 10_000)
+SELECTIVITIES = (1.0, 0.5, 0.1, 0.01)
+COLLECT_CORPUS = 10_000
+
+
+class _PagedClient:
+    """Serves pre-serialized synthetic pages; decoding stays in the measured path."""
+
+    def __init__(self, results: list[dict]) -> None:
+        total_pages = (len(results) + PER_PAGE_MAX - 1) // PER_PAGE_MAX
+        self._pages = {
+            p: json.dumps(synthetic_page(results, page=p)) for p in range(1, total_pages + 1)
+        }
+
+    def search(self, *, search: FranceSearchParams, page: int = 1, per_page: int = PER_PAGE_MAX):
+        return FranceSearchResponse.model_validate_json(self._pages[page])
+
+
+def _measure(fn: Callable[[], object], *, repeat: int) -> dict:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {"median_s": statistics.median(times), "min_s": min(times), "repeat": repeat}
+
+
+def _case(results: dict, name: str, fn: Callable[[], object], *, items: int, repeat: int) -> None:
+    r = _measure(fn, repeat=repeat)
+    r["items"] = items
+    r["items_per_s"] = items / r["median_s"] if r["median_s"] else None
+    results[name] = r
+    print(f"{name:<40} {r['median_s'] * 1000:10.2f} ms  {r['items_per_s'] or 0:14,.0f} items/s")
+
+
+def bench_collect(results: dict, *, repeat: int) -> None:
+    corpus = synthetic_results(COLLECT_CORPUS, today=TODAY)
+    client = _PagedClient(corpus)
+    search = FranceSearchParams(q="")
+    for sel in SELECTIVITIES:
+        cutoff = TODAY - timedelta(days=int(sel * CREATION_SPAN_YEARS * 365))
+
+        def run(cutoff=cutoff) -> None:
+            collect_companies(
+                client,  # type: ignore[arg-type]
+                searches=[search],
+                target_count=COLLECT_CORPUS,
+                max_pages_per_search=None,
+                min_creation_date=cutoff,
+            )
+
+        # Throughput in raw API results scanned per second.
+        _case(results, f"collect[selectivity={sel}]", run, items=COLLECT_CORPUS, repeat=repeat)
+
+
+def bench_decode(results: dict, *, repeat: int) -> None:
+    corpus = synthetic_results(1_000, today=TODAY)
+    payload = json.dumps(synthetic_page(corpus, page=1, per_page=len(corpus)))
+    decoded = FranceSearchResponse.model_validate_json(payload).results
+    _case(
+        results,
+        "decode[1k]",
+        lambda: FranceSearchResponse.model_validate_json(payload),
+        items=1_000,
+        repeat=repeat,
+    )
+    _case(
+        results,
+        "normalize[1k]",
+        lambda: [normalize_france_result(r) for r in decoded],
+        items=1_000,
+        repeat=repeat,
+    )
+
+
+def _bench_size(results: dict, records: list[CompanyRecord], *, repeat: int) -> None:
+    n = len(records)
+    key = f"bench-{n}"
+    _case(
+        results,
+        f"cache_save[{n}]",
+        lambda: save_cached_records(key, records),
+        items=n,
+        repeat=repeat,
+    )
+    _case(results, f"cache_load[{n}]", lambda: load_cached_records(key), items=n, repeat=repeat)
+
+    def paginate_sorted() -> None:
+        ordered = sorted(records, key=lambda r: r.creation_date or date.min)
+        paginate(ordered, page=2, page_size=25)
+
+    _case(results, f"paginate_sort[{n}]", paginate_sorted, items=n, repeat=repeat)
+
+    def view_page() -> None:
+        view = ResultView(records)
+        view.page(view.cursor(page=2, page_size=25), sort="newest")
+
+    _case(results, f"view_sort_page[{n}]", view_page, items=n, repeat=repeat)
+
+    _case(
+        results,
+        f"score_extract[{n}]",
+        lambda: ScoringFeatures.from_records(records, today=TODAY),
+        items=n,
+        repeat=repeat,
+    )
+    features = ScoringFeatures.from_records(records, today=TODAY)
+    weights = ScoringWeights(naf_weights={"62.01Z": 1.0})
+    _case(
+        results,
+        f"score_rank[{n}]",
+        lambda: top_k(score_features(features, weights), 100),
+        items=n,
+        repeat=repeat,
+    )
+
+
+def bench_sizes(results: dict, *, sizes: tuple[int, ...], repeat: int) -> None:
+    biggest = synthetic_results(max(sizes), today=TODAY)
+    all_records = [
+        normalize_france_result(r)
+        for r in FranceSearchResponse.model_validate(
+            synthetic_page(biggest, page=1, per_page=len(biggest))
+        ).results
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)  # the disk cache lives in ./.cache
+        try:
+            for n in sizes:
+                _bench_size(results, all_records[:n], repeat=repeat)
+        finally:
+            os.chdir(cwd)
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def compare(old: dict, new: dict, *, threshold: float) -> list[str]:
+    """Names of cases whose median got slower than `threshold` x the old median."""
+    regressions = []
+    print(f"\n{'case':<40} {'old ms':>10} {'new ms':>10} {'ratio':>7}")
+    for name, r in new["results"].items():
+        before = old["results"].get(name)
+        if before is None:
+            continue
+        ratio = r["median_s"] / before["median_s"] if before["median_s"] else float("inf")
+        flag = "  <-- slower" if ratio > threshold else ""
+        print(
+            f"{name:<40} {before['median_s'] * 1000:10.2f} {r['median_s'] * 1000:10.2f}"
+            f" {ratio:7.2f}{flag}"
+        )
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the pull pipeline offline.")
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help=f"sizes {QUICK_SIZES} only")
+    args = parser.parse_args(argv)
+
+    results: dict = {}
+    bench_collect(results, repeat=args.repeat)
+    bench_decode(results, repeat=args.repeat)
+    bench_sizes(results, sizes=QUICK_SIZES if args.quick else SIZES, repeat=args.repeat)
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "created_at": datetime.now(UTC).isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(baseline, report, threshold=args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
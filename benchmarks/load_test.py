@@ -0,0 +1,421 @@
+"""Multi-user load test of the Streamlit fetch path, against the mock registry API.
+
+    uv run python benchmarks/load_test.py --users 20 --actions 5 --out load.json
+
+Each simulated analyst drives the real pages through Streamlit's AppTest, one
+script run per action: Search pulls (blocking fetch: `fetch_records`,
+`st.cache_data`) and Deep Dive lookups, in a seeded mix. A Streamlit server is a
+process: its analysts are sessions on their own threads, sharing the server's
+`st.cache_data`, detail cache and working directory (`.cache/`), as they would
+behind one `streamlit run`. `--replicas N` spreads the analysts over N such
+servers; they share one backend (`invest_registry.backend`) that this harness
+serves next to the mock API, unless `--no-backend` makes them stand-alone.
+`--burst` makes every analyst fire their first action at the same moment
+("everyone hits refresh").
+
+Reported: p50/p95/p99 latency per action kind, upstream request amplification
+(requests during the load / requests to serve each distinct action once, measured
+by a cold sequential pass first), stampedes (a pull or detail fetch started in a
+server or the backend while an identical one was already in flight there) and
+peak RSS of the harness (mock API and backend) and of the largest server.
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Self
+
+from streamlit.testing.v1 import AppTest
+
+from invest_registry import details, pulls
+from invest_registry.backend import BackendServer, BackendService
+from invest_registry.mock_api import Faults, MockRegistry, MockRegistryServer, lognormal_latency
+from invest_registry.settings import get_settings
+
+ROOT = Path(__file__).resolve().parents[1]
+SEARCH_PAGE = str(ROOT / "pages" / "1_Search.py")
+DEEP_DIVE_PAGE = str(ROOT / "pages" / "2_Company_Deep_Dive.py")
+
+# (paris_only, target_count) variants analysts pull; each is its own cache key.
+SEARCH_VARIANTS = ((False, 50), (True, 50), (False, 100))
+HOT_COMPANIES = 200  # deep dives are drawn from the first N companies, Zipf-weighted
+
+
+@dataclass(frozen=True)
+class Action:
+    kind: str  # "search" | "deep_dive"
+    key: tuple
+
+
+class InflightTracker:
+    """Wraps a module function to count calls and overlapping calls with the same key."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._inflight: Counter[tuple] = Counter()
+        self.calls: Counter[str] = Counter()
+        self.stampedes: Counter[str] = Counter()
+
+    def wrap(self, module, name: str, key: Callable[..., tuple]) -> Callable[[], None]:
+        original = getattr(module, name)
+
+        def wrapper(*args, **kwargs):
+            k = (name, key(*args, **kwargs))
+            with self._lock:
+                self.calls[name] += 1
+                if self._inflight[k]:
+                    self.stampedes[name] += 1
+                self._inflight[k] += 1
+            try:
+                return original(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._inflight[k] -= 1
+
+        setattr(module, name, wrapper)
+        return lambda: setattr(module, name, original)
+
+    def track_fetches(self) -> list[Callable[[], None]]:
+        """Track record pulls and detail fetches; returns the undo callables."""
+        return [
+            self.wrap(pulls, "collect_companies", lambda *a, **kw: _pull_key(kw)),
+            self.wrap(details, "fetch_details_by_siren", lambda client, siren, **kw: (siren,)),
+        ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.calls.clear()
+            self.stampedes.clear()
+
+
+class RssSampler:
+    def __init__(self, interval: float = 0.05) -> None:
+        self.peak_kb = 0
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._work, daemon=True)
+
+    @staticmethod
+    def current_kb() -> int:
+        try:
+            with open("/proc/self/status", encoding="ascii") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1])
+        except OSError:
+            pass
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KB on Linux
+
+    def _work(self) -> None:
+        while not self._stop.wait(self._interval):
+            self.peak_kb = max(self.peak_kb, self.current_kb())
+
+    def __enter__(self) -> Self:
+        self.peak_kb = self.current_kb()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def plan_actions(rng: random.Random, n: int, *, search_share: float) -> list[Action]:
+    weights = [1 / (rank + 1) for rank in range(HOT_COMPANIES)]
+    out = []
+    for _ in range(n):
+        if rng.random() < search_share:
+            out.append(Action("search", rng.choice(SEARCH_VARIANTS)))
+        else:
+            rank = rng.choices(range(HOT_COMPANIES), weights=weights)[0]
+            out.append(Action("deep_dive", (f"{rank:09d}",)))
+    return out
+
+
+def run_action(action: Action) -> float:
+    """Run one action on a fresh session; returns the measured seconds."""
+    if action.kind == "search":
+        paris_only, target = action.key
+        at = AppTest.from_file(SEARCH_PAGE, default_timeout=120).run()
+        for t in at.toggle:
+            if t.label == "Progressive results":
+                t.set_value(False)
+            elif t.label.startswith("Paris-only"):
+                t.set_value(paris_only)
+        at.slider[0].set_value(target)
+        next(b for b in at.button if b.label == "Fetch / Refresh").click()
+        start = time.perf_counter()
+        at.run()
+        elapsed = time.perf_counter() - start
+    else:
+        at = AppTest.from_file(DEEP_DIVE_PAGE, default_timeout=120)
+        at.query_params["siren"] = action.key[0]
+        start = time.perf_counter()
+        at.run()
+        elapsed = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return elapsed
+
+
+def _server(
+    plans: list[list[Action]],
+    env: dict[str, str],
+    cwd: str,
+    results: "multiprocessing.Queue",
+    barrier: "threading.Barrier | None",
+) -> None:
+    """One Streamlit server, in its own process: a session thread per analyst.
+
+    Puts ([(kind, seconds, error) per action], calls, stampedes) on `results`.
+    """
+    os.environ.update(env)  # read by the settings on first use, in this process
+    os.chdir(cwd)
+    # AppTest is built on the session threads, outside a script run.
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").setLevel(
+        logging.ERROR
+    )
+    tracker = InflightTracker()
+    tracker.track_fetches()
+    out: list[tuple[str, float | None, str | None]] = []
+    out_lock = threading.Lock()
+
+    def _session(plan: list[Action]) -> None:
+        for i, a in enumerate(plan):
+            if barrier is not None and i == 0:
+                barrier.wait()
+            try:
+                item = (a.kind, run_action(a), None)
+            except Exception as e:  # noqa: BLE001 - reported; the analyst carries on
+                item = (a.kind, None, f"{a.kind} {a.key}: {e}")
+            with out_lock:
+                out.append(item)
+
+    sessions = [threading.Thread(target=_session, args=(plan,)) for plan in plans]
+    for t in sessions:
+        t.start()
+    for t in sessions:
+        t.join()
+    results.put((out, dict(tracker.calls), dict(tracker.stampedes)))
+
+
+def _run_servers(
+    ctx,
+    plans: list[list[Action]],
+    *,
+    replicas: int,
+    env: dict[str, str],
+    cwd: str,
+    burst: bool,
+) -> tuple[list[tuple[str, float | None, str | None]], Counter[str], Counter[str]]:
+    """Run the analysts' plans on `replicas` servers; their results, calls and stampedes."""
+    results = ctx.Queue()
+    barrier = ctx.Barrier(len(plans)) if burst else None
+    shards = [plans[r::replicas] for r in range(min(replicas, len(plans)))]
+    procs = [
+        ctx.Process(target=_server, args=(shard, env, cwd, results, barrier), daemon=True)
+        for shard in shards
+    ]
+    for p in procs:
+        p.start()
+    out: list[tuple[str, float | None, str | None]] = []
+    calls: Counter[str] = Counter()
+    stampedes: Counter[str] = Counter()
+    for _ in procs:
+        server_out, server_calls, server_stampedes = results.get()
+        out.extend(server_out)
+        calls.update(server_calls)
+        stampedes.update(server_stampedes)
+    for p in procs:
+        p.join()
+    return out, calls, stampedes
+
+
+def _percentiles(values: list[float]) -> dict:
+    if not values:
+        return {}
+    if len(values) == 1:
+        return {"p50": values[0], "p95": values[0], "p99": values[0], "count": 1}
+    q = statistics.quantiles(values, n=100, method="inclusive")
+    return {"p50": q[49], "p95": q[94], "p99": q[98], "count": len(values)}
+
+
+def run_load(
+    *,
+    users: int,
+    actions_per_user: int,
+    search_share: float,
+    corpus_size: int,
+    latency_ms: float,
+    client_rate: float,
+    seed: int,
+    burst: bool,
+    replicas: int = 1,
+    backend: bool = True,
+) -> dict:
+    """Run the load; `backend` only applies to several replicas."""
+    backend = backend and replicas > 1
+    faults = Faults(latency=lognormal_latency(latency_ms / 1000) if latency_ms else None)
+    registry = MockRegistry.synthetic(corpus_size, seed=seed, faults=faults)
+    plans = [
+        plan_actions(random.Random(seed + u), actions_per_user, search_share=search_share)
+        for u in range(users)
+    ]
+    distinct = sorted({a for plan in plans for a in plan}, key=repr)
+    ctx = multiprocessing.get_context("spawn")
+
+    app_settings = get_settings()
+    tracker = InflightTracker()  # the backend's fetches; the servers track their own
+    restore = tracker.track_fetches()
+    cwd = os.getcwd()
+    try:
+        with MockRegistryServer(registry) as server, tempfile.TemporaryDirectory() as tmp:
+            app_settings.france_api_base_url = server.base_url
+            app_settings.france_api_rate_limit_per_second = client_rate
+            env = {
+                "FRANCE_API_BASE_URL": server.base_url,
+                "FRANCE_API_RATE_LIMIT_PER_SECOND": str(client_rate),
+            }
+
+            def phase(
+                plans: list[list[Action]], *, replicas: int, burst: bool
+            ) -> tuple[list, int, Counter[str], Counter[str]]:
+                # Fresh caches: new working directory (disk caches), backend and processes.
+                phase_dir = tempfile.mkdtemp(dir=tmp)
+                os.chdir(phase_dir)
+                details.detail_cache.clear()
+                tracker.clear()
+                before = registry.requests
+                if not backend:
+                    results, calls, stampedes = _run_servers(
+                        ctx, plans, replicas=replicas, env=env, cwd=phase_dir, burst=burst
+                    )
+                else:
+                    with BackendServer(BackendService()) as shared:
+                        results, calls, stampedes = _run_servers(
+                            ctx,
+                            plans,
+                            replicas=replicas,
+                            env={**env, "BACKEND_URL": shared.base_url},
+                            cwd=phase_dir,
+                            burst=burst,
+                        )
+                calls.update(tracker.calls)
+                stampedes.update(tracker.stampedes)
+                return results, registry.requests - before, calls, stampedes
+
+            # Cold sequential pass over the distinct actions: the upstream cost floor.
+            _, needed, _, _ = phase([distinct], replicas=1, burst=False)
+
+            wall = time.perf_counter()
+            with RssSampler() as rss:
+                results, upstream, calls, stampedes = phase(
+                    plans, replicas=replicas, burst=burst
+                )
+            wall = time.perf_counter() - wall
+    finally:
+        os.chdir(cwd)
+        for undo in restore:
+            undo()
+
+    latencies: dict[str, list[float]] = {"search": [], "deep_dive": []}
+    errors: list[str] = []
+    for kind, elapsed, error in results:
+        if error is not None:
+            errors.append(error)
+        else:
+            latencies[kind].append(elapsed)
+    all_latencies = latencies["search"] + latencies["deep_dive"]
+    return {
+        "config": {
+            "users": users,
+            "actions_per_user": actions_per_user,
+            "search_share": search_share,
+            "corpus_size": corpus_size,
+            "latency_ms": latency_ms,
+            "client_rate": client_rate,
+            "seed": seed,
+            "burst": burst,
+            "replicas": replicas,
+            "backend": backend,
+        },
+        "wall_seconds": wall,
+        "latency_seconds": {
+            "all": _percentiles(all_latencies),
+            "search": _percentiles(latencies["search"]),
+            "deep_dive": _percentiles(latencies["deep_dive"]),
+        },
+        "upstream_requests": upstream,
+        "upstream_requests_needed": needed,
+        "amplification": upstream / needed if needed else None,
+        # Summed over the servers and the backend.
+        "calls": dict(calls),
+        "stampedes": dict(stampedes),
+        "peak_rss_mb": rss.peak_kb / 1024,
+        "peak_server_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+        "errors": errors,
+    }
+
+
+def _pull_key(kwargs: dict) -> tuple:
+    return (
+        tuple(kwargs.get("searches", ())),
+        kwargs.get("target_count"),
+        kwargs.get("postal_code_prefix"),
+        kwargs.get("min_creation_date"),
+        kwargs.get("is_employer"),
+        kwargs.get("rank_key") is not None,
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Simulate concurrent analysts on the app.")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--actions", type=int, default=5, help="actions per user")
+    parser.add_argument("--search-share", type=float, default=0.3)
+    parser.add_argument("--corpus", type=int, default=5_000)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="mock API median latency")
+    parser.add_argument("--client-rate", type=float, default=50.0, help="client req/s budget")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--burst", action="store_true", help="all users start at once")
+    parser.add_argument("--replicas", type=int, default=1, help="Streamlit servers")
+    parser.add_argument(
+        "--no-backend", action="store_true", help="stand-alone replicas, no shared backend"
+    )
+    parser.add_argument("--out", help="write the report JSON here")
+    args = parser.parse_args(argv)
+
+    report = run_load(
+        users=args.users,
+        actions_per_user=args.actions,
+        search_share=args.search_share,
+        corpus_size=args.corpus,
+        latency_ms=args.latency_ms,
+        client_rate=args.client_rate,
+        seed=args.seed,
+        burst=args.burst,
+        replicas=args.replicas,
+        backend=not args.no_backend,
+    )
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
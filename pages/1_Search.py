@@ -1,175 +1,64 @@
-import csv
 import json
-import re
-from dataclasses import dataclass
-from datetime import date
-from io import StringIO
+import tempfile
+from dataclasses import asdict, dataclass
+from typing import BinaryIO
 
 import streamlit as st
 
-from invest_registry.clients.france import (
-    FranceCompanySearchClient,
-    FranceSearchParams,
-    collect_companies,
+from invest_registry.backend import (
+    discover_founder_socials,
+    fetch_details,
+    mark_reviewed,
+    prefetch_details,
+    social_budget,
 )
+from invest_registry.backend import fetch_records as fetch_shared_records
+from invest_registry.background import BackgroundCollection
+from invest_registry.export import EXPORT_FORMATS, write_records
+from invest_registry.financials import financial_index
+from invest_registry.france_people import person_index
+from invest_registry.jobs import JobRunner, JobSpec, create_job, list_jobs, load_job_records
+from invest_registry.metrics import metrics
 from invest_registry.models import CompanyRecord
-from invest_registry.pagination import paginate
+from invest_registry.profiling import span
+from invest_registry.pulls import (
+    FOUNDED_WITHIN_YEARS,
+    RANKED_MAX_PAGES_PER_SEARCH,
+    TRANCHE_EFFECTIF_LT20,
+    AdvancedOptions,
+    cache_key,
+    collect_records,
+    normalize_naf_override,
+    pull_plan,
+)
 from invest_registry.query_packs import get_query_pack
-from invest_registry.scoring import employee_band_label
+from invest_registry.results import SORT_KEYS, ResultView
+from invest_registry.reviewed import reviewed_sirens
+from invest_registry.scoring import ScoringWeights, employee_band_label
+from invest_registry.social_discovery import provider_configured
 from invest_registry.storage import load_cached_records, save_cached_records
 
 st.set_page_config(layout="wide")
 
 
-def years_ago(today: date, years: int) -> date:
-    try:
-        return today.replace(year=today.year - years)
-    except ValueError:
-        return today.replace(year=today.year - years, day=28)
-
-
-TRANCHE_EFFECTIF_LT20 = "00,01,02,03,11"
-FOUNDED_WITHIN_YEARS = 5
-NAF_RE = re.compile(r"^\\d{2}\\.\\d{2}[A-Z]$")
-
-
-def normalize_naf_override(raw: str | None) -> tuple[str | None, list[str]]:
-    if not raw:
-        return None, []
-    raw = raw.strip().upper()
-    if not raw:
-        return None, []
-    parts = [p.strip() for p in raw.split(",") if p.strip()]
-    valid: list[str] = []
-    invalid: list[str] = []
-    for p in parts:
-        # Strip accidental non-NAF characters (e.g. trailing "~") but keep dots.
-        cleaned = re.sub(r"[^0-9A-Z.]", "", p)
-        if NAF_RE.fullmatch(cleaned):
-            valid.append(cleaned)
-        else:
-            invalid.append(p)
-    return (",".join(valid) if valid else None), invalid
+# Rows sent to the browser per "Load more" step in table view.
+TABLE_WINDOW = 500
 
 
-@dataclass(frozen=True)
-class AdvancedOptions:
-    q: str
-    activite_principale: str | None
-    tranche_effectif_salarie: str | None
-    etat_administratif: str | None
-    per_page: int
-    max_pages_per_search: int | None
-    postal_code_prefix: str | None
-    founded_within_years: int | None
-    employer_filter: str  # "any" | "yes" | "no"
+@st.cache_resource
+def _job_runners() -> dict[str, JobRunner]:
+    # Shared by all sessions so every analyst sees (and can pause) the same job threads.
+    return {}
 
 
-def _override_searches(
-    searches: list[FranceSearchParams],
-    *,
-    q: str,
-    activite_principale: str | None,
-    tranche_effectif_salarie: str | None,
-    etat_administratif: str | None,
-) -> list[FranceSearchParams]:
-    base = searches[0] if searches else FranceSearchParams(q="")
-
-    q_val = q if q else base.q
-    tranche_val = (
-        tranche_effectif_salarie
-        if tranche_effectif_salarie is not None
-        else base.tranche_effectif_salarie
-    )
-    etat_val = (
-        etat_administratif
-        if etat_administratif is not None
-        else base.etat_administratif
-    )
-
-    naf_codes: list[str] = []
-    if activite_principale:
-        naf_codes = [c.strip() for c in activite_principale.split(",") if c.strip()]
-
-    # If NAF override is provided, replace the pack’s NAF list entirely.
-    if naf_codes:
-        return [
-            FranceSearchParams(
-                q=q_val,
-                activite_principale=naf,
-                code_postal=base.code_postal,
-                tranche_effectif_salarie=tranche_val,
-                etat_administratif=etat_val,
-            )
-            for naf in naf_codes
-        ]
-
-    return [
-        FranceSearchParams(
-            q=q_val if q else s.q,
-            activite_principale=s.activite_principale,
-            code_postal=s.code_postal,
-            tranche_effectif_salarie=(
-                tranche_effectif_salarie
-                if tranche_effectif_salarie is not None
-                else s.tranche_effectif_salarie
-            ),
-            etat_administratif=(
-                etat_administratif
-                if etat_administratif is not None
-                else s.etat_administratif
-            ),
-        )
-        for s in searches
-    ]
-
-
-def records_to_csv_bytes(records: list[CompanyRecord]) -> bytes:
-    fieldnames = [
-        "siren",
-        "name",
-        "naf",
-        "creation_date",
-        "employee_band",
-        "employee_band_year",
-        "is_employer",
-        "siret",
-        "postal_code",
-        "commune",
-        "departement",
-        "address",
-        "source",
-    ]
-    buf = StringIO()
-    w = csv.DictWriter(buf, fieldnames=fieldnames, extrasaction="ignore")
-    w.writeheader()
-    for r in records:
-        w.writerow(r.model_dump(mode="json"))
-    return buf.getvalue().encode("utf-8")
-
-
-def cache_key(
-    *,
-    pack_name: str,
-    paris_only: bool,
-    target_count: int,
-    adv: AdvancedOptions,
-) -> str:
-    bits = [
-        f"fr-{pack_name}",
-        f"paris{int(paris_only)}",
-        f"n{target_count}",
-        f"q{(adv.q or '').strip()[:24]}",
-        f"naf{adv.activite_principale or ''}",
-        f"eff{adv.tranche_effectif_salarie or ''}",
-        f"etat{adv.etat_administratif or ''}",
-        f"pp{adv.per_page}",
-        f"mp{adv.max_pages_per_search or 'none'}",
-        f"pc{adv.postal_code_prefix or ''}",
-        f"fy{adv.founded_within_years or 'none'}",
-        f"emp{adv.employer_filter}",
-    ]
-    return "-".join(bits)
+@dataclass
+class ActiveCollection:
+    job: BackgroundCollection
+    cache_key: str
+    use_disk_cache: bool
+    target_count: int
+    weights: ScoringWeights
+    shown: int = 0  # records already pushed into the session's ResultView
 
 
 @st.cache_data(ttl=6 * 60 * 60, show_spinner=False)
@@ -187,43 +76,36 @@ def fetch_records_cached(
     postal_code_prefix: str | None,
     founded_within_years: int | None,
     employer_filter: str,
+    ranked: bool = False,
+    skip_reviewed: bool = False,
 ) -> list[dict]:
-    pack = get_query_pack(pack_name, paris_only=paris_only)
-
-    searches = _override_searches(
-        pack.searches,
+    adv = AdvancedOptions(
         q=q,
         activite_principale=activite_principale,
         tranche_effectif_salarie=tranche_effectif_salarie,
         etat_administratif=etat_administratif,
+        per_page=per_page,
+        max_pages_per_search=max_pages_per_search,
+        postal_code_prefix=postal_code_prefix,
+        founded_within_years=founded_within_years,
+        employer_filter=employer_filter,
+        ranked=ranked,
+        skip_reviewed=skip_reviewed,
     )
-
-    min_creation_date = (
-        years_ago(date.today(), founded_within_years)
-        if founded_within_years is not None
-        else None
+    records = fetch_shared_records(
+        pack_name=pack_name,
+        paris_only=paris_only,
+        target_count=target_count,
+        adv=adv,
     )
+    return [r.model_dump(mode="json") for r in records]
 
-    eff_prefix = postal_code_prefix or ("75" if paris_only else None)
-
-    with FranceCompanySearchClient() as client:
-        records = collect_companies(
-            client,
-            searches=searches,
-            target_count=target_count,
-            # Strict mode: keep paging until we hit target_count or exhaust results.
-            per_page=per_page,
-            max_pages_per_search=max_pages_per_search,
-            postal_code_prefix=eff_prefix,
-            min_creation_date=min_creation_date,
-        )
-
-    if employer_filter == "yes":
-        records = [r for r in records if r.is_employer is True]
-    elif employer_filter == "no":
-        records = [r for r in records if r.is_employer is False]
 
-    return [r.model_dump(mode="json") for r in records]
+def _drop_reviewed(records: list[CompanyRecord], adv: AdvancedOptions) -> list[CompanyRecord]:
+    if not adv.skip_reviewed:
+        return records
+    reviewed = reviewed_sirens().contains_many(r.siren for r in records)
+    return [r for r, seen in zip(records, reviewed, strict=True) if not seen]
 
 
 def fetch_records(
@@ -241,25 +123,31 @@ def fetch_records(
         adv=adv,
     )
 
+    # Companies reviewed since a skip_reviewed pull was cached are left out; when that
+    # leaves it short of the target, it is pulled again.
     if use_disk_cache:
-        cached = load_cached_records(key)
+        with span("cache_load"):
+            cached = load_cached_records(key)
         if cached:
-            return [r.model_dump(mode="json") for r in cached][:target_count]
-
-    rows = fetch_records_cached(
-        pack_name=pack_name,
-        paris_only=paris_only,
-        target_count=target_count,
-        q=adv.q,
-        activite_principale=adv.activite_principale,
-        tranche_effectif_salarie=adv.tranche_effectif_salarie,
-        etat_administratif=adv.etat_administratif,
-        per_page=adv.per_page,
-        max_pages_per_search=adv.max_pages_per_search,
-        postal_code_prefix=adv.postal_code_prefix,
-        founded_within_years=adv.founded_within_years,
-        employer_filter=adv.employer_filter,
-    )
+            kept = _drop_reviewed(cached, adv)
+            if len(kept) >= min(target_count, len(cached)):
+                return [r.model_dump(mode="json") for r in kept][:target_count]
+
+    pull = {
+        "pack_name": pack_name,
+        "paris_only": paris_only,
+        "target_count": target_count,
+        **asdict(adv),  # the remaining parameters of fetch_records_cached
+    }
+    rows = fetch_records_cached(**pull)
+    if adv.skip_reviewed:
+        # st.cache_data may predate companies reviewed since.
+        reviewed = reviewed_sirens().contains_many(r["siren"] for r in rows)
+        kept = [r for r, seen in zip(rows, reviewed, strict=True) if not seen]
+        if len(kept) < min(target_count, len(rows)):
+            fetch_records_cached.clear(**pull)
+            kept = fetch_records_cached(**pull)  # a fresh pull leaves them out already
+        rows = kept
 
     if use_disk_cache:
         # Store the same payload we show in the UI.
@@ -280,6 +168,21 @@ with st.sidebar:
         "Companies to fetch", min_value=50, max_value=200, value=50, step=10
     )
     use_disk_cache = st.toggle("Use local disk cache (.cache/)", value=True)
+    progressive = st.toggle(
+        "Progressive results",
+        value=True,
+        help="Fetch in the background and show companies as soon as they pass the filters.",
+    )
+    prefetch_mode = st.selectbox(
+        "Prefetch deep dives",
+        options=["page", "page+next", "off"],
+        format_func=lambda x: {
+            "page": "Visible page",
+            "page+next": "Visible + next page",
+            "off": "Off",
+        }[x],
+        help="Warm company details in the background (low priority) so Deep dive opens instantly.",
+    )
 
     # Defaults for AdvancedOptions (used even if expander unopened).
     q = ""
@@ -291,6 +194,8 @@ with st.sidebar:
     founded_within_years = FOUNDED_WITHIN_YEARS
     postal_prefix = "75" if paris_only else ""
     employer_filter = "any"
+    ranked = False
+    skip_reviewed = False
 
     with st.expander("Advanced", expanded=False):
         q = st.text_input(
@@ -299,8 +204,9 @@ with st.sidebar:
         activite_principale = st.text_input(
             "NAF (activite_principale)",
             value="",
-            placeholder="e.g. 62.01Z (or CSV: 62.01Z,58.29C)",
-            help="Overrides the query pack NAF codes when set.",
+            placeholder="e.g. 62.01Z, or CSV of any NAF level: 62,58.2,J",
+            help="Overrides the query pack NAF codes when set. Sections (J), divisions (62), "
+            "groups (58.2) and classes (62.01) expand to their subclasses.",
         )
         etat_administratif = st.selectbox(
             "etat_administratif",
@@ -340,16 +246,117 @@ with st.sidebar:
             options=["any", "yes", "no"],
             index=0,
         )
+        ranked = st.toggle(
+            "Ranked pull (newest first)",
+            value=False,
+            help=(
+                "Scan all pages (up to max_pages_per_search, or "
+                f"{RANKED_MAX_PAGES_PER_SEARCH} when uncapped) and keep the newest companies "
+                "instead of the first ones that pass the filters."
+            ),
+        )
+        skip_reviewed = st.toggle(
+            f"Skip reviewed companies ({len(reviewed_sirens()):,})",
+            value=False,
+            help=(
+                "Leave out companies marked as reviewed; paging continues until enough "
+                "new ones pass the filters."
+            ),
+        )
 
     run = st.button("Fetch / Refresh", type="primary")
 
-if run:
+    with st.expander("Background harvest job", expanded=False):
+        job_target = st.number_input(
+            "Job target",
+            min_value=50,
+            max_value=100_000,
+            value=5_000,
+            step=500,
+            help="Runs the current settings as a resumable job (first-N mode, not ranked).",
+        )
+        start_job = st.button("Start harvest job")
+
+    show_metrics = st.toggle("Debug: metrics", value=False)
+
+
+@st.fragment(run_every=2.0)
+def _metrics_panel() -> None:
+    snap = metrics.snapshot()
+
+    def total(name: str, **match: str) -> float:
+        return sum(
+            s["value"]
+            for s in snap["counters"].get(name, [])
+            if all(s["labels"].get(k) == v for k, v in match.items())
+        )
+
+    requests = total("france_api_requests_total")
+    errors = sum(
+        s["value"]
+        for s in snap["counters"].get("france_api_requests_total", [])
+        if not s["labels"]["status"].startswith("2")
+    )
+    p50 = metrics.quantile("france_api_request_seconds", 0.5)
+    p95 = metrics.quantile("france_api_request_seconds", 0.95)
+    st.caption(
+        f"API: {requests:.0f} requests · {total('france_api_retries_total'):.0f} retries · "
+        f"{errors:.0f} non-2xx · {total('france_api_response_bytes_total') / 1e6:.1f} MB"
+    )
+    if p50 is not None:
+        st.caption(f"API latency: p50 ≤ {p50}s · p95 ≤ {p95}s")
+
+    pages = total("collect_pages_fetched_total")
+    used = total("collect_pages_used_total")
+    pass_rate = metrics.value("collect_last_pass_rate")
+    rate = metrics.value("collect_last_records_per_second")
+    st.caption(
+        f"Collector: {pages:.0f} pages fetched · {used:.0f} used · "
+        f"last run {pass_rate:.0%} pass rate, {rate:.1f} records/s"
+    )
+
+    caches = sorted(
+        {
+            s["labels"]["cache"]
+            for name in ("cache_hits_total", "cache_misses_total")
+            for s in snap["counters"].get(name, [])
+        }
+    )
+    if caches:
+        st.dataframe(
+            {
+                "cache": caches,
+                "hits": [total("cache_hits_total", cache=c) for c in caches],
+                "misses": [total("cache_misses_total", cache=c) for c in caches],
+                "evictions": [total("cache_evictions_total", cache=c) for c in caches],
+            },
+            hide_index=True,
+        )
+
+    with st.container(horizontal=True):
+        st.download_button(
+            "Prometheus", metrics.to_prometheus(), file_name="metrics.prom", mime="text/plain"
+        )
+        st.download_button(
+            "JSON",
+            json.dumps(snap, indent=2),
+            file_name="metrics.json",
+            mime="application/json",
+        )
+
+
+if show_metrics:
+    with st.sidebar.expander("Metrics", expanded=True):
+        _metrics_panel()
+
+if run or start_job:
     naf_override, naf_invalid = normalize_naf_override(activite_principale)
     if naf_invalid:
         st.error(
             "Invalid NAF code(s): "
             + ", ".join(f"`{x}`" for x in naf_invalid)
-            + ". Expected format like `62.01Z` (or CSV list)."
+            + ". Expected a NAF code or prefix like `62.01Z`, `62.01`, `58.2`, `62` or `J` "
+            "(or a CSV list)."
         )
         st.stop()
 
@@ -365,46 +372,222 @@ if run:
             None if int(founded_within_years) == 0 else int(founded_within_years)
         ),
         employer_filter=employer_filter,
+        ranked=ranked,
+        skip_reviewed=skip_reviewed,
+    )
+
+if start_job:
+    searches, filters = pull_plan(pack_name=pack_name, paris_only=paris_only, adv=adv)
+    job_info = create_job(
+        JobSpec(searches=searches, target_count=int(job_target), **filters),
+        label=f"{pack_name} · {int(job_target)} companies",
+    )
+    _job_runners()[job_info.job_id] = JobRunner(job_info.job_id).start()
+    st.toast(f"Started harvest job `{job_info.job_id}`")
+
+if run:
+    weights = get_query_pack(pack_name, paris_only=paris_only).weights
+    key = cache_key(
+        pack_name=pack_name,
+        paris_only=paris_only,
+        target_count=target_count,
+        adv=adv,
     )
-    try:
-        with st.spinner("Fetching companies…"):
-            fetched_rows = fetch_records(
+    with span("cache_load"):
+        cached = load_cached_records(key) if (progressive and use_disk_cache) else None
+    if cached:
+        cached = _drop_reviewed(cached, adv)
+
+    previous: ActiveCollection | None = st.session_state.pop("collection", None)
+    if previous is not None:
+        previous.job.cancel()
+
+    if progressive and not cached:
+        # In-process even with BACKEND_URL: the backend's shared pull has no page
+        # progress and cannot be stopped.
+        job = BackgroundCollection(
+            lambda on_page, should_stop: collect_records(
                 pack_name=pack_name,
                 paris_only=paris_only,
                 target_count=target_count,
-                use_disk_cache=use_disk_cache,
                 adv=adv,
-            )
-    except Exception as e:
-        st.error(f"Fetch failed: {e}")
-        st.stop()
-    st.session_state["rows"] = fetched_rows
+                on_page=on_page,
+                should_stop=should_stop,
+            ),
+            target_count=target_count,
+            ranked=adv.ranked,
+        ).start()
+        st.session_state["collection"] = ActiveCollection(
+            job=job,
+            cache_key=key,
+            use_disk_cache=use_disk_cache,
+            target_count=target_count,
+            weights=weights,
+        )
+        fetched_records: list[CompanyRecord] = []
+    elif cached:
+        fetched_records = cached[:target_count]
+    else:
+        try:
+            with st.spinner("Fetching companies…"), span("fetch_records"):
+                fetched_rows = fetch_records(
+                    pack_name=pack_name,
+                    paris_only=paris_only,
+                    target_count=target_count,
+                    use_disk_cache=use_disk_cache,
+                    adv=adv,
+                )
+        except Exception as e:
+            st.error(f"Fetch failed: {e}")
+            st.stop()
+        with span("model_validate"):
+            fetched_records = [CompanyRecord.model_validate(r) for r in fetched_rows]
+    st.session_state["view"] = ResultView(fetched_records, weights=weights)
     st.session_state["page"] = 1
+    st.session_state["table_window"] = TABLE_WINDOW
+
+
+def _fmt_seconds(seconds: float | None) -> str:
+    if seconds is None:
+        return "—"
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    return f"{seconds / 60:.1f}min"
+
+
+@st.fragment(run_every=1.0)
+def _collection_progress() -> None:
+    active: ActiveCollection | None = st.session_state.get("collection")
+    if active is None:
+        return
+    snap = active.job.snapshot()
+    p = snap.progress
+
+    if not snap.finished:
+        with st.container(border=True):
+            if p is not None and active.job.ranked:
+                done = p.pages_fetched / max(1, p.reachable_pages)
+            else:
+                done = len(snap.records) / max(1, active.target_count)
+            st.progress(
+                min(1.0, done),
+                text=f"Collecting… {len(snap.records)} / {active.target_count} companies",
+            )
+            if p is not None:
+                pass_rate = f"{p.pass_rate:.0%}" if p.pass_rate is not None else "—"
+                st.caption(
+                    f"Pages fetched: {p.pages_fetched} / {p.reachable_pages} · "
+                    f"Pass rate: {pass_rate} · "
+                    f"Elapsed: {_fmt_seconds(snap.elapsed_seconds)} · "
+                    f"ETA: {_fmt_seconds(snap.eta_seconds)}"
+                )
+            if st.button("Cancel", key="cancel_collection"):
+                active.job.cancel()
+
+    if len(snap.records) != active.shown or snap.finished:
+        active.shown = len(snap.records)
+        st.session_state["view"] = ResultView(snap.records, weights=active.weights)
+        if snap.finished:
+            del st.session_state["collection"]
+            if snap.status == "failed":
+                st.session_state["collection_error"] = snap.error
+            elif snap.status == "done" and active.use_disk_cache:
+                save_cached_records(active.cache_key, snap.records)
+        st.rerun(scope="app")
+
+
+if "collection" in st.session_state:
+    _collection_progress()
+
+
+def _render_jobs() -> None:
+    runners = _job_runners()
+    jobs = list_jobs()
+    with st.expander(f"Harvest jobs ({len(jobs)})", expanded=False):
+        for info in jobs:
+            runner = runners.get(info.job_id)
+            alive = runner is not None and runner.is_alive()
+            # A "running" job without a live thread was interrupted (e.g. restart).
+            status = "interrupted" if info.status == "running" and not alive else info.status
+
+            cols = st.columns([3, 3, 1, 1])
+            cols[0].markdown(f"**{info.label}**  \n`{info.job_id}`")
+            cols[1].progress(
+                min(1.0, info.records_kept / max(1, info.target_count)),
+                text=(
+                    f"{status} · {info.records_kept} / {info.target_count} · "
+                    f"{info.pages_fetched} / {info.reachable_pages or '?'} pages"
+                ),
+            )
+            if info.error:
+                cols[1].caption(f"Error: {info.error}")
+            if alive:
+                if cols[2].button("Pause", key=f"job_pause_{info.job_id}"):
+                    runner.stop()
+            elif status != "done" and cols[2].button("Resume", key=f"job_resume_{info.job_id}"):
+                runners[info.job_id] = JobRunner(info.job_id).start()
+                st.rerun(scope="fragment")
+            if info.records_kept and cols[3].button("Load", key=f"job_load_{info.job_id}"):
+                st.session_state["view"] = ResultView(
+                    load_job_records(info.job_id),
+                    weights=get_query_pack(pack_name, paris_only=paris_only).weights,
+                )
+                st.session_state["page"] = 1
+                st.session_state["table_window"] = TABLE_WINDOW
+                st.rerun(scope="app")
+
+
+def _render_serial_founders() -> None:
+    people = person_index()
+    serial = people.serial_founders()
+    if not serial:
+        return
+    with st.expander(f"Serial founders across fetched companies ({len(serial)})", expanded=False):
+        for p in serial[:50]:
+            boards = ", ".join(
+                f"[{people.company_name(s)}](/deep-dive?siren={s})" for s in sorted(p.sirens)
+            )
+            st.markdown(
+                f"**{p.display_name}** ({p.key.birth}) · {len(p.sirens)} companies: {boards}"
+            )
 
 
-rows: list[dict] | None = st.session_state.get("rows")
-if not rows:
-    st.info("Configure the sidebar, then click **Fetch / Refresh**.")
-    st.stop()
+_render_serial_founders()
 
-records = [CompanyRecord.model_validate(r) for r in rows]
-records = sorted(records, key=lambda r: r.creation_date or date.min, reverse=True)
+if any(r.is_alive() for r in _job_runners().values()):
+    st.fragment(run_every=2.0)(_render_jobs)()
+elif list_jobs():
+    st.fragment(_render_jobs)()
 
-page_size = 10
-page = int(st.session_state.get("page", 1))
-page_records, total_pages = paginate(records, page=page, page_size=page_size)
+collection_error = st.session_state.pop("collection_error", None)
+if collection_error:
+    st.error(f"Fetch failed: {collection_error}")
+
+view: ResultView | None = st.session_state.get("view")
+if not view:
+    if "collection" in st.session_state:
+        st.info("Waiting for the first companies to pass the filters…")
+    else:
+        st.info("Configure the sidebar, then click **Fetch / Refresh**.")
+    st.stop()
 
-with st.container(horizontal=True):
-    if st.button("Prev", disabled=(page <= 1)):
-        st.session_state["page"] = max(1, page - 1)
-        st.rerun()
-    if st.button("Next", disabled=(total_pages == 0 or page >= total_pages)):
-        st.session_state["page"] = min(total_pages, page + 1)
-        st.rerun()
+# Financials come from the detail store (deep dives and prefetch), so they fill in
+# over time; re-attaching only invalidates the affected sorts when something changed.
+view.attach_financials(financial_index().metrics())
 
-if total_pages:
-    st.caption(
-        f"Page **{min(page, total_pages)}** of **{total_pages}** (showing {len(page_records)} of {len(records)})"
+sort_cols = st.columns([2, 1])
+with sort_cols[0]:
+    sort_by = st.selectbox(
+        "Sort by",
+        options=list(SORT_KEYS),
+        format_func=SORT_KEYS.get,
+    )
+with sort_cols[1]:
+    view_mode = st.radio(
+        "View",
+        options=["cards", "table"],
+        format_func=lambda x: "Cards" if x == "cards" else "Table",
+        horizontal=True,
     )
 
 
@@ -441,7 +624,7 @@ def _render_company_card(r: CompanyRecord) -> None:
             st.caption(f"SIRET: {r.siret or '—'}")
             st.caption(f"Address: {addr}")
 
-        actions = st.columns(2)
+        actions = st.columns(3)
         with actions[0]:
             if st.button("Deep dive", key=f"deep_dive_{r.siren}", type="primary"):
                 st.switch_page(
@@ -449,15 +632,152 @@ def _render_company_card(r: CompanyRecord) -> None:
                 )
         with actions[1]:
             st.link_button("INPI", inpi_url)
+        with actions[2]:
+            if r.siren in reviewed_sirens():
+                st.caption("Reviewed ✓")
+            elif st.button("Mark reviewed", key=f"reviewed_{r.siren}"):
+                mark_reviewed([r.siren])
+                st.rerun()
+
+
+
+def _render_founder_socials(records: list[CompanyRecord]) -> None:
+    remaining, daily_limit = social_budget()
+    st.caption(f"Daily search budget left: {remaining} / {daily_limit}")
+    if not st.button(f"Discover for this page ({len(records)} companies)"):
+        return
+    with st.spinner("Searching founder profiles…"):
+        details = [d for d in (fetch_details(r.siren) for r in records) if d]
+        report = discover_founder_socials(details)
+    st.caption(
+        f"{report.queries_made} paid queries · {report.queries_saved} saved by the cache"
+        f" · {report.skipped_over_budget} skipped over budget"
+        + (f" · {report.failed} failed" if report.failed else "")
+    )
+    names = {d.siren: d.nom_raison_sociale or d.nom_complet or d.siren for d in details}
+    items = sorted(report.candidates.items(), key=lambda kv: (kv[0].siren, kv[0].person_name))
+    st.dataframe(
+        {
+            "company": [names[fq.siren] for fq, _ in items],
+            "founder": [fq.person_name for fq, _ in items],
+            "network": [fq.kind for fq, _ in items],
+            "top result": [c[0].url if c else None for _, c in items],
+        },
+        hide_index=True,
+        column_config={"top result": st.column_config.LinkColumn("Top result")},
+    )
 
 
-for i in range(0, len(page_records), 2):
-    cols = st.columns(2)
-    with cols[0]:
-        _render_company_card(page_records[i])
-    if i + 1 < len(page_records):
-        with cols[1]:
-            _render_company_card(page_records[i + 1])
-    else:
-        with cols[1]:
-            st.empty()
+def _render_cards(view: ResultView, sort_by: str) -> None:
+    page_size = 10
+    cursor = view.cursor(page=int(st.session_state.get("page", 1)), page_size=page_size)
+    page_records = view.page(cursor, sort=sort_by)
+
+    with st.container(horizontal=True):
+        if st.button("Prev", disabled=not cursor.has_prev):
+            st.session_state["page"] = cursor.prev().page
+            st.rerun()
+        if st.button("Next", disabled=not cursor.has_next):
+            st.session_state["page"] = cursor.next().page
+            st.rerun()
+
+    if cursor.total_pages:
+        st.caption(
+            f"Page **{cursor.page}** of **{cursor.total_pages}** (showing {len(page_records)} of {len(view)})"
+        )
+
+    if provider_configured() and page_records:
+        with st.popover("Founder socials"):
+            _render_founder_socials(page_records)
+
+    for i in range(0, len(page_records), 2):
+        cols = st.columns(2)
+        with cols[0]:
+            _render_company_card(page_records[i])
+        if i + 1 < len(page_records):
+            with cols[1]:
+                _render_company_card(page_records[i + 1])
+        else:
+            with cols[1]:
+                st.empty()
+
+    # After rendering, so the prefetch never delays the cards themselves.
+    if prefetch_mode != "off":
+        sirens = [r.siren for r in page_records]
+        if prefetch_mode == "page+next" and cursor.has_next:
+            sirens += [r.siren for r in view.page(cursor.next(), sort=sort_by)]
+        prefetch_details(sirens)
+
+
+def _render_table(view: ResultView, sort_by: str) -> None:
+    # Sorting and filtering run on the server over index permutations; only the
+    # loaded window is turned into a dataframe and sent to the browser.
+    filter_text = st.text_input(
+        "Filter", value="", placeholder="name, SIREN, NAF, commune or postal code"
+    )
+    order = view.filtered_order(sort_by, filter_text)
+    window = int(st.session_state.get("table_window", TABLE_WINDOW))
+    shown = order[:window]
+
+    st.caption(f"Showing **{len(shown)}** of **{len(order)}** matching ({len(view)} fetched)")
+    event = st.dataframe(
+        view.table(shown),
+        hide_index=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        # A selection is a row position in `shown`: keyed on what orders the rows,
+        # it is dropped when the result set, the sort or the filter changes.
+        key=f"results_table:{id(view)}:{sort_by}:{filter_text.strip().casefold()}",
+        column_config={
+            "created": st.column_config.DateColumn("Created"),
+            "employer": st.column_config.CheckboxColumn("Employer"),
+            "revenue": st.column_config.NumberColumn("Revenue", format="euro"),
+            "yoy_growth": st.column_config.NumberColumn("YoY growth", format="percent"),
+            "margin": st.column_config.NumberColumn("Net margin", format="percent"),
+            "inpi": st.column_config.LinkColumn("INPI", display_text="Open"),
+        },
+    )
+
+    selected = [i for i in (event.selection.rows if event else []) if i < len(shown)]
+    with st.container(horizontal=True):
+        if selected:
+            r = view.records[shown[selected[0]]]
+            if prefetch_mode != "off":
+                prefetch_details([r.siren])
+            if st.button(f"Deep dive: {r.name}", type="primary"):
+                st.switch_page(
+                    "pages/2_Company_Deep_Dive.py", query_params={"siren": r.siren}
+                )
+        if window < len(order) and st.button(
+            f"Load {min(TABLE_WINDOW, len(order) - window)} more"
+        ):
+            st.session_state["table_window"] = window + TABLE_WINDOW
+            st.rerun()
+
+
+def _export_file(view: ResultView, sort_by: str, fmt: str) -> BinaryIO:
+    # Stream to a spooled temp file rather than building the export in memory;
+    # for very large pulls prefer `python -m invest_registry.export`. The file
+    # outlives this call: Streamlit reads it when the download is requested.
+    fp = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)  # noqa: SIM115
+    write_records((view.records[i] for i in view.order(sort_by)), fp, fmt=fmt)
+    fp.seek(0)
+    return fp
+
+
+with st.popover("Export"):
+    export_fmt = st.selectbox("Format", options=list(EXPORT_FORMATS), key="export_fmt")
+    st.download_button(
+        f"Download {len(view)} companies",
+        data=lambda: _export_file(view, sort_by, export_fmt),
+        file_name=f"companies.{export_fmt}",
+        mime=EXPORT_FORMATS[export_fmt],
+        on_click="ignore",
+    )
+
+if view_mode == "table":
+    with span("render_table"):
+        _render_table(view, sort_by)
+else:
+    with span("render_cards"):
+        _render_cards(view, sort_by)
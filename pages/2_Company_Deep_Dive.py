@@ -2,17 +2,24 @@ from datetime import date
 
 import streamlit as st
 
-from invest_registry.clients.france import FranceCompanySearchClient, FranceSearchParams
-from invest_registry.france_people import dirigeants_personnes_physiques
-from invest_registry.models import FranceSearchResult
+from invest_registry.backend import (
+    cached_search_candidates,
+    discover_founder_socials,
+    fetch_details,
+)
+from invest_registry.financials import financial_index
+from invest_registry.france_people import dirigeants_personnes_physiques, person_index, person_key
+from invest_registry.profiling import span
 from invest_registry.scoring import employee_band_label
 from invest_registry.social_discovery import (
+    QueryBudgetExceeded,
     SocialCandidate,
     google_search_url,
     linkedin_people_query,
-    search_candidates,
+    provider_configured,
     x_people_query,
 )
+from invest_registry.watchlist import Watchlist
 
 st.set_page_config(page_title="Company deep dive", layout="wide")
 
@@ -23,22 +30,13 @@ def _age_years(created: date | None) -> float | None:
     return (date.today() - created).days / 365.25
 
 
-@st.cache_data(ttl=6 * 60 * 60, show_spinner=False)
-def _fetch_details_by_siren(siren: str) -> FranceSearchResult | None:
-    with FranceCompanySearchClient() as client:
-        resp = client.search(
-            search=FranceSearchParams(
-                q=siren,
-                minimal=True,
-                include="dirigeants,siege,complements,finances",
-            ),
-            per_page=1,
-        )
-
-    for r in resp.results:
-        if r.siren == siren:
-            return r
-    return resp.results[0] if resp.results else None
+def _find_candidates(state_key: str, *, query: str, kind: str) -> None:
+    try:
+        cands, _ = cached_search_candidates(query=query, kind=kind)
+    except QueryBudgetExceeded as e:
+        st.warning(f"Not searching: {e}.")
+        return
+    st.session_state["founder_candidates"][state_key] = cands
 
 
 selected_siren = st.query_params.get("siren")
@@ -70,12 +68,26 @@ if not selected_siren:
     st.stop()
 
 with st.spinner("Loading company details…"):
-    details = _fetch_details_by_siren(selected_siren)
+    # Shared with the Search page's prefetch, so this is usually a cache hit.
+    details = fetch_details(selected_siren)
 
 if not details:
     st.error(f"No results found for SIREN `{selected_siren}`.")
     st.stop()
 
+watchlist = Watchlist()
+with st.sidebar:
+    if details.siren in watchlist:
+        if st.button("Stop watching", help="No more change checks for this company"):
+            watchlist.remove([details.siren])
+            st.rerun()
+        for change in watchlist.recent_changes(details.siren):
+            detected = date.fromtimestamp(change.detected_at).isoformat()
+            st.caption(f"{detected} · {change.field}: {change.before} → {change.after}")
+    elif st.button("Watch for changes", help="Checked by `invest-registry watch refresh`"):
+        watchlist.add([details.siren])
+        st.rerun()
+
 inpi_url = f"https://data.inpi.fr/entreprises/{details.siren}"
 
 company_name = details.nom_raison_sociale or details.nom_complet or "Company deep dive"
@@ -143,6 +155,29 @@ else:
     st.session_state.setdefault("founder_social", {})
     st.session_state.setdefault("founder_candidates", {})
 
+    if provider_configured() and founders and st.button(
+        f"Find socials for all {len(founders)} founders"
+    ):
+        with span("social_discovery"):
+            report = discover_founder_socials([details])
+        for fq, cands in report.candidates.items():
+            st.session_state["founder_candidates"][
+                f"{fq.siren}:{fq.person_name}:{fq.kind}"
+            ] = cands
+        st.caption(
+            f"{report.queries_made} paid queries · {report.queries_saved} saved by the cache"
+            + (
+                f" · {report.skipped_over_budget} skipped (daily budget used up)"
+                if report.skipped_over_budget
+                else ""
+            )
+            + (f" · {report.failed} failed" if report.failed else "")
+        )
+
+    # Cross-company links over every company fetched so far (local detail store).
+    with span("person_index"):
+        people = person_index()
+
     per_row = 3 if len(shown) >= 6 else 2
     for i in range(0, len(shown), per_row):
         cols = st.columns(per_row)
@@ -169,6 +204,17 @@ else:
                     if meta_bits:
                         st.caption(" · ".join(meta_bits))
 
+                    key = person_key(d)
+                    other_boards = (
+                        sorted(people.companies_for(key) - {details.siren}) if key else []
+                    )
+                    if other_boards:
+                        links = ", ".join(
+                            f"[{people.company_name(s)}](/deep-dive?siren={s})"
+                            for s in other_boards[:5]
+                        )
+                        st.markdown(f"Also dirigeant of: {links}")
+
                     social_row = st.columns([1, 1])
                     with social_row[0]:
                         if linkedin_url:
@@ -198,9 +244,8 @@ else:
                             if st.button(
                                 "Find LinkedIn candidates", key=f"find_li_{founder_key}"
                             ):
-                                st.session_state["founder_candidates"][
-                                    f"{founder_key}:linkedin"
-                                ] = search_candidates(
+                                _find_candidates(
+                                    f"{founder_key}:linkedin",
                                     query=linkedin_people_query(
                                         full_name, company_name
                                     ),
@@ -210,9 +255,8 @@ else:
                             if st.button(
                                 "Find X candidates", key=f"find_x_{founder_key}"
                             ):
-                                st.session_state["founder_candidates"][
-                                    f"{founder_key}:x"
-                                ] = search_candidates(
+                                _find_candidates(
+                                    f"{founder_key}:x",
                                     query=x_people_query(full_name, company_name),
                                     kind="x",
                                 )
@@ -277,35 +321,44 @@ def _fmt_eur(amount: object) -> str:
     return f"{v:.0f} €"
 
 
-def _latest_financial_year(finances: dict[str, object] | None) -> str | None:
-    if not finances:
-        return None
-    years = []
-    for k in finances.keys():
-        try:
-            years.append(int(k))
-        except ValueError:
-            continue
-    if not years:
-        return None
-    return str(max(years))
-
-
 st.subheader("Financials")
-if not details.finances:
+fin_index = financial_index()
+fin_years = fin_index.years_for(details.siren)
+if not fin_years and details.finances:
+    # Not in the local detail store (details served by a shared backend): index it once.
+    fin_index.add_company(details)
+    fin_years = fin_index.years_for(details.siren)
+if not fin_years:
     st.info("No financial data returned.")
 else:
-    year = _latest_financial_year(details.finances)
-    year_data = details.finances.get(year, {}) if year else {}
-    if not isinstance(year_data, dict):
-        year_data = {}
-
-    ca = year_data.get("ca")
-    rn = year_data.get("resultat_net")
+    fin = fin_index.metrics()
+    ca, rn, yoy, cagr, margin = (
+        fin.column(name, [details.siren])[0]
+        for name in ("revenue", "net_income", "yoy_growth", "cagr", "margin")
+    )
+    latest = fin_years[-1]
 
     with st.container(border=True):
-        header = "Latest year" if not year else f"Year {year}"
-        st.caption(header)
-        fin_cols = st.columns(2)
-        fin_cols[0].metric("Revenue (CA)", _fmt_eur(ca))
+        st.caption(f"Year {latest.year}")
+        fin_cols = st.columns(4)
+        fin_cols[0].metric(
+            "Revenue (CA)", _fmt_eur(ca), delta=None if yoy is None else f"{yoy:+.0%} YoY"
+        )
         fin_cols[1].metric("Net income", _fmt_eur(rn))
+        fin_cols[2].metric("Net margin", "—" if margin is None else f"{margin:.1%}")
+        fin_cols[3].metric(
+            f"CAGR since {fin_years[0].year}", "—" if cagr is None else f"{cagr:+.1%}"
+        )
+        if len(fin_years) > 1:
+            st.dataframe(
+                {
+                    "year": [str(y.year) for y in fin_years],
+                    "revenue": [y.revenue for y in fin_years],
+                    "net_income": [y.net_income for y in fin_years],
+                },
+                hide_index=True,
+                column_config={
+                    "revenue": st.column_config.NumberColumn("Revenue", format="euro"),
+                    "net_income": st.column_config.NumberColumn("Net income", format="euro"),
+                },
+            )
@@ -0,0 +1,545 @@
+"""Shared backend for several Streamlit replicas: one cache and one API budget.
+
+Each replica has its own `st.cache_data`, detail cache and rate limiter, so
+scaling out the UI multiplies upstream requests. Run one backend instead:
+
+    uv run python -m invest_registry.backend --port 8766
+    BACKEND_URL=http://127.0.0.1:8766 uv run streamlit run streamlit_app.py
+
+and the pages' record pulls, detail lookups and social discovery go through
+it. The backend serves them from its caches and stores (`.cache/` in its own
+working directory), collapses identical requests that are in flight at the same
+time into one upstream call, and is the only process that talks to the API.
+
+Pages call the module-level functions below (`fetch_records`, `fetch_details`,
+`prefetch_details`, ...). With no `BACKEND_URL` they run in-process, exactly as
+before. Progressive collections and harvest jobs stay in-process either way.
+
+`skip_reviewed` pulls exclude the backend's reviewed set, so replicas mark
+companies reviewed through it (`mark_reviewed`); a cached pull that companies
+reviewed since would leave short is pulled again. Replicas also keep their own
+view of the set for their local filters and progressive collections: run them
+from the backend's working directory, so both read the same
+`.cache/reviewed_sirens.npy` (and `mark-reviewed` from the CLI reaches both).
+"""
+
+import argparse
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import asdict
+from typing import TYPE_CHECKING, Self
+from urllib.parse import urlsplit
+
+from invest_registry import details as local_details
+from invest_registry import reviewed, social_discovery
+from invest_registry.clients.france import CollectProgress, FranceCompanySearchClient
+from invest_registry.metrics import metrics
+from invest_registry.models import CompanyRecord, FranceSearchResult
+from invest_registry.pulls import AdvancedOptions, cache_key, collect_records
+from invest_registry.social_discovery import (
+    SOCIAL_KINDS,
+    DiscoveryReport,
+    FounderQuery,
+    QueryBudget,
+    QueryBudgetExceeded,
+    SocialCandidate,
+)
+from invest_registry.storage import (
+    cached_records_age,
+    load_cached_records,
+    save_cached_records,
+)
+
+if TYPE_CHECKING:
+    import httpx
+
+    from invest_registry.settings import Settings
+
+RECORDS_TTL_SECONDS = 6 * 60 * 60  # same as the Search page's st.cache_data
+RECORDS_MAX_ENTRIES = 64  # distinct pulls kept in memory
+
+
+class BackendError(RuntimeError):
+    pass
+
+
+def _unreviewed(records: list[CompanyRecord], adv: AdvancedOptions) -> list[CompanyRecord]:
+    if not adv.skip_reviewed:
+        return records
+    seen = reviewed.reviewed_sirens().contains_many(r.siren for r in records)
+    return [r for r, s in zip(records, seen, strict=True) if not s]
+
+
+class BackendService:
+    """What the backend serves, independent of HTTP.
+
+    Record pulls are cached in memory and in the local disk cache, both under the
+    same TTL; at most `max_entries` pulls stay in memory, least recently used first
+    out. Cached `skip_reviewed` pulls are filtered against the current reviewed set
+    and pulled again when that leaves them short. Details go through the
+    process-wide `detail_cache`. Concurrent identical pulls share one collection:
+    the first caller runs it, the others wait for its result.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float = RECORDS_TTL_SECONDS,
+        use_disk_cache: bool = True,
+        max_entries: int = RECORDS_MAX_ENTRIES,
+        app_settings: "Settings | None" = None,
+    ) -> None:
+        self._ttl = ttl_seconds
+        self._use_disk_cache = use_disk_cache
+        self._max_entries = max_entries
+        self._settings = app_settings
+        self._lock = threading.Lock()
+        self._records: OrderedDict[str, tuple[float, list[CompanyRecord]]] = OrderedDict()
+        self._inflight: dict[str, threading.Event] = {}
+        self._client: FranceCompanySearchClient | None = None
+
+    def _detail_client(self) -> FranceCompanySearchClient:
+        with self._lock:
+            if self._client is None:
+                self._client = FranceCompanySearchClient(app_settings=self._settings)
+            return self._client
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def _put(self, key: str, records: list[CompanyRecord], *, age: float = 0.0) -> None:
+        # Caller holds self._lock. `age` keeps a disk entry's original expiry.
+        self._records[key] = (time.monotonic() - age, records)
+        self._records.move_to_end(key)
+        while len(self._records) > self._max_entries:
+            self._records.popitem(last=False)
+            metrics.inc("cache_evictions_total", cache="backend_records")
+
+    def _cached_records(self, key: str) -> list[CompanyRecord] | None:
+        with self._lock:
+            entry = self._records.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self._ttl:
+                del self._records[key]
+                metrics.inc("cache_evictions_total", cache="backend_records")
+                entry = None
+            elif entry is not None:
+                self._records.move_to_end(key)
+        if entry is not None:
+            metrics.inc("cache_hits_total", cache="backend_records")
+            return entry[1]
+        if self._use_disk_cache:
+            age = cached_records_age(key)
+            stored = load_cached_records(key) if age is not None and age <= self._ttl else None
+            if stored:
+                with self._lock:
+                    self._put(key, stored, age=age)
+                metrics.inc("cache_hits_total", cache="backend_records")
+                return stored
+        metrics.inc("cache_misses_total", cache="backend_records")
+        return None
+
+    def records(
+        self,
+        *,
+        pack_name: str,
+        paris_only: bool,
+        target_count: int,
+        adv: AdvancedOptions,
+    ) -> list[CompanyRecord]:
+        key = cache_key(
+            pack_name=pack_name, paris_only=paris_only, target_count=target_count, adv=adv
+        )
+        while True:
+            cached = self._cached_records(key)
+            if cached is not None:
+                kept = _unreviewed(cached, adv)
+                if len(kept) >= target_count or len(kept) == len(cached):
+                    return kept[:target_count]
+                # Companies reviewed since the pull was cached leave it short.
+                with self._lock:
+                    self._records.pop(key, None)
+            with self._lock:
+                event = self._inflight.get(key)
+                owner = event is None
+                if owner:
+                    event = self._inflight[key] = threading.Event()
+            if not owner:
+                metrics.inc("backend_coalesced_total", kind="records")
+                event.wait()
+                continue  # the owner may have failed; retry (or take over)
+            try:
+                records = collect_records(
+                    pack_name=pack_name, paris_only=paris_only, target_count=target_count, adv=adv
+                )
+                if self._use_disk_cache:
+                    save_cached_records(key, records)
+                with self._lock:
+                    self._put(key, records)
+                return records
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+                event.set()
+
+    def mark_reviewed(self, sirens: Iterable[str]) -> int:
+        return reviewed.mark_reviewed(sirens)
+
+    def details(self, siren: str) -> FranceSearchResult | None:
+        hit, value = local_details.detail_cache.get(siren)
+        if hit:
+            return value
+        return local_details.detail_cache.fetch(siren, self._detail_client())
+
+    def prefetch(self, sirens: Iterable[str]) -> int:
+        return local_details.prefetch_details(sirens)
+
+    def candidates(self, *, query: str, kind: str) -> tuple[list[SocialCandidate], bool]:
+        return social_discovery.cached_search_candidates(
+            query=query, kind=kind, app_settings=self._settings
+        )
+
+    def socials(
+        self, companies: list[FranceSearchResult], *, kinds: Iterable[str] = SOCIAL_KINDS
+    ) -> DiscoveryReport:
+        return social_discovery.discover_founder_socials(
+            companies, kinds=kinds, app_settings=self._settings
+        )
+
+    def budget(self) -> QueryBudget:
+        from invest_registry.settings import get_settings
+
+        return QueryBudget((self._settings or get_settings()).social_daily_query_budget)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+
+def _report_json(report: DiscoveryReport) -> dict:
+    return {
+        "candidates": [
+            {"founder": asdict(fq), "candidates": [asdict(c) for c in cands]}
+            for fq, cands in report.candidates.items()
+        ],
+        "queries_made": report.queries_made,
+        "cache_hits": report.cache_hits,
+        "deduplicated": report.deduplicated,
+        "skipped_over_budget": report.skipped_over_budget,
+        "failed": report.failed,
+    }
+
+
+def _report_from_json(data: dict) -> DiscoveryReport:
+    return DiscoveryReport(
+        candidates={
+            FounderQuery(**c["founder"]): [SocialCandidate(**x) for x in c["candidates"]]
+            for c in data["candidates"]
+        },
+        queries_made=data["queries_made"],
+        cache_hits=data["cache_hits"],
+        deduplicated=data["deduplicated"],
+        skipped_over_budget=data["skipped_over_budget"],
+        failed=data["failed"],
+    )
+
+
+class BackendServer:
+    """Serves a BackendService as JSON over HTTP on a background thread (port 0: pick a free one)."""
+
+    def __init__(
+        self, service: BackendService, *, host: str = "127.0.0.1", port: int = 0
+    ) -> None:
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        self.service = service
+        routes: dict[tuple[str, str], Callable[[dict], tuple[int, dict]]] = {
+            ("GET", "/health"): lambda body: (200, {"status": "ok"}),
+            ("GET", "/metrics"): lambda body: (200, metrics.snapshot()),
+            ("POST", "/records"): self._records,
+            ("POST", "/reviewed"): self._mark_reviewed,
+            ("POST", "/details"): self._details,
+            ("POST", "/prefetch"): self._prefetch,
+            ("POST", "/candidates"): self._candidates,
+            ("POST", "/socials"): self._socials,
+            ("GET", "/budget"): self._budget,
+        }
+
+        class _Handler(BaseHTTPRequestHandler):
+            def _dispatch(self, method: str) -> None:
+                route = routes.get((method, urlsplit(self.path).path))
+                if route is None:
+                    status, payload = 404, {"error": f"no route for {method} {self.path}"}
+                else:
+                    length = int(self.headers.get("content-length") or 0)
+                    try:
+                        body = json.loads(self.rfile.read(length)) if length else {}
+                        status, payload = route(body)
+                    except QueryBudgetExceeded as e:
+                        status, payload = 429, {"error": str(e), "budget_exceeded": True}
+                    except Exception as e:  # noqa: BLE001 - sent to the replica as a BackendError
+                        status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self) -> None:
+                self._dispatch("GET")
+
+            def do_POST(self) -> None:
+                self._dispatch("POST")
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="backend", daemon=True
+        )
+
+    def _records(self, body: dict) -> tuple[int, dict]:
+        records = self.service.records(
+            pack_name=body["pack_name"],
+            paris_only=body["paris_only"],
+            target_count=body["target_count"],
+            adv=AdvancedOptions(**body["adv"]),
+        )
+        return 200, {"records": [r.model_dump(mode="json") for r in records]}
+
+    def _mark_reviewed(self, body: dict) -> tuple[int, dict]:
+        return 200, {"added": self.service.mark_reviewed(body["sirens"])}
+
+    def _details(self, body: dict) -> tuple[int, dict]:
+        value = self.service.details(body["siren"])
+        return 200, {"details": value.model_dump(mode="json") if value is not None else None}
+
+    def _prefetch(self, body: dict) -> tuple[int, dict]:
+        return 200, {"queued": self.service.prefetch(body["sirens"])}
+
+    def _candidates(self, body: dict) -> tuple[int, dict]:
+        found, from_cache = self.service.candidates(query=body["query"], kind=body["kind"])
+        return 200, {"candidates": [asdict(c) for c in found], "from_cache": from_cache}
+
+    def _socials(self, body: dict) -> tuple[int, dict]:
+        companies = [FranceSearchResult.model_validate(c) for c in body["companies"]]
+        return 200, _report_json(self.service.socials(companies, kinds=body["kinds"]))
+
+    def _budget(self, body: dict) -> tuple[int, dict]:
+        budget = self.service.budget()
+        return 200, {"remaining": budget.remaining(), "daily_limit": budget.daily_limit}
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> Self:
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Serve on the calling thread until interrupted (for the CLI)."""
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+            self.service.close()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self.service.close()
+
+    def __enter__(self) -> Self:
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+
+class BackendClient:
+    """Thin client for a BackendServer; mirrors the module-level functions."""
+
+    def __init__(
+        self, base_url: str, *, timeout: float = 300.0, http: "httpx.Client | None" = None
+    ) -> None:
+        import httpx
+
+        self._http = http or httpx.Client(base_url=base_url, timeout=httpx.Timeout(timeout))
+
+    def close(self) -> None:
+        self._http.close()
+
+    def _call(self, method: str, path: str, body: dict | None = None) -> dict:
+        resp = self._http.request(method, path, json=body)
+        payload = resp.json()
+        if resp.status_code == 429 and payload.get("budget_exceeded"):
+            raise QueryBudgetExceeded(payload["error"])
+        if resp.status_code != 200:
+            raise BackendError(payload.get("error") or f"backend returned {resp.status_code}")
+        return payload
+
+    def records(
+        self, *, pack_name: str, paris_only: bool, target_count: int, adv: AdvancedOptions
+    ) -> list[CompanyRecord]:
+        body = {
+            "pack_name": pack_name,
+            "paris_only": paris_only,
+            "target_count": target_count,
+            "adv": asdict(adv),
+        }
+        payload = self._call("POST", "/records", body)
+        return [CompanyRecord.model_validate(r) for r in payload["records"]]
+
+    def mark_reviewed(self, sirens: Iterable[str]) -> int:
+        return self._call("POST", "/reviewed", {"sirens": list(sirens)})["added"]
+
+    def details(self, siren: str) -> FranceSearchResult | None:
+        raw = self._call("POST", "/details", {"siren": siren})["details"]
+        return FranceSearchResult.model_validate(raw) if raw is not None else None
+
+    def prefetch(self, sirens: Iterable[str]) -> int:
+        return self._call("POST", "/prefetch", {"sirens": list(sirens)})["queued"]
+
+    def candidates(self, *, query: str, kind: str) -> tuple[list[SocialCandidate], bool]:
+        payload = self._call("POST", "/candidates", {"query": query, "kind": kind})
+        return [SocialCandidate(**c) for c in payload["candidates"]], payload["from_cache"]
+
+    def socials(
+        self, companies: list[FranceSearchResult], *, kinds: Iterable[str] = SOCIAL_KINDS
+    ) -> DiscoveryReport:
+        body = {
+            "companies": [c.model_dump(mode="json") for c in companies],
+            "kinds": list(kinds),
+        }
+        return _report_from_json(self._call("POST", "/socials", body))
+
+    def budget(self) -> tuple[int, int]:
+        payload = self._call("GET", "/budget")
+        return payload["remaining"], payload["daily_limit"]
+
+
+_clients: dict[str, BackendClient] = {}
+_clients_lock = threading.Lock()
+
+
+def backend_client(app_settings: "Settings | None" = None) -> BackendClient | None:
+    """The process-wide client for `BACKEND_URL`, or None to run in-process."""
+    if app_settings is None:
+        from invest_registry.settings import get_settings
+
+        app_settings = get_settings()
+    url = app_settings.backend_url
+    if not url:
+        return None
+    with _clients_lock:
+        if url not in _clients:
+            _clients[url] = BackendClient(url, timeout=app_settings.backend_timeout_seconds)
+        return _clients[url]
+
+
+def fetch_records(
+    *,
+    pack_name: str,
+    paris_only: bool,
+    target_count: int,
+    adv: AdvancedOptions,
+    on_page: Callable[[CollectProgress], None] | None = None,
+    should_stop: Callable[[], bool] | None = None,
+) -> list[CompanyRecord]:
+    """`collect_records`, or the backend's shared pull (no page progress, not stoppable)."""
+    client = backend_client()
+    if client is None:
+        return collect_records(
+            pack_name=pack_name,
+            paris_only=paris_only,
+            target_count=target_count,
+            adv=adv,
+            on_page=on_page,
+            should_stop=should_stop,
+        )
+    return client.records(
+        pack_name=pack_name, paris_only=paris_only, target_count=target_count, adv=adv
+    )
+
+
+def mark_reviewed(sirens: Iterable[str]) -> int:
+    """Add SIRENs to the reviewed set: this process's, and the backend's when there is one."""
+    client = backend_client()
+    if client is None:
+        return reviewed.mark_reviewed(sirens)
+    sirens = list(sirens)
+    added = client.mark_reviewed(sirens)
+    reviewed.mark_reviewed(sirens)  # a no-op when the replica shares the backend's .cache/
+    return added
+
+
+def fetch_details(siren: str) -> FranceSearchResult | None:
+    client = backend_client()
+    if client is None:
+        return local_details.fetch_details(siren)
+    return client.details(siren)
+
+
+def prefetch_details(sirens: Iterable[str]) -> int:
+    client = backend_client()
+    if client is None:
+        return local_details.prefetch_details(sirens)
+    return client.prefetch(sirens)
+
+
+def cached_search_candidates(*, query: str, kind: str) -> tuple[list[SocialCandidate], bool]:
+    client = backend_client()
+    if client is None:
+        return social_discovery.cached_search_candidates(query=query, kind=kind)
+    return client.candidates(query=query, kind=kind)
+
+
+def discover_founder_socials(
+    companies: Iterable[FranceSearchResult], *, kinds: Iterable[str] = SOCIAL_KINDS
+) -> DiscoveryReport:
+    client = backend_client()
+    if client is None:
+        return social_discovery.discover_founder_socials(companies, kinds=kinds)
+    return client.socials(list(companies), kinds=kinds)
+
+
+def social_budget() -> tuple[int, int]:
+    """(queries left today, daily limit) of the paid search budget."""
+    client = backend_client()
+    if client is None:
+        from invest_registry.settings import get_settings
+
+        budget = QueryBudget(get_settings().social_daily_query_budget)
+        return budget.remaining(), budget.daily_limit
+    return client.budget()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Serve record pulls, details and social discovery to Streamlit replicas."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--no-disk-cache", action="store_true", help="memory cache only")
+    args = parser.parse_args(argv)
+
+    server = BackendServer(
+        BackendService(use_disk_cache=not args.no_disk_cache), host=args.host, port=args.port
+    )
+    print(f"backend on {server.base_url}", flush=True)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
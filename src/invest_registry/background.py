@@ -0,0 +1,111 @@
+import math
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from invest_registry.clients.france import CollectProgress
+from invest_registry.models import CompanyRecord
+
+# A collection run: receives the progress callback and the stop check that
+# collect_companies accepts, and returns the final records.
+CollectRun = Callable[
+    [Callable[[CollectProgress], None], Callable[[], bool]],
+    list[CompanyRecord],
+]
+
+
+@dataclass(frozen=True)
+class CollectionSnapshot:
+    status: str  # "running" | "done" | "cancelled" | "failed"
+    records: list[CompanyRecord]
+    progress: CollectProgress | None
+    elapsed_seconds: float
+    eta_seconds: float | None
+    error: str | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status != "running"
+
+
+class BackgroundCollection:
+    """Runs a collection on a daemon thread and buffers records as pages pass the filters.
+
+    The UI polls `snapshot()`; all shared state is guarded by one lock.
+    """
+
+    def __init__(self, run: CollectRun, *, target_count: int, ranked: bool = False) -> None:
+        self._run = run
+        self._target_count = target_count
+        self._ranked = ranked  # ranked runs scan every reachable page
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._records: list[CompanyRecord] = []
+        self._progress: CollectProgress | None = None
+        self._status = "running"
+        self._error: str | None = None
+        self._started = time.monotonic()
+        self._finished_at: float | None = None
+        self._thread = threading.Thread(target=self._work, name="collect-companies", daemon=True)
+
+    @property
+    def ranked(self) -> bool:
+        return self._ranked
+
+    def start(self) -> "BackgroundCollection":
+        self._started = time.monotonic()
+        self._thread.start()
+        return self
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def join(self, timeout: float | None = None) -> None:
+        self._thread.join(timeout)
+
+    def _on_page(self, progress: CollectProgress) -> None:
+        with self._lock:
+            self._progress = progress
+            self._records.extend(progress.new_records)
+
+    def _work(self) -> None:
+        try:
+            records = self._run(self._on_page, self._cancel.is_set)
+        except Exception as e:  # noqa: BLE001 - surfaced to the UI through snapshot()
+            with self._lock:
+                self._status = "failed"
+                self._error = str(e)
+                self._finished_at = time.monotonic()
+            return
+        with self._lock:
+            # Ranked runs only know their records at the end; first-N runs
+            # return the same records that were already streamed.
+            self._records = list(records)
+            self._status = "cancelled" if self._cancel.is_set() else "done"
+            self._finished_at = time.monotonic()
+
+    def snapshot(self) -> CollectionSnapshot:
+        with self._lock:
+            end = self._finished_at or time.monotonic()
+            elapsed = end - self._started
+            return CollectionSnapshot(
+                status=self._status,
+                records=list(self._records),
+                progress=self._progress,
+                elapsed_seconds=elapsed,
+                eta_seconds=(
+                    None if self._status != "running" else self._eta(self._progress, elapsed)
+                ),
+                error=self._error,
+            )
+
+    def _eta(self, progress: CollectProgress | None, elapsed: float) -> float | None:
+        if progress is None or not progress.pages_fetched:
+            return None
+        remaining_pages = max(0, progress.reachable_pages - progress.pages_fetched)
+        kept_per_page = progress.records_kept / progress.pages_fetched
+        if kept_per_page > 0 and not self._ranked:
+            needed = max(0, self._target_count - progress.records_kept)
+            remaining_pages = min(remaining_pages, math.ceil(needed / kept_per_page))
+        return remaining_pages * elapsed / progress.pages_fetched
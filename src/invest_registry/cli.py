@@ -0,0 +1,602 @@
+"""`invest-registry`: pulls, enrichment, exports and cache stats without Streamlit.
+
+    invest-registry pull --target 200 --paris-only > pull.ndjson
+    invest-registry harvest --target 100000 --workers 4 > harvest.ndjson
+    invest-registry enrich < pull.ndjson > details.ndjson
+    invest-registry watch add < portfolio.txt && invest-registry watch refresh
+    invest-registry segments --naf 62,58.2 --departement 75,92,69 --tranche 00,01,02
+    invest-registry sample --naf 62.01Z --by-departement 75,77,78,91,92,93,94,95
+    invest-registry export --format csv --out pull.csv < pull.ndjson
+    invest-registry cache-stats
+
+Results go to stdout as NDJSON (one JSON object per line) as soon as they are
+available; progress and errors go to stderr. Pulls share the Search page's disk
+cache keys, so a scheduled pull warms the UI and the other way round.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, replace
+from datetime import UTC, datetime
+from itertools import islice
+from typing import TextIO
+
+from invest_registry import export
+from invest_registry.clients.france import PER_PAGE_MAX
+from invest_registry.harvest import HARVEST_WORKERS, PAGES_PER_UNIT
+from invest_registry.pulls import (
+    EMPLOYER_FILTERS,
+    FOUNDED_WITHIN_YEARS,
+    TRANCHE_EFFECTIF_LT20,
+    AdvancedOptions,
+    cache_key,
+    iter_pull,
+    normalize_naf_override,
+    pull_plan,
+)
+from invest_registry.sampling import (
+    SAMPLE_CONCURRENCY,
+    SAMPLE_CONFIDENCE,
+    SAMPLE_MARGIN,
+    SAMPLE_MAX_PAGES,
+)
+from invest_registry.segments import SEGMENT_CONCURRENCY
+
+ENRICH_CONCURRENCY = 4
+
+
+def _emit(obj: dict) -> None:
+    sys.stdout.write(json.dumps(obj, ensure_ascii=False) + "\n")
+
+
+def _iso(mtime: float) -> str:
+    return datetime.fromtimestamp(mtime, UTC).isoformat(timespec="seconds")
+
+
+def _pull_options(args: argparse.Namespace) -> AdvancedOptions:
+    naf, invalid = normalize_naf_override(args.naf)
+    if invalid:
+        expected = "expected e.g. 62.01Z, 62.01, 58.2, 62 or J"
+        args.parser.error(f"invalid NAF code(s): {', '.join(invalid)} ({expected})")
+    postal_prefix = args.postal_prefix
+    if postal_prefix is None and args.paris_only:
+        postal_prefix = "75"  # what the Search page's Advanced panel defaults to
+    return AdvancedOptions(
+        q=args.q.strip(),
+        activite_principale=naf,
+        tranche_effectif_salarie=args.tranche.strip() or None,
+        etat_administratif=args.etat or None,
+        per_page=args.per_page,
+        max_pages_per_search=args.max_pages or None,
+        postal_code_prefix=(postal_prefix or "").strip() or None,
+        founded_within_years=args.founded_within or None,
+        employer_filter=args.employer,
+        ranked=getattr(args, "ranked", False),
+        skip_reviewed=getattr(args, "skip_reviewed", False),
+    )
+
+
+def cmd_pull(args: argparse.Namespace) -> int:
+    adv = _pull_options(args)
+    pull = {
+        "pack_name": args.pack,
+        "paris_only": args.paris_only,
+        "target_count": args.target,
+        "adv": adv,
+    }
+    n = 0
+    with contextlib.closing(iter_pull(**pull, use_disk_cache=not args.no_cache)) as records:
+        for record in records:
+            sys.stdout.write(record.model_dump_json() + "\n")
+            sys.stdout.flush()
+            n += 1
+    print(f"{n} records · cache key {cache_key(**pull)}", file=sys.stderr)
+    return 0
+
+
+def cmd_harvest(args: argparse.Namespace) -> int:
+    from invest_registry.harvest import run_harvest
+    from invest_registry.jobs import JobSpec, create_job, iter_job_records
+
+    job_id = args.job
+    if job_id is None:
+        adv = _pull_options(args)
+        searches, filters = pull_plan(pack_name=args.pack, paris_only=args.paris_only, adv=adv)
+        spec = JobSpec(searches=searches, target_count=args.target, **filters)
+        job_id = create_job(spec, label=f"{args.pack} · {args.target} companies").job_id
+    print(f"harvesting job {job_id} on {args.workers} workers", file=sys.stderr)
+
+    info = run_harvest(job_id, workers=args.workers, pages_per_unit=args.pages_per_unit)
+    for record in iter_job_records(job_id):
+        sys.stdout.write(record.model_dump_json() + "\n")
+    sys.stdout.flush()
+    print(
+        f"{info.records_kept} records · {info.pages_fetched} pages · job {job_id} {info.status}",
+        file=sys.stderr,
+    )
+    if info.error:
+        print(info.error, file=sys.stderr)
+    return 1 if info.status == "failed" else 0
+
+
+def _open_input(path: str) -> contextlib.AbstractContextManager[TextIO]:
+    if path == "-":
+        return contextlib.nullcontext(sys.stdin)
+    return open(path, encoding="utf-8")
+
+
+def _read_sirens(lines: Iterable[str], invalid: list[int] | None = None) -> Iterator[str]:
+    """SIRENs from NDJSON records (a `siren` field) or bare SIRENs, one per line.
+
+    Malformed records and values that are not nine digits are reported on stderr and
+    skipped; their line numbers are appended to `invalid`.
+    """
+    for lineno, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        if not line.startswith("{"):
+            siren = line
+        else:
+            try:
+                siren = str(json.loads(line)["siren"]).strip()
+            except (ValueError, KeyError, TypeError) as e:
+                print(
+                    f"line {lineno}: not a record with a siren ({type(e).__name__})",
+                    file=sys.stderr,
+                )
+                if invalid is not None:
+                    invalid.append(lineno)
+                continue
+        if len(siren) != 9 or not siren.isdigit():
+            print(f"line {lineno}: not a SIREN: {siren[:40]!r}", file=sys.stderr)
+            if invalid is not None:
+                invalid.append(lineno)
+            continue
+        yield siren
+
+
+def cmd_enrich(args: argparse.Namespace) -> int:
+    from invest_registry.clients.france import FranceCompanySearchClient
+    from invest_registry.details import detail_cache
+
+    failed = 0
+    invalid: list[int] = []
+    # Details come from the shared detail cache and store; misses go upstream, in input
+    # order, `concurrency` at a time (the process-wide rate limiter still applies).
+    with (
+        _open_input(args.input) as lines,
+        FranceCompanySearchClient() as client,
+        ThreadPoolExecutor(max_workers=args.concurrency) as pool,
+    ):
+        sirens = _read_sirens(lines, invalid)
+
+        def _fetch(siren: str):
+            try:
+                return siren, detail_cache.fetch(siren, client), None
+            except Exception as e:  # noqa: BLE001 - reported per SIREN, the rest carries on
+                return siren, None, e
+
+        while batch := list(islice(sirens, args.concurrency * 4)):
+            for siren, details, error in pool.map(_fetch, batch):
+                if error is not None:
+                    failed += 1
+                    print(f"{siren}: {error}", file=sys.stderr)
+                elif details is None:
+                    print(f"{siren}: not found", file=sys.stderr)
+                else:
+                    sys.stdout.write(details.model_dump_json() + "\n")
+            sys.stdout.flush()
+    return 1 if failed or invalid else 0
+
+
+def cmd_mark_reviewed(args: argparse.Namespace) -> int:
+    from invest_registry.reviewed import mark_reviewed, reviewed_sirens
+
+    invalid: list[int] = []
+    with _open_input(args.input) as lines:
+        added = mark_reviewed(_read_sirens(lines, invalid))
+    print(f"{added} new · {len(reviewed_sirens())} reviewed", file=sys.stderr)
+    return 1 if invalid else 0
+
+
+def cmd_watch(args: argparse.Namespace) -> int:
+    from invest_registry.watchlist import Watchlist
+
+    watchlist = Watchlist()
+    invalid: list[int] = []
+    if args.action == "add":
+        with _open_input(args.input) as lines:
+            added = watchlist.add(_read_sirens(lines, invalid), priority=args.priority)
+        print(f"{added} new · {len(watchlist)} watched", file=sys.stderr)
+    elif args.action == "remove":
+        with _open_input(args.input) as lines:
+            removed = watchlist.remove(_read_sirens(lines, invalid))
+        print(f"{removed} removed · {len(watchlist)} watched", file=sys.stderr)
+    elif args.action == "list":
+        for e in sorted(watchlist.entries(), key=lambda e: e.next_due):
+            _emit(
+                {
+                    "siren": e.siren,
+                    "priority": e.priority,
+                    "last_checked": _iso(e.last_checked) if e.last_checked else None,
+                    "next_due": _iso(e.next_due),
+                    "interval_hours": round(e.interval_seconds / 3600, 1),
+                    "checks": e.checks,
+                    "changes": e.changes,
+                    "missing": e.missing,
+                    **e.values,
+                }
+            )
+    elif args.action == "refresh":
+        from invest_registry.clients.france import FranceCompanySearchClient
+
+        with FranceCompanySearchClient() as client:
+            report = watchlist.refresh(
+                client, limit=args.limit, concurrency=args.concurrency, force=args.all
+            )
+        for change in report.changes:
+            _emit({**asdict(change), "detected_at": _iso(change.detected_at)})
+        print(
+            f"{report.checked} checked · {report.changed} changed · "
+            f"{report.missing} not found · {report.failed} failed",
+            file=sys.stderr,
+        )
+        return 1 if report.failed else 0
+    else:  # changes
+        since = datetime.fromisoformat(args.since).timestamp() if args.since else 0.0
+        for change in watchlist.iter_changes(since=since, siren=args.siren):
+            _emit({**asdict(change), "detected_at": _iso(change.detected_at)})
+    return 1 if invalid else 0
+
+
+def _csv_values(raw: str | None) -> list[str]:
+    return [v.strip() for v in (raw or "").split(",") if v.strip()]
+
+
+def cmd_segments(args: argparse.Namespace) -> int:
+    from invest_registry.clients.france import FranceCompanySearchClient, FranceSearchParams
+    from invest_registry.segments import count_cache, market_map
+
+    naf, invalid = normalize_naf_override(args.naf)
+    if invalid:
+        args.parser.error(f"invalid NAF code(s): {', '.join(invalid)}")
+    dimensions = {
+        name: values
+        for name, values in (
+            ("naf", _csv_values(naf)),
+            ("departement", _csv_values(args.departement)),
+            ("tranche_effectif_salarie", _csv_values(args.tranche)),
+            ("etat_administratif", _csv_values(args.etat)),
+        )
+        if values
+    }
+    if not dimensions:
+        args.parser.error("give at least one of --naf, --departement, --tranche, --etat")
+    pivot = _csv_values(args.pivot)
+    if pivot and (len(pivot) != 2 or not set(pivot) <= set(dimensions)):
+        args.parser.error(f"--pivot takes two of: {', '.join(dimensions)}")
+
+    with FranceCompanySearchClient() as client:
+        try:
+            result = market_map(
+                client,
+                dimensions,
+                base=FranceSearchParams(q=args.q.strip(), etat_administratif="A"),
+                concurrency=args.concurrency,
+                cache=None if args.no_cache else count_cache(),
+            )
+        except ValueError as e:
+            args.parser.error(str(e))
+    if pivot:
+        for value, columns in result.pivot(*pivot).items():
+            _emit({pivot[0]: value, **columns})
+    else:
+        for row in result.rows():
+            _emit(row)
+    print(
+        f"{result.total} companies · {len(result.cells)} cells · {result.requests} requests "
+        f"({result.cached} cached, {result.pruned} empty cells skipped)",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def cmd_sample(args: argparse.Namespace) -> int:
+    from invest_registry.clients.france import FranceCompanySearchClient
+    from invest_registry.sampling import SampleEstimate, sample_estimate
+    from invest_registry.settings import get_settings
+
+    adv = _pull_options(args)
+    searches, filters = pull_plan(pack_name=args.pack, paris_only=args.paris_only, adv=adv)
+    departements = _csv_values(args.by_departement)
+    if departements:
+        searches = [replace(s, departement=d) for s in searches for d in departements]
+
+    def _progress(e: SampleEstimate) -> None:
+        print(
+            f"{e.pages_fetched} pages · {e.share:.1%} ± {e.margin:.1%} of {e.population}",
+            file=sys.stderr,
+        )
+
+    with FranceCompanySearchClient() as client:
+        try:
+            estimate = sample_estimate(
+                client,
+                searches,
+                postal_code_prefix=filters["postal_code_prefix"],
+                min_creation_date=filters["min_creation_date"],
+                is_employer=filters["is_employer"],
+                per_page=filters["per_page"],
+                margin=args.margin,
+                confidence=args.confidence,
+                max_pages=args.page_budget,
+                concurrency=args.concurrency,
+                max_page=get_settings().france_api_max_page,
+                seed=args.seed,
+                on_round=_progress,
+            )
+        except ValueError as e:
+            args.parser.error(f"{e}; try --by-departement")
+    _emit(
+        {
+            "share": estimate.share,
+            "low": estimate.low,
+            "high": estimate.high,
+            "confidence": estimate.confidence,
+            "count": round(estimate.count),
+            "count_low": round(estimate.count_low),
+            "count_high": round(estimate.count_high),
+            "population": estimate.population,
+            "pages_fetched": estimate.pages_fetched,
+            "records_seen": estimate.records_seen,
+            "stopped": estimate.stopped,
+            "strata": [
+                {
+                    "activite_principale": s.search.activite_principale,
+                    "section_activite_principale": s.search.section_activite_principale,
+                    "departement": s.search.departement,
+                    "population": s.population,
+                    "pages_sampled": s.pages_sampled,
+                    "pages_total": s.pages_total,
+                    "share": s.share,
+                }
+                for s in estimate.strata
+            ],
+        }
+    )
+    return 0
+
+
+def cmd_export(args: argparse.Namespace) -> int:
+    export.run(args, args.parser)
+    return 0
+
+
+def cmd_cache_stats(args: argparse.Namespace) -> int:
+    from invest_registry.details import detail_store_dir
+    from invest_registry.jobs import list_jobs
+    from invest_registry.reviewed import reviewed_path, reviewed_sirens
+    from invest_registry.storage import cache_dir
+
+    root = cache_dir()
+    for path in sorted(root.glob("*.ndjson")) + sorted(root.glob("*.json")):
+        stat = path.stat()
+        with path.open("rb") as f:
+            records = (
+                sum(1 for line in f if line.strip())
+                if path.suffix == ".ndjson"
+                else len(json.load(f))
+            )
+        _emit(
+            {
+                "cache": "records",
+                "key": path.stem,
+                "records": records,
+                "bytes": stat.st_size,
+                "modified": _iso(stat.st_mtime),
+            }
+        )
+
+    for name, directory in (
+        ("details", detail_store_dir()),
+        ("social", root / "social"),
+        ("profiles", root / "profiles"),
+        ("watchlist", root / "watchlist"),
+        ("segments", root / "segments"),
+    ):
+        files = [p for p in directory.glob("*") if p.is_file()] if directory.exists() else []
+        stats = [p.stat() for p in files]
+        _emit(
+            {
+                "cache": name,
+                "entries": len(files),
+                "bytes": sum(s.st_size for s in stats),
+                "modified": _iso(max(s.st_mtime for s in stats)) if stats else None,
+            }
+        )
+
+    reviewed = reviewed_path()
+    stat = reviewed.stat() if reviewed.exists() else None
+    _emit(
+        {
+            "cache": "reviewed",
+            "entries": len(reviewed_sirens()),
+            "bytes": stat.st_size if stat else 0,
+            "modified": _iso(stat.st_mtime) if stat else None,
+        }
+    )
+
+    for info in list_jobs():
+        _emit(
+            {
+                "cache": "job",
+                "key": info.job_id,
+                "label": info.label,
+                "status": info.status,
+                "records": info.records_kept,
+                "target_count": info.target_count,
+                "pages_fetched": info.pages_fetched,
+                "modified": info.updated_at,
+            }
+        )
+    return 0
+
+
+def _add_pull_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--pack", default="blossom_like_france")
+    parser.add_argument("--paris-only", action="store_true", help="postal code starts with 75")
+    parser.add_argument("--target", type=int, default=50, help="companies to fetch")
+    parser.add_argument("--q", default="", help="keyword / name search")
+    parser.add_argument(
+        "--naf", help="NAF codes or prefixes overriding the pack's, e.g. 62.01Z,58.2 or J"
+    )
+    parser.add_argument(
+        "--tranche",
+        default=TRANCHE_EFFECTIF_LT20,
+        help="tranche_effectif_salarie codes (CSV), '' for any",
+    )
+    parser.add_argument("--etat", default="A", choices=["A", "C", ""], help="'' for any")
+    parser.add_argument("--per-page", type=int, default=PER_PAGE_MAX)
+    parser.add_argument("--max-pages", type=int, default=0, help="per search, 0 means no cap")
+    parser.add_argument("--postal-prefix", help="post-filter, overrides --paris-only")
+    parser.add_argument(
+        "--founded-within",
+        type=int,
+        default=FOUNDED_WITHIN_YEARS,
+        help="years, 0 disables the filter",
+    )
+    parser.add_argument("--employer", choices=list(EMPLOYER_FILTERS), default="any")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="invest-registry",
+        description="Registry pulls, enrichment and exports as NDJSON, without the UI.",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    pull = sub.add_parser("pull", help="pull companies for a query pack (NDJSON records)")
+    _add_pull_arguments(pull)
+    pull.add_argument("--ranked", action="store_true", help="keep the newest companies")
+    pull.add_argument("--no-cache", action="store_true", help="bypass the local disk cache")
+    pull.add_argument(
+        "--skip-reviewed", action="store_true", help="leave out companies marked as reviewed"
+    )
+    pull.set_defaults(func=cmd_pull, parser=pull)
+
+    harvest = sub.add_parser(
+        "harvest",
+        help="run a pull as a job on several worker processes (NDJSON records when done)",
+        description="Sharded harvest: page ranges spread over worker processes that share one "
+        "API rate limit. Checkpointed, so --job resumes an interrupted harvest.",
+    )
+    _add_pull_arguments(harvest)
+    harvest.add_argument("--job", help="resume this job instead of starting a new one")
+    harvest.add_argument("--workers", type=int, default=HARVEST_WORKERS)
+    harvest.add_argument("--pages-per-unit", type=int, default=PAGES_PER_UNIT)
+    harvest.set_defaults(func=cmd_harvest, parser=harvest)
+
+    enrich = sub.add_parser(
+        "enrich", help="fetch company details (dirigeants, finances) for NDJSON records or SIRENs"
+    )
+    enrich.add_argument("--input", default="-", help="NDJSON records or SIRENs, '-' for stdin")
+    enrich.add_argument("--concurrency", type=int, default=ENRICH_CONCURRENCY)
+    enrich.set_defaults(func=cmd_enrich, parser=enrich)
+
+    reviewed = sub.add_parser(
+        "mark-reviewed", help="add NDJSON records or SIRENs to the reviewed set"
+    )
+    reviewed.add_argument("--input", default="-", help="NDJSON records or SIRENs, '-' for stdin")
+    reviewed.set_defaults(func=cmd_mark_reviewed, parser=reviewed)
+
+    watch = sub.add_parser(
+        "watch",
+        help="watch companies for changes (dirigeants, headcount, closure, filed accounts)",
+        description="Refreshes due companies, most overdue first, and prints detected changes "
+        "as NDJSON. Each company is checked more often when it changes, less when it does not.",
+    )
+    actions = watch.add_subparsers(dest="action", required=True)
+    for name, help_text in (("add", "watch NDJSON records or SIRENs"), ("remove", "stop watching")):
+        action = actions.add_parser(name, help=help_text)
+        action.add_argument("--input", default="-", help="NDJSON records or SIRENs, '-' for stdin")
+        if name == "add":
+            action.add_argument(
+                "--priority", type=float, default=1.0, help="higher refreshes first"
+            )
+    refresh = actions.add_parser("refresh", help="check due companies, print changes")
+    refresh.add_argument("--limit", type=int, help="companies to check at most")
+    refresh.add_argument("--all", action="store_true", help="check every company, due or not")
+    refresh.add_argument("--concurrency", type=int, default=ENRICH_CONCURRENCY)
+    changes = actions.add_parser("changes", help="print the change feed")
+    changes.add_argument("--since", help="ISO timestamp, e.g. 2026-10-01T00:00:00+00:00")
+    changes.add_argument("--siren")
+    actions.add_parser("list", help="watched companies, next due first")
+    watch.set_defaults(func=cmd_watch, parser=watch)
+
+    segments = sub.add_parser(
+        "segments",
+        help="count companies per segment without downloading records (NDJSON cells)",
+        description="Sizes every combination of the given dimension values with count-only "
+        "queries. Each option is a CSV of values and adds a dimension; active companies only "
+        "unless --etat is given.",
+    )
+    segments.add_argument("--naf", help="NAF codes or prefixes, e.g. 62.01Z,58.2,J")
+    segments.add_argument("--departement", help="department codes, e.g. 75,92,69")
+    segments.add_argument("--tranche", help="tranche_effectif_salarie codes, e.g. 00,01,02")
+    segments.add_argument("--etat", help="administrative states, e.g. A,C")
+    segments.add_argument("--q", default="", help="keyword / name search shared by every cell")
+    segments.add_argument("--pivot", help="two dimensions, e.g. naf,departement: print a table")
+    segments.add_argument("--concurrency", type=int, default=SEGMENT_CONCURRENCY)
+    segments.add_argument("--no-cache", action="store_true", help="bypass the local count cache")
+    segments.set_defaults(func=cmd_segments, parser=segments)
+
+    sample = sub.add_parser(
+        "sample",
+        help="estimate the share of a pull's companies passing its filters, from random pages",
+        description="Reads random pages of each search (stratum) until the confidence interval "
+        "on the share of companies passing the post-filters (--founded-within, --postal-prefix, "
+        "--employer) is tight enough. Prints one JSON object with the estimate.",
+    )
+    _add_pull_arguments(sample)
+    sample.add_argument("--by-departement", help="also stratify by these departments, e.g. 75,92")
+    sample.add_argument(
+        "--margin", type=float, default=SAMPLE_MARGIN, help="target ± on the share"
+    )
+    sample.add_argument("--confidence", type=float, default=SAMPLE_CONFIDENCE)
+    sample.add_argument("--page-budget", type=int, default=SAMPLE_MAX_PAGES, help="pages at most")
+    sample.add_argument("--concurrency", type=int, default=SAMPLE_CONCURRENCY)
+    sample.add_argument("--seed", type=int, help="for a reproducible draw")
+    sample.set_defaults(func=cmd_sample, parser=sample)
+
+    exp = sub.add_parser(
+        "export",
+        help="write records as CSV, NDJSON or Parquet",
+        description="Export a job, a cached pull or, with neither, NDJSON records on stdin.",
+    )
+    export.add_arguments(exp)
+    exp.set_defaults(func=cmd_export, parser=exp)
+
+    stats = sub.add_parser("cache-stats", help="local caches, stores and jobs (NDJSON)")
+    stats.set_defaults(func=cmd_cache_stats, parser=stats)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except BrokenPipeError:
+        # The reader went away (e.g. `| head`): stop quietly, like other Unix tools.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
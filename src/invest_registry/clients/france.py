@@ -1,14 +1,47 @@
-from dataclasses import dataclass
-from datetime import date
+import email.utils
+import heapq
+import threading
+import time
+from collections.abc import Callable, Container
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime
+from typing import TYPE_CHECKING, Any
+
+from invest_registry.metrics import metrics
+from invest_registry.models import CompanyRecord, FranceSearchResponse, FranceSearchResult
+from invest_registry.profiling import span
+from invest_registry.rate_limit import RateLimiter, SharedRateLimiter
 
-import httpx
-from tenacity import Retrying, retry_if_exception, stop_after_attempt, wait_exponential
+if TYPE_CHECKING:
+    import httpx
+    from tenacity import RetryCallState
 
-from invest_registry.models import CompanyRecord, FranceSearchResponse, FranceSearchResult
-from invest_registry.settings import Settings, settings
+    from invest_registry.settings import Settings
 
+# httpx, tenacity and the settings are imported where first used, so modules that
+# only need the params, records and collector types load fast.
 
 PER_PAGE_MAX = 25
+RETRY_AFTER_MAX_SECONDS = 60.0
+
+_shared_rate_limiter: RateLimiter | None = None
+_shared_rate_limiter_lock = threading.Lock()
+
+
+def _default_settings() -> "Settings":
+    from invest_registry.settings import get_settings
+
+    return get_settings()
+
+
+def shared_rate_limiter(app_settings: "Settings | None" = None) -> RateLimiter:
+    """Process-wide limiter, so every client in this process shares one API budget."""
+    global _shared_rate_limiter
+    with _shared_rate_limiter_lock:
+        if _shared_rate_limiter is None:
+            rate = (app_settings or _default_settings()).france_api_rate_limit_per_second
+            _shared_rate_limiter = RateLimiter(rate)
+        return _shared_rate_limiter
 
 
 @dataclass(frozen=True)
@@ -20,9 +53,13 @@ class FranceSearchParams:
     etat_administratif: str | None = "A"
     minimal: bool | None = None
     include: str | None = None
+    section_activite_principale: str | None = None  # NAF section letters, e.g. "J,M"
+    departement: str | None = None  # CSV of department codes, e.g. "75,92"
 
 
 def _should_retry(exc: BaseException) -> bool:
+    import httpx
+
     if isinstance(exc, (httpx.TimeoutException, httpx.TransportError)):
         return True
     if isinstance(exc, httpx.HTTPStatusError):
@@ -30,14 +67,40 @@ def _should_retry(exc: BaseException) -> bool:
     return False
 
 
+def _retry_after_seconds(exc: BaseException | None) -> float | None:
+    """Server-requested delay of a 429/503 response (delta-seconds or HTTP date), capped."""
+    import httpx
+
+    if not isinstance(exc, httpx.HTTPStatusError) or exc.response.status_code not in {429, 503}:
+        return None
+    raw = exc.response.headers.get("retry-after")
+    if raw is None:
+        return None
+    try:
+        seconds = float(raw)
+    except ValueError:
+        try:
+            when = email.utils.parsedate_to_datetime(raw)
+        except (TypeError, ValueError):
+            return None
+        seconds = (when - datetime.now(UTC)).total_seconds()
+    return min(max(seconds, 0.0), RETRY_AFTER_MAX_SECONDS)
+
+
 class FranceCompanySearchClient:
     def __init__(
         self,
         *,
-        app_settings: Settings = settings,
-        http: httpx.Client | None = None,
+        app_settings: "Settings | None" = None,
+        http: "httpx.Client | None" = None,
+        rate_limiter: RateLimiter | SharedRateLimiter | None = None,
+        priority: str = "normal",
     ) -> None:
-        self._settings = app_settings
+        import httpx
+
+        self._settings = app_settings or _default_settings()
+        self._rate_limiter = rate_limiter or shared_rate_limiter(self._settings)
+        self._priority = priority
         self._http = http or httpx.Client(
             base_url=self._settings.france_api_base_url,
             timeout=httpx.Timeout(self._settings.http_timeout_seconds),
@@ -54,16 +117,37 @@ class FranceCompanySearchClient:
         self.close()
 
     def _get_json(self, path: str, *, params: dict[str, str | int | bool]) -> dict:
+        from tenacity import Retrying, retry_if_exception, stop_after_attempt, wait_exponential
+
+        backoff_s = self._settings.http_retry_backoff_seconds
+        backoff = wait_exponential(multiplier=backoff_s, min=backoff_s, max=8)
+
+        def _wait(retry_state: "RetryCallState") -> float:
+            outcome = retry_state.outcome
+            retry_after = _retry_after_seconds(outcome.exception() if outcome else None)
+            return retry_after if retry_after is not None else backoff(retry_state)
+
         retrying = Retrying(
             retry=retry_if_exception(_should_retry),
-            wait=wait_exponential(multiplier=0.5, min=0.5, max=8),
+            wait=_wait,
             stop=stop_after_attempt(self._settings.http_max_retries),
             reraise=True,
         )
 
         for attempt in retrying:
             with attempt:
-                resp = self._http.get(path, params=params)
+                if attempt.retry_state.attempt_number > 1:
+                    metrics.inc("france_api_retries_total")
+                self._rate_limiter.acquire(priority=self._priority)
+                # Latency excludes the rate-limiter wait: it measures the API, not our budget.
+                status = "error"
+                try:
+                    with metrics.timer("france_api_request_seconds"):
+                        resp = self._http.get(path, params=params)
+                    status = str(resp.status_code)
+                    metrics.inc("france_api_response_bytes_total", len(resp.content))
+                finally:
+                    metrics.inc("france_api_requests_total", status=status)
                 resp.raise_for_status()
                 return resp.json()
 
@@ -86,8 +170,12 @@ class FranceCompanySearchClient:
         }
         if search.activite_principale:
             params["activite_principale"] = search.activite_principale
+        if search.section_activite_principale:
+            params["section_activite_principale"] = search.section_activite_principale
         if search.code_postal:
             params["code_postal"] = search.code_postal
+        if search.departement:
+            params["departement"] = search.departement
         if search.tranche_effectif_salarie:
             params["tranche_effectif_salarie"] = search.tranche_effectif_salarie
         if search.etat_administratif:
@@ -100,8 +188,10 @@ class FranceCompanySearchClient:
                 params["minimal"] = True
             params["include"] = search.include
 
-        data = self._get_json("/search", params=params)
-        return FranceSearchResponse.model_validate(data)
+        with span("http"):
+            data = self._get_json("/search", params=params)
+        with span("model_validate"):
+            return FranceSearchResponse.model_validate(data)
 
     def iter_results(
         self,
@@ -166,6 +256,54 @@ def normalize_france_result(r: FranceSearchResult) -> CompanyRecord:
     )
 
 
+def passes_filters(
+    record: CompanyRecord,
+    *,
+    postal_code_prefix: str | None = None,
+    min_creation_date: date | None = None,
+    is_employer: bool | None = None,
+) -> bool:
+    """The post-filters the API cannot apply itself (see `collect_companies`)."""
+    if min_creation_date and (
+        not record.creation_date or record.creation_date < min_creation_date
+    ):
+        return False
+    if postal_code_prefix and (
+        not record.postal_code or not record.postal_code.startswith(postal_code_prefix)
+    ):
+        return False
+    return is_employer is None or record.is_employer is is_employer
+
+
+@dataclass(frozen=True)
+class CollectProgress:
+    pages_fetched: int
+    results_seen: int  # raw API results, before dedup and filters
+    records_kept: int
+    reachable_pages: int  # pages collect_companies may fetch, given caps and total_pages
+    new_records: tuple[CompanyRecord, ...] = ()  # kept since the last report (first-N mode)
+
+    @property
+    def pass_rate(self) -> float | None:
+        if not self.results_seen:
+            return None
+        return self.records_kept / self.results_seen
+
+
+@dataclass
+class CollectState:
+    """Paging state of a collect_companies run, updated in place.
+
+    Passing the same state to a later call resumes paging where it stopped: searches
+    with a known `total_pages` skip their first-page request, and SIRENs in `seen`
+    are not returned again.
+    """
+
+    next_page: dict[FranceSearchParams, int] = field(default_factory=dict)
+    total_pages: dict[FranceSearchParams, int] = field(default_factory=dict)
+    seen: set[str] = field(default_factory=set)
+
+
 def collect_companies(
     client: FranceCompanySearchClient,
     *,
@@ -175,57 +313,180 @@ def collect_companies(
     max_pages_per_search: int | None = 2,
     postal_code_prefix: str | None = None,
     min_creation_date: date | None = None,
+    is_employer: bool | None = None,
+    rank_key: Callable[[CompanyRecord], Any] | None = None,
+    rank_key_monotonic: bool = False,
+    on_page: Callable[[CollectProgress], None] | None = None,
+    should_stop: Callable[[], bool] | None = None,
+    state: CollectState | None = None,
+    exclude: Container[str] | None = None,
 ) -> list[CompanyRecord]:
-    seen: set[str] = set()
+    """Page through `searches` and return up to `target_count` filtered records.
+
+    By default the first `target_count` records that pass the filters are returned,
+    in API order. With `rank_key`, every reachable page is scanned (within
+    `max_pages_per_search`) and the `target_count` records with the highest key are
+    returned, best first. Set `rank_key_monotonic` when the API returns each search
+    in non-increasing key order: a search then stops as soon as one of its pages
+    cannot beat the current cut-off.
+
+    `on_page` is called after every processed page, once `state` reflects it;
+    `should_stop` is checked before every page fetch and ends collection early with
+    what was kept so far. SIRENs in `exclude` (e.g. `reviewed.reviewed_sirens()`)
+    are skipped like duplicates, so they do not count towards `target_count`.
+    """
+    state = state if state is not None else CollectState()
+    seen = state.seen
+    started = time.perf_counter()
+    metrics.inc("collect_runs_total")
     out: list[CompanyRecord] = []
+    heap: list[tuple[Any, int, CompanyRecord]] = []
+    ranked = rank_key is not None
+    pages_fetched = 0
+    results_seen = 0
+    reported = 0
+    page_floor: Any = None  # lowest rank key among the last page's normalized records
 
     # Round-robin paging across searches until we have enough *filtered* records.
     # This avoids the "fetch N then filter" failure mode when filters are strict.
-    first_pages: list[tuple[FranceSearchParams, FranceSearchResponse]] = []
-    total_pages_by_q: dict[FranceSearchParams, int] = {}
-    next_page_by_q: dict[FranceSearchParams, int] = {}
+    first_pages: list[tuple[FranceSearchParams, FranceSearchResponse | None]] = []
+    total_pages_by_q = state.total_pages
+    next_page_by_q = state.next_page
+    done: set[FranceSearchParams] = set()
 
     for s in searches:
+        next_page_by_q.setdefault(s, 1)
+        if s in total_pages_by_q:
+            first_pages.append((s, None))
+            continue
+        if should_stop and should_stop():
+            break
         resp = client.search(search=s, page=1, per_page=per_page)
+        pages_fetched += 1
+        metrics.inc("collect_pages_fetched_total")
         first_pages.append((s, resp))
         total_pages_by_q[s] = resp.total_pages
-        next_page_by_q[s] = 1
+
+    reachable_pages = sum(
+        min(tp, max_pages_per_search) if max_pages_per_search is not None else tp
+        for tp in total_pages_by_q.values()
+    )
+
+    def _report() -> None:
+        nonlocal reported
+        if on_page is None:
+            return
+        on_page(
+            CollectProgress(
+                pages_fetched=pages_fetched,
+                results_seen=results_seen,
+                records_kept=len(heap) if ranked else len(out),
+                reachable_pages=reachable_pages,
+                new_records=tuple(out[reported:]),
+            )
+        )
+        reported = len(out)
+
+    def _result() -> list[CompanyRecord]:
+        if ranked:
+            return [r for _, _, r in sorted(heap, key=lambda e: (e[0], -e[1]), reverse=True)]
+        return out
+
+    def _finish(result: list[CompanyRecord]) -> list[CompanyRecord]:
+        elapsed = time.perf_counter() - started
+        kept = len(heap) if ranked else len(out)
+        if results_seen:
+            metrics.set("collect_last_pass_rate", kept / results_seen)
+        if elapsed > 0:
+            metrics.set("collect_last_records_per_second", kept / elapsed)
+        return result
+
+    def _keep(record: CompanyRecord, key: Any) -> bool:
+        if not ranked:
+            out.append(record)
+            return len(out) >= target_count
+        entry = (key, len(seen), record)
+        if len(heap) < target_count:
+            heapq.heappush(heap, entry)
+        elif entry[0] > heap[0][0]:
+            heapq.heapreplace(heap, entry)
+        return False
 
     def _process(resp: FranceSearchResponse) -> bool:
+        seen_before, kept_before = results_seen, len(seen)
+        try:
+            return _filter_page(resp)
+        finally:
+            kept = len(seen) - kept_before
+            metrics.inc("collect_results_seen_total", results_seen - seen_before)
+            metrics.inc("collect_records_kept_total", kept)
+            if kept:
+                metrics.inc("collect_pages_used_total")
+
+    def _filter_page(resp: FranceSearchResponse) -> bool:
+        nonlocal results_seen, page_floor
+        page_floor = None
         for item in resp.results:
+            results_seen += 1
             if item.siren in seen:
                 continue
+            if exclude is not None and item.siren in exclude:
+                metrics.inc("collect_excluded_total")
+                continue
             record = normalize_france_result(item)
-            if min_creation_date:
-                if not record.creation_date or record.creation_date < min_creation_date:
-                    continue
-            if postal_code_prefix:
-                if not record.postal_code or not record.postal_code.startswith(postal_code_prefix):
-                    continue
+            key = rank_key(record) if ranked else None
+            if ranked and rank_key_monotonic and (page_floor is None or key < page_floor):
+                page_floor = key
+            if not passes_filters(
+                record,
+                postal_code_prefix=postal_code_prefix,
+                min_creation_date=min_creation_date,
+                is_employer=is_employer,
+            ):
+                continue
             seen.add(item.siren)
-            out.append(record)
-            if len(out) >= target_count:
+            if _keep(record, key):
                 return True
         return False
 
-    while len(out) < target_count:
+    def _cannot_improve() -> bool:
+        # Later pages of a monotonic search only hold keys <= this page's floor. The
+        # floor only covers records `_filter_page` normalized (not already seen or
+        # excluded ones), which can only make it higher, never stop a search early.
+        if not rank_key_monotonic or len(heap) < target_count or page_floor is None:
+            return False
+        return page_floor <= heap[0][0]
+
+    while ranked or len(out) < target_count:
         progressed = False
         for s, first_resp in first_pages:
+            if s in done:
+                continue
             page = next_page_by_q[s]
             total_pages = total_pages_by_q[s]
             if page > total_pages:
                 continue
             if max_pages_per_search is not None and page > max_pages_per_search:
                 continue
-
-            resp = first_resp if page == 1 else client.search(search=s, page=page, per_page=per_page)
+            if should_stop and should_stop():
+                return _finish(_result())
+
+            if page == 1 and first_resp is not None:
+                resp = first_resp
+            else:
+                resp = client.search(search=s, page=page, per_page=per_page)
+                pages_fetched += 1
+                metrics.inc("collect_pages_fetched_total")
             progressed = True
-            if _process(resp):
-                return out
+            finished = _process(resp)
             next_page_by_q[s] = page + 1
+            _report()
+            if finished:
+                return _finish(out)
+            if ranked and _cannot_improve():
+                done.add(s)
 
         if not progressed:
             break
 
-    return out
-
+    return _finish(_result())
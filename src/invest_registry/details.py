@@ -0,0 +1,285 @@
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from pydantic import ValidationError
+
+from invest_registry.clients.france import FranceCompanySearchClient, FranceSearchParams
+from invest_registry.metrics import metrics
+from invest_registry.models import FranceSearchResult
+from invest_registry.profiling import span
+from invest_registry.storage import cache_dir
+
+DETAIL_INCLUDE = "dirigeants,siege,complements,finances"
+DETAIL_TTL_SECONDS = 6 * 60 * 60
+DETAIL_CACHE_MAX_ENTRIES = 2048
+STORE_REFRESH_SECONDS = 10.0  # how stale the cross-company indexes may get (other writers)
+STORE_MTIME_SLACK_SECONDS = 2.0  # coarse filesystem timestamps
+PREFETCH_WORKERS = 2
+
+log = logging.getLogger(__name__)
+
+
+def fetch_details_by_siren(
+    client: FranceCompanySearchClient,
+    siren: str,
+    *,
+    include: str = DETAIL_INCLUDE,
+) -> FranceSearchResult | None:
+    resp = client.search(
+        search=FranceSearchParams(q=siren, minimal=True, include=include),
+        per_page=1,
+    )
+    for r in resp.results:
+        if r.siren == siren:
+            return r
+    return resp.results[0] if resp.results else None
+
+
+def detail_store_dir() -> Path:
+    d = cache_dir() / "details"
+    d.mkdir(parents=True, exist_ok=True)
+    return d
+
+
+_store_writes = 0  # details saved by this process; lets the indexes skip idle rescans
+
+
+def save_details(result: FranceSearchResult) -> None:
+    global _store_writes
+    path = detail_store_dir() / f"{result.siren}.json"
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(result.model_dump_json(), encoding="utf-8")
+    os.replace(tmp, path)
+    _store_writes += 1
+
+
+def load_stored_details(
+    siren: str,
+    *,
+    max_age_seconds: float | None = None,
+) -> FranceSearchResult | None:
+    path = detail_store_dir() / f"{siren}.json"
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        return None
+    if max_age_seconds is not None and time.time() - mtime > max_age_seconds:
+        return None
+    return _read_stored(path)
+
+
+def _read_stored(path: Path) -> FranceSearchResult | None:
+    """Parse one store file; an unreadable or corrupt one is logged and reads as missing."""
+    try:
+        return FranceSearchResult.model_validate_json(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValidationError) as e:
+        metrics.inc("detail_store_unreadable_total")
+        log.warning("skipping unreadable detail store file %s: %s", path, e)
+        return None
+
+
+def iter_stored_details(*, since: float = 0.0) -> Iterator[tuple[float, FranceSearchResult]]:
+    """(mtime, details) for every readable stored company written at or after `since`.
+
+    `since` is in epoch seconds. Files that vanish or fail to parse are skipped.
+    """
+    with os.scandir(detail_store_dir()) as it:
+        for entry in it:
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                mtime = entry.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            if mtime < since:
+                continue
+            details = _read_stored(Path(entry.path))
+            if details is not None:
+                yield mtime, details
+
+
+class StoreFollower:
+    """Incremental reader of the detail store, for the indexes built on top of it.
+
+    `changes()` yields the details written since the previous call. Its watermark trails
+    the previous scan's start by `STORE_MTIME_SLACK_SECONDS`, so files written during a
+    scan (or stamped with a coarse mtime) are picked up next time; files already read
+    with the same mtime are skipped. `stale()` tells whether a rescan is worth it: this
+    process saved details since, or `min_interval` seconds went by (other writers).
+    """
+
+    def __init__(self) -> None:
+        self._watermark = 0.0
+        self._seen: dict[str, float] = {}  # siren -> mtime, for files at/after the watermark
+        self._writes = -1
+        self._scanned_at = -math.inf
+
+    def stale(self, min_interval: float = 0.0) -> bool:
+        return (
+            self._writes != _store_writes
+            or time.monotonic() - self._scanned_at >= min_interval
+        )
+
+    def changes(self) -> Iterator[FranceSearchResult]:
+        writes, started = _store_writes, time.time()
+        watermark = started - STORE_MTIME_SLACK_SECONDS
+        seen: dict[str, float] = {}
+        for mtime, details in iter_stored_details(since=self._watermark):
+            if mtime >= watermark:
+                seen[details.siren] = mtime
+            if self._seen.get(details.siren) != mtime:
+                yield details
+        self._watermark, self._seen = watermark, seen
+        self._writes, self._scanned_at = writes, time.monotonic()
+
+
+class DetailCache:
+    """Process-wide TTL cache of company details, shared by the Deep Dive page and prefetch.
+
+    Fetched details are also written to the local detail store (`.cache/details/`),
+    which backs the cache across restarts and feeds cross-company indexes.
+    Concurrent requests for the same SIREN share one upstream call: the first caller
+    fetches, the others wait for its result. At most `max_entries` companies are kept
+    in memory, least recently used first out.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float = DETAIL_TTL_SECONDS,
+        persist: bool = True,
+        max_entries: int = DETAIL_CACHE_MAX_ENTRIES,
+    ) -> None:
+        self._ttl = ttl_seconds
+        self._persist = persist
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, FranceSearchResult | None]] = OrderedDict()
+        self._inflight: dict[str, threading.Event] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _put(self, siren: str, value: FranceSearchResult | None) -> None:
+        # Caller holds self._lock.
+        self._entries[siren] = (time.monotonic(), value)
+        self._entries.move_to_end(siren)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            metrics.inc("cache_evictions_total", cache="details")
+
+    def get(self, siren: str) -> tuple[bool, FranceSearchResult | None]:
+        with self._lock:
+            entry = self._entries.get(siren)
+            if entry is not None and time.monotonic() - entry[0] > self._ttl:
+                del self._entries[siren]
+                metrics.inc("cache_evictions_total", cache="details")
+                entry = None
+            elif entry is not None:
+                self._entries.move_to_end(siren)
+        if entry is not None:
+            metrics.inc("cache_hits_total", cache="details")
+            return True, entry[1]
+        if self._persist:
+            with metrics.timer("cache_load_seconds", cache="detail_store"):
+                stored = load_stored_details(siren, max_age_seconds=self._ttl)
+            if stored is not None:
+                metrics.inc("cache_hits_total", cache="detail_store")
+                with self._lock:
+                    self._put(siren, stored)
+                return True, stored
+            metrics.inc("cache_misses_total", cache="detail_store")
+        metrics.inc("cache_misses_total", cache="details")
+        return False, None
+
+    def __contains__(self, siren: str) -> bool:
+        return self.get(siren)[0]
+
+    def fetch(self, siren: str, client: FranceCompanySearchClient) -> FranceSearchResult | None:
+        while True:
+            hit, value = self.get(siren)
+            if hit:
+                return value
+            with self._lock:
+                event = self._inflight.get(siren)
+                owner = event is None
+                if owner:
+                    event = self._inflight[siren] = threading.Event()
+            if not owner:
+                event.wait()
+                continue  # the owner may have failed; retry (or take over)
+            try:
+                value = fetch_details_by_siren(client, siren)
+                if value is not None and self._persist:
+                    save_details(value)
+                with self._lock:
+                    self._put(siren, value)
+                return value
+            finally:
+                with self._lock:
+                    self._inflight.pop(siren, None)
+                event.set()
+
+    def clear(self) -> None:
+        with self._lock:
+            metrics.inc("cache_evictions_total", len(self._entries), cache="details")
+            self._entries.clear()
+
+
+detail_cache = DetailCache()
+
+_prefetch_lock = threading.Lock()
+_prefetch_pool: ThreadPoolExecutor | None = None
+_prefetch_client: FranceCompanySearchClient | None = None
+_prefetch_queued: set[str] = set()
+
+
+def fetch_details(siren: str) -> FranceSearchResult | None:
+    """Details for one company, from the shared cache when warm."""
+    with span("fetch_details"):
+        hit, value = detail_cache.get(siren)
+        if hit:
+            return value
+        with FranceCompanySearchClient() as client:
+            return detail_cache.fetch(siren, client)
+
+
+def _prefetch_one(siren: str, client: FranceCompanySearchClient) -> None:
+    try:
+        detail_cache.fetch(siren, client)
+    except Exception:  # noqa: BLE001, S110 - best effort: the Deep Dive page
+        pass  # fetches (and reports errors) on demand
+    finally:
+        with _prefetch_lock:
+            _prefetch_queued.discard(siren)
+
+
+def prefetch_details(sirens: Iterable[str]) -> int:
+    """Warm the detail cache in the background at low rate-limit priority.
+
+    Returns the number of SIRENs queued (already cached or queued ones are skipped).
+    """
+    global _prefetch_pool, _prefetch_client
+    queued = 0
+    with _prefetch_lock:
+        if _prefetch_pool is None:
+            _prefetch_pool = ThreadPoolExecutor(
+                max_workers=PREFETCH_WORKERS, thread_name_prefix="detail-prefetch"
+            )
+            _prefetch_client = FranceCompanySearchClient(priority="low")
+        for siren in sirens:
+            if siren in _prefetch_queued or siren in detail_cache:
+                continue
+            _prefetch_queued.add(siren)
+            _prefetch_pool.submit(_prefetch_one, siren, _prefetch_client)
+            queued += 1
+    return queued
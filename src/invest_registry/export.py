@@ -0,0 +1,179 @@
+"""Streaming exporters for company records.
+
+Every writer consumes an iterable of records and writes it incrementally, so memory
+stays bounded by one chunk (CSV/NDJSON) or one row group (Parquet) whatever the
+number of rows.
+"""
+
+import argparse
+import csv
+import io
+import sys
+from collections.abc import Iterable, Iterator
+from itertools import islice
+from pathlib import Path
+from typing import BinaryIO
+
+from invest_registry.models import CompanyRecord
+
+EXPORT_FIELDS = [
+    "siren",
+    "name",
+    "naf",
+    "creation_date",
+    "employee_band",
+    "employee_band_year",
+    "is_employer",
+    "siret",
+    "postal_code",
+    "commune",
+    "departement",
+    "address",
+    "source",
+]
+
+EXPORT_FORMATS: dict[str, str] = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+CSV_CHUNK_ROWS = 1_000
+PARQUET_ROW_GROUP_SIZE = 10_000
+
+
+def _batches(records: Iterable[CompanyRecord], size: int) -> Iterator[list[CompanyRecord]]:
+    it = iter(records)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+def iter_csv_chunks(
+    records: Iterable[CompanyRecord],
+    *,
+    chunk_rows: int = CSV_CHUNK_ROWS,
+) -> Iterator[bytes]:
+    """UTF-8 CSV as a stream of chunks: the header, then `chunk_rows` rows at a time."""
+    buf = io.StringIO()
+    w = csv.DictWriter(buf, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+    w.writeheader()
+    for batch in _batches(records, chunk_rows):
+        for r in batch:
+            w.writerow(r.model_dump(mode="json"))
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():  # header only: no records at all
+        yield buf.getvalue().encode("utf-8")
+
+
+def iter_ndjson_chunks(
+    records: Iterable[CompanyRecord],
+    *,
+    chunk_rows: int = CSV_CHUNK_ROWS,
+) -> Iterator[bytes]:
+    for batch in _batches(records, chunk_rows):
+        yield "".join(r.model_dump_json() + "\n" for r in batch).encode("utf-8")
+
+
+def write_parquet(
+    records: Iterable[CompanyRecord],
+    fp: BinaryIO | str | Path,
+    *,
+    row_group_size: int = PARQUET_ROW_GROUP_SIZE,
+) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:  # pragma: no cover - depends on the environment
+        raise RuntimeError(
+            "Parquet export requires pyarrow (pip install 'invest-registry[parquet]')"
+        ) from e
+
+    schema = pa.schema(
+        [
+            ("siren", pa.string()),
+            ("name", pa.string()),
+            ("naf", pa.string()),
+            ("creation_date", pa.date32()),
+            ("employee_band", pa.string()),
+            ("employee_band_year", pa.int32()),
+            ("is_employer", pa.bool_()),
+            ("siret", pa.string()),
+            ("postal_code", pa.string()),
+            ("commune", pa.string()),
+            ("departement", pa.string()),
+            ("address", pa.string()),
+            ("source", pa.string()),
+        ]
+    )
+    rows = 0
+    with pq.ParquetWriter(fp, schema) as writer:
+        for batch in _batches(records, row_group_size):
+            columns = {name: [getattr(r, name) for r in batch] for name in EXPORT_FIELDS}
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            rows += len(batch)
+    return rows
+
+
+def write_records(records: Iterable[CompanyRecord], fp: BinaryIO, *, fmt: str) -> None:
+    """Stream `records` to a binary file object in `fmt` (csv, ndjson or parquet)."""
+    if fmt == "parquet":
+        write_parquet(records, fp)
+        return
+    if fmt == "csv":
+        chunks = iter_csv_chunks(records)
+    elif fmt == "ndjson":
+        chunks = iter_ndjson_chunks(records)
+    else:
+        raise ValueError(f"unknown export format: {fmt!r}")
+    fp.writelines(chunks)
+
+
+def iter_ndjson_records(lines: Iterable[str]) -> Iterator[CompanyRecord]:
+    """Parse NDJSON records, e.g. the output of `invest-registry pull`, lazily."""
+    for line in lines:
+        if line.strip():
+            yield CompanyRecord.model_validate_json(line)
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--job", help="harvest job id (see .cache/jobs/)")
+    source.add_argument("--cache-key", help="disk cache key of a Search pull")
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="ndjson")
+    parser.add_argument("--out", default="-", help="output path, '-' for stdout (not for parquet)")
+
+
+def run(args: argparse.Namespace, parser: argparse.ArgumentParser) -> None:
+    """Export from a job, a cache key or, with neither, NDJSON records on stdin."""
+    from invest_registry.jobs import iter_job_records, job_dir
+    from invest_registry.storage import has_cached_records, iter_cached_records
+
+    if args.job:
+        if not (job_dir(args.job) / "records.ndjson").exists():
+            parser.error(f"no such job: {args.job}")
+        records = iter_job_records(args.job)
+    elif args.cache_key:
+        if not has_cached_records(args.cache_key):
+            parser.error(f"no cached pull under key: {args.cache_key}")
+        records = iter_cached_records(args.cache_key)
+    else:
+        records = iter_ndjson_records(sys.stdin)
+    if args.out == "-":
+        if args.format == "parquet":
+            parser.error("parquet needs a seekable --out path")
+        write_records(records, sys.stdout.buffer, fmt=args.format)
+        return
+    with open(args.out, "wb") as fp:
+        write_records(records, fp, fmt=args.format)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Stream records from the local store to a file.")
+    add_arguments(parser)
+    run(parser.parse_args(argv), parser)
+
+
+if __name__ == "__main__":
+    main()
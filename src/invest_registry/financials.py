@@ -0,0 +1,223 @@
+"""Company financials as a compact numeric table, with vectorized growth metrics.
+
+The API returns `finances` as `{"2023": {"ca": ..., "resultat_net": ...}, ...}`.
+Those dicts are parsed once, when a company is ingested, into `FinancialYear`
+rows; per-company metrics (latest revenue, YoY growth, CAGR, net margin) are then
+computed for every company at once with numpy.
+"""
+
+import math
+import threading
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from invest_registry.details import STORE_REFRESH_SECONDS, StoreFollower
+from invest_registry.models import FranceSearchResult
+from invest_registry.profiling import span
+
+
+@dataclass(frozen=True)
+class FinancialYear:
+    year: int
+    revenue: float  # NaN when not reported
+    net_income: float  # NaN when not reported
+
+
+def _amount(value: object) -> float:
+    if value is None or isinstance(value, bool):
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def parse_finances(finances: Mapping[str, object] | None) -> list[FinancialYear]:
+    """Reported years, oldest first; non-year keys and non-dict entries are ignored."""
+    if not finances:
+        return []
+    out: list[FinancialYear] = []
+    for key, data in finances.items():
+        try:
+            year = int(key)
+        except ValueError:
+            continue
+        if not isinstance(data, dict):
+            continue
+        out.append(FinancialYear(year, _amount(data.get("ca")), _amount(data.get("resultat_net"))))
+    return sorted(out, key=lambda y: y.year)
+
+
+@dataclass(frozen=True)
+class FinancialMetrics:
+    """One row per company with at least one reported year; NaN when not computable.
+
+    `yoy_growth` compares the latest year with the year right before it (missing
+    when that year was not filed), `cagr` spans the first to the latest reported
+    year, and `margin` is the latest net income over the latest revenue.
+    """
+
+    sirens: tuple[str, ...]
+    latest_year: np.ndarray  # int32
+    revenue: np.ndarray
+    net_income: np.ndarray
+    yoy_growth: np.ndarray
+    cagr: np.ndarray
+    margin: np.ndarray
+    _positions: dict[str, int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_positions", {s: i for i, s in enumerate(self.sirens)})
+
+    def __len__(self) -> int:
+        return len(self.sirens)
+
+    def column(self, name: str, sirens: Iterable[str]) -> list[float | None]:
+        """Values of metric `name` for `sirens`, None when unknown."""
+        values = getattr(self, name)
+        out: list[float | None] = []
+        for s in sirens:
+            i = self._positions.get(s)
+            v = None if i is None else float(values[i])
+            out.append(None if v is None or math.isnan(v) else v)
+        return out
+
+    def growth_by_siren(self) -> dict[str, float]:
+        """Known YoY revenue growth, keyed by SIREN (the scoring `growth` input)."""
+        known = np.flatnonzero(~np.isnan(self.yoy_growth))
+        return {self.sirens[i]: float(self.yoy_growth[i]) for i in known}
+
+
+def compute_metrics(rows: Mapping[str, Iterable[FinancialYear]]) -> FinancialMetrics:
+    sirens: list[str] = []
+    company: list[int] = []
+    years: list[int] = []
+    revenue: list[float] = []
+    net_income: list[float] = []
+    for siren, company_years in rows.items():
+        pos = len(sirens)
+        n = 0
+        for y in company_years:
+            company.append(pos)
+            years.append(y.year)
+            revenue.append(y.revenue)
+            net_income.append(y.net_income)
+            n += 1
+        if n:
+            sirens.append(siren)
+
+    company_a = np.asarray(company, dtype=np.int32)
+    year_a = np.asarray(years, dtype=np.int32)
+    rev_a = np.asarray(revenue, dtype=np.float64)
+    ni_a = np.asarray(net_income, dtype=np.float64)
+
+    order = np.lexsort((year_a, company_a))
+    company_a, year_a, rev_a, ni_a = company_a[order], year_a[order], rev_a[order], ni_a[order]
+
+    boundary = company_a[1:] != company_a[:-1]
+    first = np.flatnonzero(np.r_[True, boundary]) if len(company_a) else np.empty(0, np.intp)
+    last = np.flatnonzero(np.r_[boundary, True]) if len(company_a) else np.empty(0, np.intp)
+
+    rev_last = rev_a[last]
+    ni_last = ni_a[last]
+    prev = np.maximum(last - 1, 0)
+    has_prev = (last > first) & (year_a[prev] == year_a[last] - 1)
+    rev_prev = np.where(has_prev, rev_a[prev], np.nan)
+    n_years = (year_a[last] - year_a[first]).astype(np.float64)
+    rev_first = rev_a[first]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        yoy = np.where(rev_prev > 0, rev_last / rev_prev - 1.0, np.nan)
+        cagr = np.where(
+            (n_years > 0) & (rev_first > 0) & (rev_last > 0),
+            np.power(rev_last / rev_first, 1.0 / n_years) - 1.0,
+            np.nan,
+        )
+        margin = np.where(rev_last > 0, ni_last / rev_last, np.nan)
+
+    return FinancialMetrics(
+        sirens=tuple(sirens),
+        latest_year=year_a[last],
+        revenue=rev_last,
+        net_income=ni_last,
+        yoy_growth=yoy,
+        cagr=cagr,
+        margin=margin,
+    )
+
+
+class FinancialIndex:
+    """Parsed financial years for every fetched company, with cached metrics.
+
+    Fed like `PersonIndex`: incrementally from the local detail store. `metrics()`
+    returns the same object until new financials arrive, so callers can use
+    identity to tell whether anything changed.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._rows: dict[str, list[FinancialYear]] = {}
+        self._metrics: FinancialMetrics | None = None
+        self._refresh_lock = threading.Lock()
+        self._store = StoreFollower()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add_company(self, company: FranceSearchResult) -> None:
+        years = parse_finances(company.finances)
+        with self._lock:
+            if self._rows.get(company.siren, []) == years:
+                return
+            if years:
+                self._rows[company.siren] = years
+            else:
+                self._rows.pop(company.siren, None)
+            self._metrics = None
+
+    def refresh_from_store(self, *, min_interval: float = 0.0) -> int:
+        """Index details written to the local detail store since the last refresh.
+
+        Skips the scan when this process saved nothing since and the last one is
+        less than `min_interval` seconds old.
+        """
+        added = 0
+        with self._refresh_lock:
+            if not self._store.stale(min_interval):
+                return 0
+            with span("financial_index_refresh"):
+                for details in self._store.changes():
+                    self.add_company(details)
+                    added += 1
+        return added
+
+    def years_for(self, siren: str) -> list[FinancialYear]:
+        with self._lock:
+            return list(self._rows.get(siren, ()))
+
+    def metrics(self) -> FinancialMetrics:
+        with self._lock:
+            if self._metrics is None:
+                with span("financial_metrics"):
+                    self._metrics = compute_metrics(self._rows)
+            return self._metrics
+
+
+_financial_index: FinancialIndex | None = None
+_financial_index_lock = threading.Lock()
+
+
+def financial_index() -> FinancialIndex:
+    """Process-wide index over the local detail store, refreshed incrementally.
+
+    Rescans at most every `STORE_REFRESH_SECONDS`, or right after this process saved
+    new details, so calling it on every rerun stays cheap.
+    """
+    global _financial_index
+    with _financial_index_lock:
+        if _financial_index is None:
+            _financial_index = FinancialIndex()
+        _financial_index.refresh_from_store(min_interval=STORE_REFRESH_SECONDS)
+        return _financial_index
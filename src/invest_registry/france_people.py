@@ -1,4 +1,12 @@
-from invest_registry.models import FranceDirigeant
+import re
+import threading
+import unicodedata
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from invest_registry.details import STORE_REFRESH_SECONDS, StoreFollower
+from invest_registry.models import FranceDirigeant, FranceSearchResult
+from invest_registry.profiling import span
 
 
 def dirigeants_personnes_physiques(
@@ -8,3 +16,140 @@ def dirigeants_personnes_physiques(
         return []
     return [d for d in dirigeants if (d.type_dirigeant or "").strip().lower() == "personne physique"]
 
+
+def _fold(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(re.sub(r"[^a-z]+", " ", text.casefold()).split())
+
+
+@dataclass(frozen=True)
+class PersonKey:
+    # Family name plus first given name, accent/case/punctuation-folded, and the
+    # birth month ("YYYY-MM") when known, else the birth year.
+    name: str
+    birth: str
+
+
+def person_key(d: FranceDirigeant) -> PersonKey | None:
+    if not d.nom:
+        return None
+    first = _fold(d.prenoms or "").split(" ")[0]
+    name = " ".join(b for b in [_fold(d.nom), first] if b)
+    birth = (d.date_de_naissance or "")[:7] or (d.annee_de_naissance or "")[:4]
+    if not name or not birth:
+        return None  # too ambiguous to link across companies
+    return PersonKey(name=name, birth=birth)
+
+
+@dataclass(frozen=True)
+class PersonLinks:
+    key: PersonKey
+    display_name: str
+    sirens: frozenset[str]
+
+
+class PersonIndex:
+    """People (physical-person dirigeants) <-> companies, across every fetched company.
+
+    A hash join on PersonKey: adding a company is O(its dirigeants), and both
+    directions are dict lookups. Re-adding a company replaces its previous links, so
+    the index can be fed incrementally as fresher details arrive.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._companies_by_person: dict[PersonKey, set[str]] = {}
+        self._people_by_company: dict[str, set[PersonKey]] = {}
+        self._display_names: dict[PersonKey, str] = {}
+        self._company_names: dict[str, str] = {}
+        self._refresh_lock = threading.Lock()
+        self._store = StoreFollower()
+
+    def __len__(self) -> int:
+        return len(self._companies_by_person)
+
+    def add_company(self, company: FranceSearchResult) -> None:
+        keys: dict[PersonKey, str] = {}
+        for d in dirigeants_personnes_physiques(company.dirigeants):
+            k = person_key(d)
+            if k is not None:
+                keys[k] = " ".join(p for p in [d.prenoms, d.nom] if p)
+
+        with self._lock:
+            for old in self._people_by_company.pop(company.siren, set()):
+                sirens = self._companies_by_person.get(old)
+                if sirens is not None:
+                    sirens.discard(company.siren)
+                    if not sirens:
+                        del self._companies_by_person[old]
+                        self._display_names.pop(old, None)
+            self._company_names[company.siren] = (
+                company.nom_raison_sociale or company.nom_complet or company.siren
+            )
+            self._people_by_company[company.siren] = set(keys)
+            for k, display in keys.items():
+                self._companies_by_person.setdefault(k, set()).add(company.siren)
+                self._display_names.setdefault(k, display)
+
+    def add_companies(self, companies: Iterable[FranceSearchResult]) -> None:
+        for c in companies:
+            self.add_company(c)
+
+    def refresh_from_store(self, *, min_interval: float = 0.0) -> int:
+        """Index details written to the local detail store since the last refresh.
+
+        Skips the scan when this process saved nothing since and the last one is
+        less than `min_interval` seconds old.
+        """
+        added = 0
+        with self._refresh_lock:
+            if not self._store.stale(min_interval):
+                return 0
+            with span("person_index_refresh"):
+                for details in self._store.changes():
+                    self.add_company(details)
+                    added += 1
+        return added
+
+    def company_name(self, siren: str) -> str:
+        return self._company_names.get(siren, siren)
+
+    def companies_for(self, key: PersonKey) -> frozenset[str]:
+        with self._lock:
+            return frozenset(self._companies_by_person.get(key, ()))
+
+    def people_for(self, siren: str) -> list[PersonLinks]:
+        with self._lock:
+            return [
+                PersonLinks(k, self._display_names[k], frozenset(self._companies_by_person[k]))
+                for k in self._people_by_company.get(siren, ())
+            ]
+
+    def serial_founders(self, *, min_companies: int = 2) -> list[PersonLinks]:
+        """People linked to at least `min_companies` companies, most boards first."""
+        with self._lock:
+            out = [
+                PersonLinks(k, self._display_names[k], frozenset(sirens))
+                for k, sirens in self._companies_by_person.items()
+                if len(sirens) >= min_companies
+            ]
+        return sorted(out, key=lambda p: (-len(p.sirens), p.display_name))
+
+
+_person_index: PersonIndex | None = None
+_person_index_lock = threading.Lock()
+
+
+def person_index() -> PersonIndex:
+    """Process-wide index over the local detail store, refreshed incrementally.
+
+    Rescans at most every `STORE_REFRESH_SECONDS`, or right after this process saved
+    new details, so calling it on every rerun stays cheap.
+    """
+    global _person_index
+    with _person_index_lock:
+        if _person_index is None:
+            _person_index = PersonIndex()
+        _person_index.refresh_from_store(min_interval=STORE_REFRESH_SECONDS)
+        return _person_index
@@ -0,0 +1,433 @@
+"""Sharded, multi-process harvest of a job.
+
+`run_harvest` splits a job's searches into units of consecutive pages and runs
+them on a pool of worker processes, so JSON decoding and validation scale past
+one interpreter. All workers draw from one `SharedRateLimiter`, so the pool as
+a whole stays within the API budget (`FRANCE_API_RATE_LIMIT_PER_SECOND`).
+
+The checkpoint store lives next to the job, in `.cache/jobs/<job_id>/harvest/`:
+
+- `plan.json`: the units (search index, first and last page), written once.
+- `<unit>.claim`: created exclusively by the worker that takes the unit.
+- `<unit>.ndjson` and `<unit>.done`: the unit's kept records, then its counters.
+  `.done` is the completion marker, so a crash loses at most the units in flight.
+  Only a unit whose every page was read is completed; one stopped part-way (a pause,
+  or the job's target reached by other units) is released and runs again in full.
+- `base.ndjson`: records the job had kept before it was planned (a `run_job`
+  that was paused), which the harvest then skips.
+
+Each worker first takes its own shard (every n-th unit, front to back), then
+steals unclaimed units from the other shards, back to front, so uneven shards
+(sparse filters, short searches) do not leave workers idle. When everything is
+done, the units' records are merged in plan order, without duplicates, into the
+job's `records.ndjson`. Once planned, a job is resumed with `run_harvest`.
+"""
+
+import json
+import os
+from collections.abc import Callable, Iterator
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from invest_registry.clients.france import (
+    CollectProgress,
+    CollectState,
+    FranceCompanySearchClient,
+    collect_companies,
+)
+from invest_registry.jobs import (
+    JobInfo,
+    JobSpec,
+    iter_job_records,
+    job_dir,
+    load_job_info,
+    load_job_spec,
+    save_job_info,
+    write_json_atomic,
+)
+from invest_registry.models import CompanyRecord
+from invest_registry.rate_limit import SharedRateLimiter
+
+if TYPE_CHECKING:
+    from multiprocessing.sharedctypes import Synchronized
+    from multiprocessing.synchronize import Event
+
+    from invest_registry.settings import Settings
+
+PAGES_PER_UNIT = 5
+HARVEST_WORKERS = min(4, os.cpu_count() or 1)
+
+
+@dataclass(frozen=True)
+class HarvestUnit:
+    unit_id: int
+    search: int  # index into JobSpec.searches
+    first_page: int
+    last_page: int
+
+    @property
+    def pages(self) -> int:
+        return self.last_page - self.first_page + 1
+
+
+def plan_units(
+    total_pages: list[int],
+    *,
+    first_pages: list[int] | None = None,
+    max_pages_per_search: int | None = None,
+    pages_per_unit: int = PAGES_PER_UNIT,
+) -> list[HarvestUnit]:
+    """Page ranges covering every reachable page, search by search."""
+    units: list[HarvestUnit] = []
+    for i, total in enumerate(total_pages):
+        last = min(total, max_pages_per_search) if max_pages_per_search is not None else total
+        page = first_pages[i] if first_pages else 1
+        while page <= last:
+            end = min(page + pages_per_unit - 1, last)
+            units.append(HarvestUnit(len(units), i, page, end))
+            page = end + 1
+    return units
+
+
+def claim_order(n_units: int, worker: int, n_workers: int) -> list[int]:
+    """Unit ids in the order `worker` tries them: its shard, then the others' from the back."""
+    order = list(range(worker, n_units, n_workers))
+    for k in range(1, n_workers):
+        victim = (worker + k) % n_workers
+        order.extend(reversed(range(victim, n_units, n_workers)))
+    return order
+
+
+class HarvestStore:
+    """File-based checkpoint store shared by the coordinator and its workers."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def _path(self, unit_id: int, suffix: str) -> Path:
+        return self.root / f"{unit_id:06d}{suffix}"
+
+    def has_plan(self) -> bool:
+        return (self.root / "plan.json").exists()
+
+    def save_plan(self, units: list[HarvestUnit], *, pages_before: int) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        write_json_atomic(
+            self.root / "plan.json",
+            {"pages_before": pages_before, "units": [asdict(u) for u in units]},
+        )
+
+    def load_plan(self) -> tuple[list[HarvestUnit], int]:
+        raw = json.loads((self.root / "plan.json").read_text(encoding="utf-8"))
+        return [HarvestUnit(**u) for u in raw["units"]], raw["pages_before"]
+
+    def claim(self, unit_id: int, worker: int) -> bool:
+        """Take a unit; False when another worker already has it (or it is done)."""
+        try:
+            fd = os.open(self._path(unit_id, ".claim"), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w") as f:
+            f.write(str(worker))
+        return True
+
+    def release(self, unit_id: int) -> None:
+        self._path(unit_id, ".claim").unlink(missing_ok=True)
+
+    def release_stale_claims(self) -> None:
+        """Drop claims of units that never completed (no worker may be running)."""
+        for claim in self.root.glob("*.claim"):
+            if not claim.with_suffix(".done").exists():
+                claim.unlink()
+
+    def complete(self, unit_id: int, records: list[CompanyRecord], counters: dict) -> None:
+        path = self._path(unit_id, ".ndjson")
+        tmp = path.with_suffix(".ndjson.tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            for r in records:
+                f.write(r.model_dump_json() + "\n")
+        os.replace(tmp, path)
+        write_json_atomic(self._path(unit_id, ".done"), counters)
+
+    def done_units(self) -> dict[int, dict]:
+        return {
+            int(p.stem): json.loads(p.read_text(encoding="utf-8"))
+            for p in self.root.glob("*.done")
+        }
+
+    def iter_unit_records(self, unit_id: int) -> Iterator[CompanyRecord]:
+        with self._path(unit_id, ".ndjson").open(encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield CompanyRecord.model_validate_json(line)
+
+    def iter_base_records(self) -> Iterator[CompanyRecord]:
+        path = self.root / "base.ndjson"
+        if not path.exists():
+            return
+        with path.open(encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield CompanyRecord.model_validate_json(line)
+
+    def record_error(self, worker: int, message: str) -> None:
+        (self.root / f"worker-{worker}.error").write_text(message, encoding="utf-8")
+
+    def pop_errors(self) -> list[str]:
+        errors = []
+        for p in sorted(self.root.glob("worker-*.error")):
+            errors.append(p.read_text(encoding="utf-8"))
+            p.unlink()
+        return errors
+
+
+def _run_unit(
+    client: FranceCompanySearchClient,
+    spec: JobSpec,
+    unit: HarvestUnit,
+    *,
+    seen: frozenset[str],
+    should_stop: Callable[[], bool],
+) -> tuple[list[CompanyRecord], dict] | None:
+    """The unit's kept records and counters, or None when it was stopped part-way.
+
+    A unit always reads its whole page range: the job's target is enforced across
+    units (no new unit starts once it is reached) and at merge time.
+    """
+    search = spec.searches[unit.search]
+    # A known total_pages makes collect_companies start at `first_page`, no page-1 probe.
+    state = CollectState(
+        next_page={search: unit.first_page},
+        total_pages={search: unit.last_page},
+        seen=set(seen),
+    )
+    last: list[CollectProgress] = []
+    records = collect_companies(
+        client,
+        searches=[search],
+        target_count=unit.pages * spec.per_page,  # more than the unit can keep
+        per_page=spec.per_page,
+        max_pages_per_search=None,
+        postal_code_prefix=spec.postal_code_prefix,
+        min_creation_date=spec.min_creation_date,
+        is_employer=spec.is_employer,
+        on_page=last.append,
+        should_stop=should_stop,
+        state=state,
+    )
+    if state.next_page[search] <= unit.last_page:
+        return None
+    return records, {
+        "records": len(records),
+        "pages_fetched": last[-1].pages_fetched if last else 0,
+        "results_seen": last[-1].results_seen if last else 0,
+    }
+
+
+def _harvest_worker(
+    root: str,
+    spec: JobSpec,
+    seen: frozenset[str],
+    app_settings: "Settings",
+    rate_limiter: SharedRateLimiter,
+    kept: "Synchronized[int]",
+    stop: "Event",
+    worker: int,
+    n_workers: int,
+) -> None:
+    """Worker process: claim, fetch and checkpoint units until none is left."""
+    store = HarvestStore(Path(root))
+    units, _ = store.load_plan()
+    done = set(store.done_units())
+
+    def _should_stop() -> bool:
+        return stop.is_set() or kept.value >= spec.target_count
+
+    try:
+        with FranceCompanySearchClient(
+            app_settings=app_settings, rate_limiter=rate_limiter
+        ) as client:
+            for unit_id in claim_order(len(units), worker, n_workers):
+                if _should_stop():
+                    return
+                if unit_id in done or not store.claim(unit_id, worker):
+                    continue
+                result = None
+                try:
+                    if _should_stop():  # the target was reached while claiming
+                        return
+                    result = _run_unit(
+                        client, spec, units[unit_id], seen=seen, should_stop=_should_stop
+                    )
+                    if result is not None:
+                        store.complete(unit_id, *result)
+                        with kept.get_lock():
+                            kept.value += result[1]["records"]
+                finally:
+                    if result is None:
+                        store.release(unit_id)
+    except KeyboardInterrupt:
+        pass  # the coordinator pauses the job
+    except Exception as e:
+        store.record_error(worker, f"{type(e).__name__}: {e}")
+        raise
+
+
+def _plan(
+    store: HarvestStore,
+    spec: JobSpec,
+    info: JobInfo,
+    client: FranceCompanySearchClient,
+    pages_per_unit: int,
+) -> None:
+    base = list(iter_job_records(info.job_id))
+    store.root.mkdir(parents=True, exist_ok=True)
+    with (store.root / "base.ndjson").open("w", encoding="utf-8") as f:
+        for r in base:
+            f.write(r.model_dump_json() + "\n")
+
+    pages_before = info.pages_fetched
+    for s, paging in zip(spec.searches, info.searches):
+        if paging["total_pages"] is None:
+            paging["total_pages"] = client.search(search=s, page=1, per_page=spec.per_page).total_pages
+            pages_before += 1  # page 1 is fetched again by its unit
+    units = plan_units(
+        [p["total_pages"] for p in info.searches],
+        first_pages=[p["next_page"] for p in info.searches],
+        max_pages_per_search=spec.max_pages_per_search,
+        pages_per_unit=pages_per_unit,
+    )
+    store.save_plan(units, pages_before=pages_before)
+
+
+def _merge(store: HarvestStore, job_id: str, units: list[HarvestUnit], target_count: int) -> int:
+    """Write base + completed units, in plan order and without duplicates; returns the count."""
+    done = store.done_units()
+    seen: set[str] = set()
+    path = job_dir(job_id) / "records.ndjson"
+    tmp = path.with_suffix(".ndjson.tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        sources = [store.iter_base_records()] + [
+            store.iter_unit_records(u.unit_id) for u in units if u.unit_id in done
+        ]
+        for source in sources:
+            for r in source:
+                if len(seen) >= target_count:
+                    break
+                if r.siren not in seen:
+                    seen.add(r.siren)
+                    f.write(r.model_dump_json() + "\n")
+    os.replace(tmp, path)
+    return len(seen)
+
+
+def run_harvest(
+    job_id: str,
+    *,
+    workers: int = HARVEST_WORKERS,
+    pages_per_unit: int = PAGES_PER_UNIT,
+    app_settings: "Settings | None" = None,
+    should_stop: Callable[[], bool] | None = None,
+    poll_seconds: float = 0.5,
+) -> JobInfo:
+    """Run (or resume) a job on `workers` processes until it is done, stopped or failed."""
+    import multiprocessing
+
+    from invest_registry.settings import get_settings
+
+    app_settings = app_settings or get_settings()
+    spec = load_job_spec(job_id)
+    info = load_job_info(job_id)
+    if info.status == "done":
+        return info
+
+    ctx = multiprocessing.get_context("spawn")  # no forking a process that runs threads
+    limiter = SharedRateLimiter(app_settings.france_api_rate_limit_per_second, context=ctx)
+    store = HarvestStore(job_dir(job_id) / "harvest")
+    info.status = "running"
+    info.error = None
+    save_job_info(info)
+
+    try:
+        if not store.has_plan():
+            with FranceCompanySearchClient(
+                app_settings=app_settings, rate_limiter=limiter
+            ) as client:
+                _plan(store, spec, info, client, pages_per_unit)
+    except Exception as e:
+        info.status = "failed"
+        info.error = str(e)
+        save_job_info(info)
+        raise
+
+    units, pages_before = store.load_plan()
+    info.reachable_pages = pages_before + sum(u.pages for u in units)
+    seen = frozenset(r.siren for r in store.iter_base_records())
+    stop = ctx.Event()
+    errors: list[str] = []
+
+    def _progress() -> list[HarvestUnit]:
+        """Counters from the completed units (duplicates included); the units left."""
+        done = store.done_units()
+        info.records_kept = len(seen) + sum(d["records"] for d in done.values())
+        info.pages_fetched = pages_before + sum(d["pages_fetched"] for d in done.values())
+        save_job_info(info)
+        return [u for u in units if u.unit_id not in done]
+
+    # Units are deduplicated at merge time, which can leave a round short of the target;
+    # the next round carries on with the units left.
+    kept = _merge(store, job_id, units, spec.target_count)
+    while (remaining := _progress()) and kept < spec.target_count:
+        store.release_stale_claims()
+        n = min(workers, len(remaining))
+        shared_kept = ctx.Value("q", kept)
+        procs = [
+            ctx.Process(
+                target=_harvest_worker,
+                args=(str(store.root), spec, seen, app_settings, limiter, shared_kept, stop, w, n),
+                name=f"harvest-{job_id}-{w}",
+                daemon=True,
+            )
+            for w in range(n)
+        ]
+        for p in procs:
+            p.start()
+        try:
+            while any(p.is_alive() for p in procs):
+                if should_stop is not None and should_stop():
+                    stop.set()
+                for p in procs:
+                    p.join(poll_seconds / n)
+                _progress()
+        except KeyboardInterrupt:
+            stop.set()
+        finally:
+            for p in procs:
+                p.join()
+
+        errors = store.pop_errors() or [
+            f"{p.name} exited with code {p.exitcode}" for p in procs if p.exitcode
+        ]
+        kept = _merge(store, job_id, units, spec.target_count)
+        if stop.is_set() or errors:
+            remaining = _progress()
+            break
+    info.records_kept = kept
+
+    for i, paging in enumerate(info.searches):
+        pending = [u.first_page for u in remaining if u.search == i]
+        planned = [u.last_page + 1 for u in units if u.search == i]
+        if pending:
+            paging["next_page"] = min(pending)
+        elif planned:
+            paging["next_page"] = max(planned)
+
+    complete = not remaining or kept >= spec.target_count
+    if errors and not complete:
+        info.status = "failed"
+        info.error = "; ".join(errors)
+    else:
+        info.status = "done" if complete else "paused"
+    save_job_info(info)
+    return info
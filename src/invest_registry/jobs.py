@@ -0,0 +1,277 @@
+"""Persistent, resumable harvest jobs.
+
+Each job lives in `.cache/jobs/<job_id>/`:
+
+- `job.json`: the immutable spec (searches, filters, target count).
+- `state.json`: status, counters and each search's `next_page` / `total_pages`,
+  rewritten atomically after every page.
+- `records.ndjson`: kept records, appended page by page and synced before
+  `state.json` moves past the page. It doubles as the seen-SIREN checkpoint, so
+  a resumed job never returns a company twice.
+
+A crash loses at most the page that was in flight: a record line it left cut
+short is ignored by readers and truncated when the job resumes.
+"""
+
+import json
+import os
+import threading
+import uuid
+from collections.abc import Callable, Iterator
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, date, datetime
+from pathlib import Path
+
+from invest_registry.clients.france import (
+    PER_PAGE_MAX,
+    CollectProgress,
+    CollectState,
+    FranceCompanySearchClient,
+    FranceSearchParams,
+    collect_companies,
+)
+from invest_registry.models import CompanyRecord
+from invest_registry.storage import cache_dir, write_text_atomic
+
+JOB_STATUSES = ("pending", "running", "paused", "done", "failed")
+
+
+@dataclass(frozen=True)
+class JobSpec:
+    searches: list[FranceSearchParams]
+    target_count: int
+    per_page: int = PER_PAGE_MAX
+    max_pages_per_search: int | None = None
+    postal_code_prefix: str | None = None
+    min_creation_date: date | None = None
+    is_employer: bool | None = None
+
+    def to_json(self) -> dict:
+        data = asdict(self)
+        data["min_creation_date"] = (
+            self.min_creation_date.isoformat() if self.min_creation_date else None
+        )
+        return data
+
+    @classmethod
+    def from_json(cls, data: dict) -> "JobSpec":
+        data = dict(data)
+        data["searches"] = [FranceSearchParams(**s) for s in data["searches"]]
+        if data.get("min_creation_date"):
+            data["min_creation_date"] = date.fromisoformat(data["min_creation_date"])
+        return cls(**data)
+
+
+@dataclass
+class JobInfo:
+    job_id: str
+    label: str
+    target_count: int
+    status: str = "pending"
+    records_kept: int = 0
+    pages_fetched: int = 0
+    reachable_pages: int = 0
+    created_at: str = ""
+    updated_at: str = ""
+    error: str | None = None
+    # One entry per spec search, in spec order: {"next_page": int, "total_pages": int | None}.
+    searches: list[dict] = field(default_factory=list)
+
+
+def _now() -> str:
+    return datetime.now(UTC).isoformat(timespec="seconds")
+
+
+def jobs_dir() -> Path:
+    d = cache_dir() / "jobs"
+    d.mkdir(parents=True, exist_ok=True)
+    return d
+
+
+def job_dir(job_id: str) -> Path:
+    return jobs_dir() / job_id
+
+
+def write_json_atomic(path: Path, payload: dict) -> None:
+    write_text_atomic(path, json.dumps(payload, ensure_ascii=False, indent=2))
+
+
+def save_job_info(info: JobInfo) -> None:
+    info.updated_at = _now()
+    write_json_atomic(job_dir(info.job_id) / "state.json", asdict(info))
+
+
+def create_job(spec: JobSpec, *, label: str) -> JobInfo:
+    job_id = datetime.now(UTC).strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+    d = job_dir(job_id)
+    d.mkdir(parents=True)
+    write_json_atomic(d / "job.json", spec.to_json())
+    (d / "records.ndjson").touch()
+    info = JobInfo(
+        job_id=job_id,
+        label=label,
+        target_count=spec.target_count,
+        created_at=_now(),
+        searches=[{"next_page": 1, "total_pages": None} for _ in spec.searches],
+    )
+    save_job_info(info)
+    return info
+
+
+def load_job_spec(job_id: str) -> JobSpec:
+    raw = json.loads((job_dir(job_id) / "job.json").read_text(encoding="utf-8"))
+    return JobSpec.from_json(raw)
+
+
+def load_job_info(job_id: str) -> JobInfo:
+    raw = json.loads((job_dir(job_id) / "state.json").read_text(encoding="utf-8"))
+    return JobInfo(**raw)
+
+
+def list_jobs() -> list[JobInfo]:
+    out: list[JobInfo] = []
+    for d in jobs_dir().iterdir():
+        if (d / "state.json").exists():
+            out.append(load_job_info(d.name))
+    return sorted(out, key=lambda j: j.created_at, reverse=True)
+
+
+def iter_job_records(job_id: str) -> Iterator[CompanyRecord]:
+    with (job_dir(job_id) / "records.ndjson").open(encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break  # cut short by a crash mid-page; `run_job` truncates it
+            if line.strip():
+                yield CompanyRecord.model_validate_json(line)
+
+
+def _truncate_partial_line(path: Path) -> None:
+    """Drop a last line left without its newline, so appends start on a fresh line."""
+    with path.open("rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        if not size:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+        f.seek(0)
+        f.truncate(f.read().rfind(b"\n") + 1)
+
+
+def _pages_left(spec: JobSpec, state: CollectState) -> bool:
+    for s in spec.searches:
+        total = state.total_pages.get(s)
+        if total is None:
+            return True
+        if spec.max_pages_per_search is not None:
+            total = min(total, spec.max_pages_per_search)
+        if state.next_page.get(s, 1) <= total:
+            return True
+    return False
+
+
+def load_job_records(job_id: str) -> list[CompanyRecord]:
+    return list(iter_job_records(job_id))
+
+
+def run_job(
+    job_id: str,
+    client: FranceCompanySearchClient,
+    *,
+    should_stop: Callable[[], bool] | None = None,
+) -> JobInfo:
+    """Run (or resume) a job until it reaches its target, runs out of pages or is stopped."""
+    spec = load_job_spec(job_id)
+    info = load_job_info(job_id)
+    if info.status == "done":
+        return info
+
+    _truncate_partial_line(job_dir(job_id) / "records.ndjson")
+    seen = {r.siren for r in iter_job_records(job_id)}
+    state = CollectState(seen=seen)
+    for s, paging in zip(spec.searches, info.searches):
+        state.next_page[s] = paging["next_page"]
+        if paging["total_pages"] is not None:
+            state.total_pages[s] = paging["total_pages"]
+
+    info.status = "running"
+    info.error = None
+    info.records_kept = len(seen)
+    save_job_info(info)
+    pages_before = info.pages_fetched
+
+    def _checkpoint(progress: CollectProgress) -> None:
+        if progress.new_records:
+            with (job_dir(job_id) / "records.ndjson").open("a", encoding="utf-8") as f:
+                f.writelines(r.model_dump_json() + "\n" for r in progress.new_records)
+                f.flush()
+                os.fsync(f.fileno())
+        info.records_kept += len(progress.new_records)
+        info.pages_fetched = pages_before + progress.pages_fetched
+        info.reachable_pages = progress.reachable_pages
+        info.searches = [
+            {"next_page": state.next_page[s], "total_pages": state.total_pages.get(s)}
+            for s in spec.searches
+        ]
+        save_job_info(info)
+
+    try:
+        collect_companies(
+            client,
+            searches=spec.searches,
+            target_count=spec.target_count - len(seen),
+            per_page=spec.per_page,
+            max_pages_per_search=spec.max_pages_per_search,
+            postal_code_prefix=spec.postal_code_prefix,
+            min_creation_date=spec.min_creation_date,
+            is_employer=spec.is_employer,
+            on_page=_checkpoint,
+            should_stop=should_stop,
+            state=state,
+        )
+    except Exception as e:
+        info.status = "failed"
+        info.error = str(e)
+        save_job_info(info)
+        raise
+
+    stopped = should_stop is not None and should_stop()
+    paused = stopped and info.records_kept < spec.target_count and _pages_left(spec, state)
+    info.status = "paused" if paused else "done"
+    save_job_info(info)
+    return info
+
+
+class JobRunner:
+    """Runs one job on a daemon thread; `stop()` pauses it after the current page."""
+
+    def __init__(
+        self,
+        job_id: str,
+        *,
+        client_factory: Callable[[], FranceCompanySearchClient] = FranceCompanySearchClient,
+    ) -> None:
+        self.job_id = job_id
+        self._client_factory = client_factory
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._work, name=f"job-{job_id}", daemon=True)
+
+    def _work(self) -> None:
+        try:
+            with self._client_factory() as client:
+                run_job(self.job_id, client, should_stop=self._stop.is_set)
+        except Exception:  # noqa: BLE001, S110 - run_job recorded it in state.json
+            pass
+
+    def start(self) -> "JobRunner":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def join(self, timeout: float | None = None) -> None:
+        self._thread.join(timeout)
+
+    def is_alive(self) -> bool:
+        return self._thread.is_alive()
@@ -0,0 +1,202 @@
+"""In-process instrumentation for the hot paths: API client, collector and caches.
+
+A deliberately small registry (counters, gauges and fixed-bucket histograms keyed
+by name and labels) so the app has no metrics dependency. Read it back with
+`snapshot()` (JSON-friendly) or `to_prometheus()` (Prometheus text format 0.0.4).
+"""
+
+import bisect
+import math
+import threading
+import time
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+
+LATENCY_BUCKETS: tuple[float, ...] = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_Labels = tuple[tuple[str, str], ...]
+
+HELP: dict[str, str] = {
+    "france_api_request_seconds": "Latency of one registry API attempt.",
+    "france_api_requests_total": "Registry API attempts by status ('error': no response).",
+    "france_api_retries_total": "Registry API attempts that were retries.",
+    "france_api_response_bytes_total": "Registry API response body bytes.",
+    "collect_runs_total": "collect_companies runs.",
+    "collect_pages_fetched_total": "Search pages requested by collect_companies.",
+    "collect_pages_used_total": "Pages that contributed at least one kept record.",
+    "collect_results_seen_total": "Raw API results processed by collect_companies.",
+    "collect_records_kept_total": "Records that passed dedup and filters.",
+    "collect_last_pass_rate": "Filter pass rate of the last finished collect_companies run.",
+    "collect_last_records_per_second": "Kept records per second of the last finished run.",
+    "cache_hits_total": "Cache lookups answered from the cache.",
+    "cache_misses_total": "Cache lookups that fell through.",
+    "cache_evictions_total": "Cache entries dropped (expired or cleared).",
+    "cache_load_seconds": "Time to load a cache entry on a hit.",
+}
+
+
+def _key(labels: dict[str, object]) -> _Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class _Histogram:
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot: +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[_Labels, float]] = {}
+        self._gauges: dict[str, dict[_Labels, float]] = {}
+        self._histograms: dict[str, dict[_Labels, _Histogram]] = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels: object) -> None:
+        key = _key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels: object) -> None:
+        with self._lock:
+            self._gauges.setdefault(name, {})[_key(labels)] = value
+
+    def observe(
+        self,
+        name: str,
+        value: float,
+        *,
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+        **labels: object,
+    ) -> None:
+        key = _key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = _Histogram(buckets)
+            hist.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels: object) -> Iterator[None]:
+        """Observe the duration of the block into histogram `name`, even if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def value(self, name: str, **labels: object) -> float:
+        """Current value of a counter or gauge series (0 when never set)."""
+        key = _key(labels)
+        with self._lock:
+            for kind in (self._counters, self._gauges):
+                if key in kind.get(name, {}):
+                    return kind[name][key]
+        return 0.0
+
+    def quantile(self, name: str, q: float, **labels: object) -> float | None:
+        """Upper bucket bound below which a fraction `q` of observations fall.
+
+        None when the histogram is empty; +Inf when the quantile lands past the last bucket.
+        """
+        with self._lock:
+            hist = self._histograms.get(name, {}).get(_key(labels))
+            if hist is None or not hist.count:
+                return None
+            rank = q * hist.count
+            cumulative = 0
+            for bound, count in zip([*hist.buckets, math.inf], hist.counts):
+                cumulative += count
+                if cumulative >= rank:
+                    return bound
+        return math.inf
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> dict:
+        """All series as plain data: {"counters"|"gauges": {name: [...]}, "histograms": ...}."""
+        with self._lock:
+            return {
+                "counters": {
+                    name: [{"labels": dict(k), "value": v} for k, v in sorted(series.items())]
+                    for name, series in sorted(self._counters.items())
+                },
+                "gauges": {
+                    name: [{"labels": dict(k), "value": v} for k, v in sorted(series.items())]
+                    for name, series in sorted(self._gauges.items())
+                },
+                "histograms": {
+                    name: [
+                        {
+                            "labels": dict(k),
+                            "buckets": list(h.buckets),
+                            "counts": list(h.counts),
+                            "sum": h.sum,
+                            "count": h.count,
+                        }
+                        for k, h in sorted(series.items())
+                    ]
+                    for name, series in sorted(self._histograms.items())
+                },
+            }
+
+    def to_prometheus(self) -> str:
+        snap = self.snapshot()
+        lines: list[str] = []
+
+        def _header(name: str, kind: str) -> None:
+            if name in HELP:
+                lines.append(f"# HELP {name} {HELP[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for kind in ("counters", "gauges"):
+            for name, series in snap[kind].items():
+                _header(name, "counter" if kind == "counters" else "gauge")
+                for s in series:
+                    lines.append(f"{name}{_prom_labels(s['labels'])} {_prom_value(s['value'])}")
+        for name, series in snap["histograms"].items():
+            _header(name, "histogram")
+            for s in series:
+                cumulative = 0
+                for le, count in zip([*s["buckets"], math.inf], s["counts"]):
+                    cumulative += count
+                    labels = _prom_labels({**s["labels"], "le": _prom_value(le)})
+                    lines.append(f"{name}_bucket{labels} {cumulative}")
+                lines.append(f"{name}_sum{_prom_labels(s['labels'])} {_prom_value(s['sum'])}")
+                lines.append(f"{name}_count{_prom_labels(s['labels'])} {s['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def _prom_value(v: float) -> str:
+    if math.isnan(v):
+        return "NaN"
+    if math.isinf(v):
+        return "+Inf" if v > 0 else "-Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+def _prom_escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _prom_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_prom_escape(str(v))}"' for k, v in labels.items()) + "}"
+
+
+# Process-wide registry used by the instrumented modules.
+metrics = MetricsRegistry()
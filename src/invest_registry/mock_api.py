@@ -0,0 +1,341 @@
+"""A local stand-in for the registry `/search` API, with latency and fault injection.
+
+Serves a synthetic corpus (see `invest_registry.synthetic`) or recorded responses
+with the API's paging, filter and `minimal`/`include` semantics, either in-process
+through an httpx transport or over HTTP for load tests:
+
+    uv run python -m invest_registry.mock_api --port 8765 --size 50000 --latency-ms 80
+    FRANCE_API_BASE_URL=http://127.0.0.1:8765 uv run streamlit run streamlit_app.py
+
+Faults are drawn from a seeded RNG, so a given request sequence always sees the same
+latencies and 5xx bursts; 429s come from a per-second request cap.
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from collections import Counter, deque
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import TYPE_CHECKING, Self
+from urllib.parse import parse_qsl, urlsplit
+
+from invest_registry.clients.france import PER_PAGE_MAX
+from invest_registry.naf import section_of
+from invest_registry.synthetic import synthetic_results
+
+if TYPE_CHECKING:
+    import httpx
+
+# Top-level sections dropped by `minimal=true` unless named in `include`.
+SECTIONS = ("siege", "dirigeants", "finances", "complements", "matching_etablissements")
+
+LatencyModel = Callable[[random.Random], float]
+
+
+def constant_latency(seconds: float) -> LatencyModel:
+    return lambda rng: seconds
+
+
+def lognormal_latency(median_seconds: float, sigma: float = 0.5) -> LatencyModel:
+    """Right-skewed latencies around `median_seconds`, like real API tails."""
+    mu = math.log(median_seconds)
+    return lambda rng: rng.lognormvariate(mu, sigma)
+
+
+@dataclass(frozen=True)
+class Faults:
+    latency: LatencyModel | None = None
+    rate_limit_per_second: float | None = None  # above it: 429 with Retry-After
+    retry_after_seconds: int = 1
+    error_rate: float = 0.0  # probability that a request starts a 5xx burst
+    error_burst: int = 1  # consecutive 5xx responses per burst
+    error_status: int = 503
+    max_page: int | None = None  # pagination cap: later pages answer 400
+
+
+def load_recorded_results(paths: Iterable[str | Path]) -> list[dict]:
+    """`results` of recorded `/search` responses (files, or directories of *.json), deduped."""
+    out: dict[str, dict] = {}
+    for p in paths:
+        p = Path(p)
+        files = sorted(p.glob("*.json")) if p.is_dir() else [p]
+        for f in files:
+            for r in json.loads(f.read_text(encoding="utf-8")).get("results", []):
+                out.setdefault(r["siren"], r)
+    return list(out.values())
+
+
+def _csv(params: Mapping[str, str], name: str) -> set[str] | None:
+    raw = params.get(name)
+    if not raw:
+        return None
+    return {v.strip() for v in raw.split(",") if v.strip()}
+
+
+class MockRegistry:
+    """Request handler state: the corpus, fault injection and request counters."""
+
+    def __init__(
+        self,
+        corpus: list[dict],
+        *,
+        faults: Faults | None = None,
+        seed: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self._corpus = corpus
+        self._faults = faults or Faults()
+        self._rng = random.Random(seed)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._window: deque[float] = deque()
+        self._burst_left = 0
+        self._filtered: dict[tuple, list[dict]] = {}
+        self.requests = 0
+        self.status_counts: Counter[int] = Counter()
+
+    def __len__(self) -> int:
+        return len(self._corpus)
+
+    @classmethod
+    def synthetic(cls, size: int, *, seed: int = 0, **kwargs) -> "MockRegistry":
+        return cls(synthetic_results(size, seed=seed, include_details=True), seed=seed, **kwargs)
+
+    def _fault(self) -> tuple[float, int | None]:
+        """(latency, status to fail with) for the next request; decided under the lock."""
+        f = self._faults
+        with self._lock:
+            self.requests += 1
+            latency = f.latency(self._rng) if f.latency else 0.0
+            if f.rate_limit_per_second is not None:
+                now = self._clock()
+                while self._window and now - self._window[0] >= 1.0:
+                    self._window.popleft()
+                if len(self._window) >= f.rate_limit_per_second:
+                    return latency, 429
+                self._window.append(now)
+            if self._burst_left:
+                self._burst_left -= 1
+                return latency, f.error_status
+            if f.error_rate and self._rng.random() < f.error_rate:
+                self._burst_left = f.error_burst - 1
+                return latency, f.error_status
+        return latency, None
+
+    def _matches(self, params: Mapping[str, str]) -> list[dict]:
+        q = (params.get("q") or "").strip().casefold()
+        naf = _csv(params, "activite_principale")
+        postal = _csv(params, "code_postal")
+        bands = _csv(params, "tranche_effectif_salarie")
+        etat = params.get("etat_administratif")
+        sections = _csv(params, "section_activite_principale")
+        departements = _csv(params, "departement")
+        key = (
+            q,
+            frozenset(naf or ()),
+            frozenset(sections or ()),
+            frozenset(departements or ()),
+            frozenset(postal or ()),
+            frozenset(bands or ()),
+            etat,
+        )
+        with self._lock:
+            cached = self._filtered.get(key)
+        if cached is not None:
+            return cached
+
+        out = []
+        for r in self._corpus:
+            siege = r.get("siege") or {}
+            if q and q not in (r.get("nom_raison_sociale") or "").casefold() and q != r["siren"]:
+                continue
+            if naf and r.get("activite_principale") not in naf:
+                continue
+            if sections and section_of(r.get("activite_principale")) not in sections:
+                continue
+            if postal and siege.get("code_postal") not in postal:
+                continue
+            if departements and siege.get("departement") not in departements:
+                continue
+            if bands and siege.get("tranche_effectif_salarie") not in bands:
+                continue
+            if etat and siege.get("etat_administratif", "A") != etat:
+                continue
+            out.append(r)
+        with self._lock:
+            self._filtered[key] = out
+        return out
+
+    def handle(self, path: str, params: Mapping[str, str]) -> tuple[int, dict[str, str], dict]:
+        """(status, headers, JSON body) for one GET request."""
+        latency, fail = self._fault()
+        if latency:
+            self._sleep(latency)
+        status, headers, body = self._respond(path, params, fail)
+        with self._lock:
+            self.status_counts[status] += 1
+        return status, headers, body
+
+    def _respond(
+        self, path: str, params: Mapping[str, str], fail: int | None
+    ) -> tuple[int, dict[str, str], dict]:
+        if fail == 429:
+            headers = {"retry-after": str(self._faults.retry_after_seconds)}
+            return 429, headers, {"erreur": "Trop de requêtes"}
+        if fail is not None:
+            return fail, {}, {"erreur": "Service indisponible"}
+        if path.rstrip("/") != "/search":
+            return 404, {}, {"erreur": "Not found"}
+
+        try:
+            page = int(params.get("page", 1))
+            per_page = int(params.get("per_page", 10))
+        except ValueError:
+            return 400, {}, {"erreur": "page et per_page doivent être des entiers"}
+        if page < 1 or not 1 <= per_page <= PER_PAGE_MAX:
+            return 400, {}, {"erreur": f"per_page doit être entre 1 et {PER_PAGE_MAX}"}
+        if self._faults.max_page is not None and page > self._faults.max_page:
+            return 400, {}, {"erreur": f"page doit être <= {self._faults.max_page}"}
+        minimal = params.get("minimal", "").lower() == "true"
+        include = _csv(params, "include") or set()
+        if include and not minimal:
+            return 400, {}, {"erreur": "include nécessite minimal=True"}
+
+        matches = self._matches(params)
+        start = (page - 1) * per_page
+        results = matches[start : start + per_page]
+        if minimal:
+            results = [
+                {k: v for k, v in r.items() if k not in SECTIONS or k in include} for r in results
+            ]
+        return (
+            200,
+            {},
+            {
+                "results": results,
+                "total_results": len(matches),
+                "page": page,
+                "per_page": per_page,
+                "total_pages": (len(matches) + per_page - 1) // per_page,
+            },
+        )
+
+    def transport(self) -> "httpx.MockTransport":
+        """In-process transport for `httpx.Client(transport=...)`."""
+        import httpx
+
+        def _handler(request: httpx.Request) -> httpx.Response:
+            params = dict(request.url.params)
+            status, headers, body = self.handle(request.url.path, params)
+            return httpx.Response(status, headers=headers, json=body)
+
+        return httpx.MockTransport(_handler)
+
+
+class MockRegistryServer:
+    """Serves a MockRegistry over HTTP on a background thread (port 0: pick a free one)."""
+
+    def __init__(self, registry: MockRegistry, *, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.registry = registry
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                url = urlsplit(self.path)
+                status, headers, body = registry.handle(url.path, dict(parse_qsl(url.query)))
+                payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(payload)))
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="mock-registry", daemon=True
+        )
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> Self:
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Serve on the calling thread until interrupted (for the CLI)."""
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> Self:
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve a mock registry /search API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--size", type=int, default=10_000, help="synthetic corpus size")
+    parser.add_argument("--recorded", nargs="*", help="recorded /search JSON files or dirs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="median latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="lognormal spread")
+    parser.add_argument("--rate-limit", type=float, help="requests/s before answering 429")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-burst", type=int, default=1)
+    parser.add_argument("--max-page", type=int, help="pagination cap")
+    args = parser.parse_args(argv)
+
+    faults = Faults(
+        latency=(
+            lognormal_latency(args.latency_ms / 1000, args.latency_sigma)
+            if args.latency_ms
+            else None
+        ),
+        rate_limit_per_second=args.rate_limit,
+        retry_after_seconds=args.retry_after,
+        error_rate=args.error_rate,
+        error_burst=args.error_burst,
+        max_page=args.max_page,
+    )
+    if args.recorded:
+        registry = MockRegistry(
+            load_recorded_results(args.recorded), faults=faults, seed=args.seed
+        )
+    else:
+        registry = MockRegistry.synthetic(args.size, seed=args.seed, faults=faults)
+
+    server = MockRegistryServer(registry, host=args.host, port=args.port)
+    print(f"Mock registry API on {server.base_url} ({len(registry)} companies)")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
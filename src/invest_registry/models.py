@@ -36,6 +36,7 @@ class FranceDirigeant(BaseModel):
 
     nom: str | None = None
     prenoms: str | None = None
+    denomination: str | None = None  # personne morale
 
     date_de_naissance: str | None = None
     annee_de_naissance: str | None = None
@@ -52,6 +53,7 @@ class FranceSearchResult(BaseModel):
 
     activite_principale: str | None = None
     date_creation: date | None = None
+    etat_administratif: str | None = None  # "A" active, "C" ceased
     siege: FranceSiege | None = None
 
     nombre_etablissements: int | None = None
@@ -0,0 +1,227 @@
+"""NAF rev. 2 hierarchy and the request planner for activity filters.
+
+The bundled table lists the 732 subclasses (`62.01Z`); the levels above are
+prefixes of the code (class `62.01`, group `62.0`, division `62`) plus the
+section letter (`J`) that groups divisions. `naf_index()` maps every node of
+every level to its subclasses, so expanding a prefix is one dict lookup.
+
+The search API filters on a comma list of subclasses (`activite_principale`)
+or of sections (`section_activite_principale`), not on divisions or groups.
+`plan_naf_searches` covers an expanded set with the fewest searches: one for
+the sections it fully covers, then the other codes in comma-list chunks.
+"""
+
+import re
+from collections.abc import Iterable
+from dataclasses import replace
+from functools import cache
+
+from invest_registry.clients.france import FranceSearchParams
+
+# Codes per `activite_principale` list, which keeps request URLs short.
+NAF_CODES_PER_REQUEST = 50
+
+# One line per division.
+_SUBCLASSES = """
+01.11Z 01.12Z 01.13Z 01.14Z 01.15Z 01.16Z 01.19Z 01.21Z 01.22Z 01.23Z 01.24Z 01.25Z 01.26Z
+01.27Z 01.28Z 01.29Z 01.30Z 01.41Z 01.42Z 01.43Z 01.44Z 01.45Z 01.46Z 01.47Z 01.49Z 01.50Z
+01.61Z 01.62Z 01.63Z 01.64Z 01.70Z
+02.10Z 02.20Z 02.30Z 02.40Z
+03.11Z 03.12Z 03.21Z 03.22Z
+05.10Z 05.20Z
+06.10Z 06.20Z
+07.10Z 07.21Z 07.29Z
+08.11Z 08.12Z 08.91Z 08.92Z 08.93Z 08.99Z
+09.10Z 09.90Z
+10.11Z 10.12Z 10.13A 10.13B 10.20Z 10.31Z 10.32Z 10.39A 10.39B 10.41A 10.41B 10.42Z 10.51A
+10.51B 10.51C 10.51D 10.52Z 10.61A 10.61B 10.62Z 10.71A 10.71B 10.71C 10.71D 10.72Z 10.73Z
+10.81Z 10.82Z 10.83Z 10.84Z 10.85Z 10.86Z 10.89Z 10.91Z 10.92Z
+11.01Z 11.02A 11.02B 11.03Z 11.04Z 11.05Z 11.06Z 11.07A 11.07B
+12.00Z
+13.10Z 13.20Z 13.30Z 13.91Z 13.92Z 13.93Z 13.94Z 13.95Z 13.96Z 13.99Z
+14.11Z 14.12Z 14.13Z 14.14Z 14.19Z 14.20Z 14.31Z 14.39Z
+15.11Z 15.12Z 15.20Z
+16.10A 16.10B 16.21Z 16.22Z 16.23Z 16.24Z 16.29Z
+17.11Z 17.12Z 17.21A 17.21B 17.21C 17.22Z 17.23Z 17.24Z 17.29Z
+18.11Z 18.12Z 18.13Z 18.14Z 18.20Z
+19.10Z 19.20Z
+20.11Z 20.12Z 20.13A 20.13B 20.14Z 20.15Z 20.16Z 20.17Z 20.20Z 20.30Z 20.41Z 20.42Z 20.51Z
+20.52Z 20.53Z 20.59Z 20.60Z
+21.10Z 21.20Z
+22.11Z 22.19Z 22.21Z 22.22Z 22.23Z 22.29A 22.29B
+23.11Z 23.12Z 23.13Z 23.14Z 23.19Z 23.20Z 23.31Z 23.32Z 23.41Z 23.42Z 23.43Z 23.44Z 23.49Z
+23.51Z 23.52Z 23.61Z 23.62Z 23.63Z 23.64Z 23.65Z 23.69Z 23.70Z 23.91Z 23.99Z
+24.10Z 24.20Z 24.31Z 24.32Z 24.33Z 24.34Z 24.41Z 24.42Z 24.43Z 24.44Z 24.45Z 24.46Z 24.51Z
+24.52Z 24.53Z 24.54Z
+25.11Z 25.12Z 25.21Z 25.29Z 25.30Z 25.40Z 25.50A 25.50B 25.61Z 25.62A 25.62B 25.71Z 25.72Z
+25.73A 25.73B 25.91Z 25.92Z 25.93Z 25.94Z 25.99A 25.99B
+26.11Z 26.12Z 26.20Z 26.30Z 26.40Z 26.51A 26.51B 26.52Z 26.60Z 26.70Z 26.80Z
+27.11Z 27.12Z 27.20Z 27.31Z 27.32Z 27.33Z 27.40Z 27.51Z 27.52Z 27.90Z
+28.11Z 28.12Z 28.13Z 28.14Z 28.15Z 28.21Z 28.22Z 28.23Z 28.24Z 28.25Z 28.29A 28.29B 28.30Z
+28.41Z 28.49Z 28.91Z 28.92Z 28.93Z 28.94Z 28.95Z 28.96Z 28.99A 28.99B
+29.10Z 29.20Z 29.31Z 29.32Z
+30.11Z 30.12Z 30.20Z 30.30Z 30.40Z 30.91Z 30.92Z 30.99Z
+31.01Z 31.02Z 31.03Z 31.09A 31.09B
+32.11Z 32.12Z 32.13Z 32.20Z 32.30Z 32.40Z 32.50A 32.50B 32.91Z 32.99Z
+33.11Z 33.12Z 33.13Z 33.14Z 33.15Z 33.16Z 33.17Z 33.19Z 33.20A 33.20B 33.20C 33.20D
+35.11Z 35.12Z 35.13Z 35.14Z 35.21Z 35.22Z 35.23Z 35.30Z
+36.00Z
+37.00Z
+38.11Z 38.12Z 38.21Z 38.22Z 38.31Z 38.32Z
+39.00Z
+41.10A 41.10B 41.10C 41.10D 41.20A 41.20B
+42.11Z 42.12Z 42.13A 42.13B 42.21Z 42.22Z 42.91Z 42.99Z
+43.11Z 43.12A 43.12B 43.13Z 43.21A 43.21B 43.22A 43.22B 43.29A 43.29B 43.31Z 43.32A 43.32B
+43.32C 43.33Z 43.34Z 43.39Z 43.91A 43.91B 43.99A 43.99B 43.99C 43.99D 43.99E
+45.11Z 45.19Z 45.20A 45.20B 45.31Z 45.32Z 45.40Z
+46.11Z 46.12A 46.12B 46.13Z 46.14Z 46.15Z 46.16Z 46.17A 46.17B 46.18Z 46.19A 46.19B 46.21Z
+46.22Z 46.23Z 46.24Z 46.31Z 46.32A 46.32B 46.32C 46.33Z 46.34Z 46.35Z 46.36Z 46.37Z 46.38A
+46.38B 46.39A 46.39B 46.41Z 46.42Z 46.43Z 46.44Z 46.45Z 46.46Z 46.47Z 46.48Z 46.49Z 46.51Z
+46.52Z 46.61Z 46.62Z 46.63Z 46.64Z 46.65Z 46.66Z 46.69A 46.69B 46.69C 46.71Z 46.72Z 46.73A
+46.73B 46.74A 46.74B 46.75Z 46.76Z 46.77Z 46.90Z
+47.11A 47.11B 47.11C 47.11D 47.11E 47.11F 47.19A 47.19B 47.21Z 47.22Z 47.23Z 47.24Z 47.25Z
+47.26Z 47.29Z 47.30Z 47.41Z 47.42Z 47.43Z 47.51Z 47.52A 47.52B 47.53Z 47.54Z 47.59A 47.59B
+47.61Z 47.62Z 47.63Z 47.64Z 47.65Z 47.71Z 47.72A 47.72B 47.73Z 47.74Z 47.75Z 47.76Z 47.77Z
+47.78A 47.78B 47.78C 47.79Z 47.81Z 47.82Z 47.89Z 47.91A 47.91B 47.99A 47.99B
+49.10Z 49.20Z 49.31Z 49.32Z 49.39A 49.39B 49.39C 49.41A 49.41B 49.41C 49.42Z 49.50Z
+50.10Z 50.20Z 50.30Z 50.40Z
+51.10Z 51.21Z 51.22Z
+52.10A 52.10B 52.21Z 52.22Z 52.23Z 52.24A 52.24B 52.29A 52.29B
+53.10Z 53.20Z
+55.10Z 55.20Z 55.30Z 55.90Z
+56.10A 56.10B 56.10C 56.21Z 56.29A 56.29B 56.30Z
+58.11Z 58.12Z 58.13Z 58.14Z 58.19Z 58.21Z 58.29A 58.29B 58.29C
+59.11A 59.11B 59.11C 59.12Z 59.13A 59.13B 59.14Z 59.20Z
+60.10Z 60.20A 60.20B
+61.10Z 61.20Z 61.30Z 61.90Z
+62.01Z 62.02A 62.02B 62.03Z 62.09Z
+63.11Z 63.12Z 63.91Z 63.99Z
+64.11Z 64.19Z 64.20Z 64.30Z 64.91Z 64.92Z 64.99Z
+65.11Z 65.12Z 65.20Z 65.30Z
+66.11Z 66.12Z 66.19A 66.19B 66.21Z 66.22Z 66.29Z 66.30Z
+68.10Z 68.20A 68.20B 68.31Z 68.32A 68.32B
+69.10Z 69.20Z
+70.10Z 70.21Z 70.22Z
+71.11Z 71.12A 71.12B 71.20A 71.20B
+72.11Z 72.19Z 72.20Z
+73.11Z 73.12Z 73.20Z
+74.10Z 74.20Z 74.30Z 74.90A 74.90B
+75.00Z
+77.11A 77.11B 77.12Z 77.21Z 77.22Z 77.29Z 77.31Z 77.32Z 77.33Z 77.34Z 77.35Z 77.39Z 77.40Z
+78.10Z 78.20Z 78.30Z
+79.11Z 79.12Z 79.90Z
+80.10Z 80.20Z 80.30Z
+81.10Z 81.21Z 81.22Z 81.29A 81.29B 81.30Z
+82.11Z 82.19Z 82.20Z 82.30Z 82.91Z 82.92Z 82.99Z
+84.11Z 84.12Z 84.13Z 84.21Z 84.22Z 84.23Z 84.24Z 84.25Z 84.30A 84.30B 84.30C
+85.10Z 85.20Z 85.31Z 85.32Z 85.41Z 85.42Z 85.51Z 85.52Z 85.53Z 85.59A 85.59B 85.60Z
+86.10Z 86.21Z 86.22A 86.22B 86.22C 86.23Z 86.90A 86.90B 86.90C 86.90D 86.90E 86.90F
+87.10A 87.10B 87.10C 87.20A 87.20B 87.30A 87.30B 87.90A 87.90B
+88.10A 88.10B 88.10C 88.91A 88.91B 88.99A 88.99B
+90.01Z 90.02Z 90.03A 90.03B 90.04Z
+91.01Z 91.02Z 91.03Z 91.04Z
+92.00Z
+93.11Z 93.12Z 93.13Z 93.19Z 93.21Z 93.29Z
+94.11Z 94.12Z 94.20Z 94.91Z 94.92Z 94.99Z
+95.11Z 95.12Z 95.21Z 95.22Z 95.23Z 95.24Z 95.25Z 95.29Z
+96.01A 96.01B 96.02A 96.02B 96.03Z 96.04Z 96.09Z
+97.00Z
+98.10Z 98.20Z
+99.00Z
+"""
+
+# Section letter -> (first division, last division, label).
+SECTIONS: dict[str, tuple[int, int, str]] = {
+    "A": (1, 3, "Agriculture, sylviculture et pêche"),
+    "B": (5, 9, "Industries extractives"),
+    "C": (10, 33, "Industrie manufacturière"),
+    "D": (
+        35,
+        35,
+        "Production et distribution d'électricité, de gaz, de vapeur et d'air conditionné",
+    ),
+    "E": (
+        36,
+        39,
+        "Production et distribution d'eau ; assainissement, gestion des déchets et dépollution",
+    ),
+    "F": (41, 43, "Construction"),
+    "G": (45, 47, "Commerce ; réparation d'automobiles et de motocycles"),
+    "H": (49, 53, "Transports et entreposage"),
+    "I": (55, 56, "Hébergement et restauration"),
+    "J": (58, 63, "Information et communication"),
+    "K": (64, 66, "Activités financières et d'assurance"),
+    "L": (68, 68, "Activités immobilières"),
+    "M": (69, 75, "Activités spécialisées, scientifiques et techniques"),
+    "N": (77, 82, "Activités de services administratifs et de soutien"),
+    "O": (84, 84, "Administration publique"),
+    "P": (85, 85, "Enseignement"),
+    "Q": (86, 88, "Santé humaine et action sociale"),
+    "R": (90, 93, "Arts, spectacles et activités récréatives"),
+    "S": (94, 96, "Autres activités de services"),
+    "T": (97, 98, "Activités des ménages en tant qu'employeurs et producteurs pour usage propre"),
+    "U": (99, 99, "Activités extra-territoriales"),
+}
+
+# Section letter, division `62`, group `62.0`, class `62.01` or subclass `62.01Z`.
+NAF_NODE_RE = re.compile(r"^(?:[A-U]|\d{2}(?:\.\d(?:\d[A-Z]?)?)?)$")
+
+
+_DIVISION_SECTIONS = {
+    division: letter
+    for letter, (first, last, _) in SECTIONS.items()
+    for division in range(first, last + 1)
+}
+
+
+def section_of(code: str | None) -> str | None:
+    """Section letter of any code at or below division level, None when unknown."""
+    if not code or not code[:2].isdigit():
+        return None
+    return _DIVISION_SECTIONS.get(int(code[:2]))
+
+
+@cache
+def naf_index() -> dict[str, tuple[str, ...]]:
+    """Every hierarchy node (section, division, group, class, subclass) -> its subclasses."""
+    nodes: dict[str, list[str]] = {}
+    for code in _SUBCLASSES.split():
+        for node in (section_of(code), code[:2], code[:4], code[:5], code):
+            nodes.setdefault(node, []).append(code)
+    return {node: tuple(codes) for node, codes in nodes.items()}
+
+
+def expand_naf(node: str) -> tuple[str, ...]:
+    """Subclasses under a hierarchy node, in code order; empty when the node is unknown."""
+    return naf_index().get(node.strip().upper(), ())
+
+
+def plan_naf_searches(
+    codes: Iterable[str],
+    template: FranceSearchParams,
+) -> list[FranceSearchParams]:
+    """The fewest searches (copies of `template`) whose activity filters cover `codes`.
+
+    Sections covered in full go into one `section_activite_principale` search;
+    the remaining subclasses into `activite_principale` lists of at most
+    `NAF_CODES_PER_REQUEST` codes. The searches never overlap.
+    """
+    wanted = sorted(set(codes))
+    index = naf_index()
+    by_section: dict[str | None, list[str]] = {}
+    for code in wanted:
+        by_section.setdefault(section_of(code), []).append(code)
+    full = [s for s, cs in by_section.items() if s is not None and len(cs) == len(index[s])]
+
+    searches: list[FranceSearchParams] = []
+    if full:
+        searches.append(
+            replace(template, activite_principale=None, section_activite_principale=",".join(full))
+        )
+    rest = [c for c in wanted if section_of(c) not in full]
+    for start in range(0, len(rest), NAF_CODES_PER_REQUEST):
+        chunk = rest[start : start + NAF_CODES_PER_REQUEST]
+        searches.append(
+            replace(template, activite_principale=",".join(chunk), section_activite_principale=None)
+        )
+    return searches
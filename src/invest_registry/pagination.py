@@ -1,3 +1,5 @@
+from collections.abc import Sequence
+from dataclasses import dataclass
 from typing import TypeVar
 
 T = TypeVar("T")
@@ -15,3 +17,58 @@ def paginate(items: list[T], *, page: int, page_size: int) -> tuple[list[T], int
     end = start + page_size
     return items[start:end], total_pages
 
+
+@dataclass(frozen=True)
+class PageCursor:
+    page: int
+    page_size: int
+    total_items: int
+
+    @property
+    def total_pages(self) -> int:
+        return (self.total_items + self.page_size - 1) // self.page_size
+
+    @property
+    def start(self) -> int:
+        return (self.page - 1) * self.page_size
+
+    @property
+    def end(self) -> int:
+        return min(self.start + self.page_size, self.total_items)
+
+    @property
+    def has_prev(self) -> bool:
+        return self.page > 1
+
+    @property
+    def has_next(self) -> bool:
+        return self.page < self.total_pages
+
+    def prev(self) -> "PageCursor":
+        return page_cursor(self.total_items, page=self.page - 1, page_size=self.page_size)
+
+    def next(self) -> "PageCursor":
+        return page_cursor(self.total_items, page=self.page + 1, page_size=self.page_size)
+
+
+def page_cursor(total_items: int, *, page: int, page_size: int) -> PageCursor:
+    if page_size <= 0:
+        raise ValueError("page_size must be > 0")
+    total_pages = (total_items + page_size - 1) // page_size
+    page = max(1, min(page, total_pages))
+    return PageCursor(page=page, page_size=page_size, total_items=total_items)
+
+
+def page_slice(
+    items: Sequence[T],
+    cursor: PageCursor,
+    *,
+    order: Sequence[int] | None = None,
+) -> list[T]:
+    """Items on the cursor's page, optionally through a precomputed sort permutation.
+
+    Only the page's own indices are touched, so the cost is O(page_size).
+    """
+    if order is None:
+        return list(items[cursor.start : cursor.end])
+    return [items[i] for i in order[cursor.start : cursor.end]]
@@ -0,0 +1,185 @@
+"""Opt-in per-rerun profiling: named spans, a JSONL trace file and a stack sampler.
+
+Library code marks its phases with `span("name")`. Outside `profile_run()` that is a
+shared no-op context manager, so the instrumentation costs one context-variable
+lookup. Spans are only recorded on the thread (context) that started the run;
+background threads (prefetch, collection) don't show up in a rerun's breakdown.
+
+Each finished run is appended to `.cache/traces.jsonl`; with `sample=True`, a
+sampling profiler also writes folded stacks (flamegraph.pl / speedscope input) to
+`.cache/profiles/`.
+"""
+
+import contextlib
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+
+from invest_registry.storage import cache_dir
+
+SAMPLE_INTERVAL_SECONDS = 0.005
+
+_NO_SPAN = contextlib.nullcontext()
+
+
+@dataclass(frozen=True)
+class Span:
+    name: str
+    start_ms: float  # from the start of the run
+    duration_ms: float
+    depth: int
+
+
+@dataclass
+class Profile:
+    label: str
+    started_at: str
+    total_ms: float = 0.0
+    spans: list[Span] = field(default_factory=list)
+    samples: int = 0
+    top_frames: list[tuple[str, int]] = field(default_factory=list)  # self samples per frame
+    folded_path: str | None = None
+
+    def breakdown(self) -> list[dict]:
+        """Per span name: calls and total ms, slowest first (nested spans count in both)."""
+        totals: dict[str, list[float]] = {}
+        for s in self.spans:
+            t = totals.setdefault(s.name, [0, 0.0, s.depth])
+            t[0] += 1
+            t[1] += s.duration_ms
+            t[2] = min(t[2], s.depth)
+        rows = [
+            {
+                "span": name,
+                "calls": int(calls),
+                "ms": round(ms, 2),
+                "share": ms / self.total_ms if self.total_ms else 0.0,
+                "depth": int(depth),
+            }
+            for name, (calls, ms, depth) in totals.items()
+        ]
+        return sorted(rows, key=lambda r: -r["ms"])
+
+    def to_json(self) -> dict:
+        data = asdict(self)
+        data["spans"] = [asdict(s) for s in self.spans]
+        return data
+
+
+class _Recorder:
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.depth = 0
+        self.spans: list[Span] = []
+
+    @contextlib.contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        self.depth += 1
+        try:
+            yield
+        finally:
+            self.depth -= 1
+            t1 = time.perf_counter()
+            self.spans.append(
+                Span(name, (t0 - self.start) * 1000, (t1 - t0) * 1000, self.depth)
+            )
+
+
+_recorder: ContextVar[_Recorder | None] = ContextVar("invest_registry_profile", default=None)
+
+
+def span(name: str) -> contextlib.AbstractContextManager[None]:
+    """Time a phase of the current profiled run (no-op when none is active)."""
+    rec = _recorder.get()
+    if rec is None:
+        return _NO_SPAN
+    return rec.span(name)
+
+
+class StackSampler:
+    """Samples one thread's Python stack at a fixed interval, from a helper thread."""
+
+    def __init__(self, thread_id: int, *, interval: float = SAMPLE_INTERVAL_SECONDS) -> None:
+        self._thread_id = thread_id
+        self._interval = interval
+        self._stop = threading.Event()
+        self.stacks: Counter[tuple[str, ...]] = Counter()
+        self._thread = threading.Thread(target=self._work, name="stack-sampler", daemon=True)
+
+    def _work(self) -> None:
+        while not self._stop.wait(self._interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack: list[str] = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{Path(code.co_filename).name}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def top_frames(self, n: int = 15) -> list[tuple[str, int]]:
+        leaf: Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            leaf[stack[-1]] += count
+        return leaf.most_common(n)
+
+    def write_folded(self, path: Path) -> None:
+        with path.open("w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(";".join(stack) + f" {count}\n")
+
+
+def trace_path() -> Path:
+    return cache_dir() / "traces.jsonl"
+
+
+def _profiles_dir() -> Path:
+    d = cache_dir() / "profiles"
+    d.mkdir(parents=True, exist_ok=True)
+    return d
+
+
+@contextlib.contextmanager
+def profile_run(label: str, *, sample: bool = False, trace: bool = True) -> Iterator[Profile]:
+    """Record spans (and optionally stack samples) for the enclosed block.
+
+    The yielded Profile is filled in when the block exits, including on exceptions
+    (Streamlit's stop/rerun control flow is one), and appended to the trace file.
+    """
+    started = datetime.now(UTC)
+    profile = Profile(label=label, started_at=started.isoformat(timespec="milliseconds"))
+    rec = _Recorder()
+    token = _recorder.set(rec)
+    sampler = StackSampler(threading.get_ident()).start() if sample else None
+    try:
+        yield profile
+    finally:
+        profile.total_ms = (time.perf_counter() - rec.start) * 1000
+        _recorder.reset(token)
+        profile.spans = sorted(rec.spans, key=lambda s: s.start_ms)
+        if sampler is not None:
+            sampler.stop()
+            profile.samples = sum(sampler.stacks.values())
+            profile.top_frames = sampler.top_frames()
+            path = _profiles_dir() / f"{started.strftime('%Y%m%d-%H%M%S-%f')}.folded"
+            sampler.write_folded(path)
+            profile.folded_path = str(path)
+        if trace:
+            with trace_path().open("a", encoding="utf-8") as f:
+                f.write(json.dumps(profile.to_json()) + "\n")
@@ -0,0 +1,322 @@
+"""Pull options, query-pack overrides and cache keys shared by the Search page and the CLI.
+
+A pull is a query pack plus `AdvancedOptions`; `pull_plan` turns both into the
+searches and `collect_companies` filter kwargs, and `cache_key` names the result
+in the local disk cache, so a CLI pull and the same pull from the UI share it.
+"""
+
+import queue
+import re
+import threading
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from datetime import date
+from itertools import islice
+
+from invest_registry.clients.france import (
+    PER_PAGE_MAX,
+    CollectProgress,
+    FranceCompanySearchClient,
+    FranceSearchParams,
+    collect_companies,
+)
+from invest_registry.models import CompanyRecord
+from invest_registry.naf import NAF_NODE_RE, expand_naf, plan_naf_searches
+from invest_registry.query_packs import get_query_pack
+from invest_registry.reviewed import reviewed_sirens
+from invest_registry.storage import has_cached_records, iter_cached_records, save_cached_records
+
+TRANCHE_EFFECTIF_LT20 = "00,01,02,03,11"
+FOUNDED_WITHIN_YEARS = 5
+# Ranked pulls scan every reachable page, so they always need a page cap.
+RANKED_MAX_PAGES_PER_SEARCH = 20
+EMPLOYER_FILTERS: dict[str, bool | None] = {"any": None, "yes": True, "no": False}
+
+
+def years_ago(today: date, years: int) -> date:
+    try:
+        return today.replace(year=today.year - years)
+    except ValueError:
+        return today.replace(year=today.year - years, day=28)
+
+
+def normalize_naf_override(raw: str | None) -> tuple[str | None, list[str]]:
+    """(valid NAF nodes as CSV or None, invalid entries) for a user-typed NAF list.
+
+    Any level of the NAF hierarchy is accepted: a section (`J`), division (`62`),
+    group (`58.2`), class (`62.01`) or subclass (`62.01Z`); `expand_naf_override`
+    turns the result into subclasses.
+    """
+    if not raw:
+        return None, []
+    raw = raw.strip().upper()
+    if not raw:
+        return None, []
+    parts = [p.strip() for p in raw.split(",") if p.strip()]
+    valid: list[str] = []
+    invalid: list[str] = []
+    for p in parts:
+        # Strip accidental non-NAF characters (e.g. trailing "~") but keep dots.
+        cleaned = re.sub(r"[^0-9A-Z.]", "", p)
+        if NAF_NODE_RE.fullmatch(cleaned) and expand_naf(cleaned):
+            if cleaned not in valid:
+                valid.append(cleaned)
+        else:
+            invalid.append(p)
+    return (",".join(valid) if valid else None), invalid
+
+
+def expand_naf_override(nodes: str) -> list[str]:
+    """Subclasses under a CSV of NAF nodes (as returned by `normalize_naf_override`)."""
+    codes = {code for node in nodes.split(",") if node.strip() for code in expand_naf(node)}
+    return sorted(codes)
+
+
+@dataclass(frozen=True)
+class AdvancedOptions:
+    """Overrides on top of a query pack; the defaults are the Search page's."""
+
+    q: str = ""
+    activite_principale: str | None = None
+    tranche_effectif_salarie: str | None = TRANCHE_EFFECTIF_LT20
+    etat_administratif: str | None = "A"
+    per_page: int = PER_PAGE_MAX
+    max_pages_per_search: int | None = None
+    postal_code_prefix: str | None = None
+    founded_within_years: int | None = FOUNDED_WITHIN_YEARS
+    employer_filter: str = "any"  # "any" | "yes" | "no"
+    ranked: bool = False  # keep the newest target_count instead of the first ones
+    skip_reviewed: bool = False  # leave out companies in the reviewed set
+
+
+def override_searches(
+    searches: list[FranceSearchParams],
+    *,
+    q: str,
+    activite_principale: str | None,
+    tranche_effectif_salarie: str | None,
+    etat_administratif: str | None,
+) -> list[FranceSearchParams]:
+    base = searches[0] if searches else FranceSearchParams(q="")
+
+    q_val = q if q else base.q
+    tranche_val = (
+        tranche_effectif_salarie
+        if tranche_effectif_salarie is not None
+        else base.tranche_effectif_salarie
+    )
+    etat_val = (
+        etat_administratif
+        if etat_administratif is not None
+        else base.etat_administratif
+    )
+
+    naf_codes: list[str] = []
+    if activite_principale:
+        naf_codes = expand_naf_override(activite_principale)
+
+    # If NAF override is provided, replace the pack’s NAF list entirely, with as few
+    # searches as the API's list and section filters allow.
+    if naf_codes:
+        template = FranceSearchParams(
+            q=q_val,
+            code_postal=base.code_postal,
+            tranche_effectif_salarie=tranche_val,
+            etat_administratif=etat_val,
+        )
+        return plan_naf_searches(naf_codes, template)
+
+    return [
+        FranceSearchParams(
+            q=q_val if q else s.q,
+            activite_principale=s.activite_principale,
+            section_activite_principale=s.section_activite_principale,
+            code_postal=s.code_postal,
+            tranche_effectif_salarie=(
+                tranche_effectif_salarie
+                if tranche_effectif_salarie is not None
+                else s.tranche_effectif_salarie
+            ),
+            etat_administratif=(
+                etat_administratif
+                if etat_administratif is not None
+                else s.etat_administratif
+            ),
+        )
+        for s in searches
+    ]
+
+
+def cache_key(
+    *,
+    pack_name: str,
+    paris_only: bool,
+    target_count: int,
+    adv: AdvancedOptions,
+) -> str:
+    bits = [
+        f"fr-{pack_name}",
+        f"paris{int(paris_only)}",
+        f"n{target_count}",
+        f"q{(adv.q or '').strip()[:24]}",
+        f"naf{adv.activite_principale or ''}",
+        f"eff{adv.tranche_effectif_salarie or ''}",
+        f"etat{adv.etat_administratif or ''}",
+        f"pp{adv.per_page}",
+        f"mp{adv.max_pages_per_search or 'none'}",
+        f"pc{adv.postal_code_prefix or ''}",
+        f"fy{adv.founded_within_years or 'none'}",
+        f"emp{adv.employer_filter}",
+        f"rk{int(adv.ranked)}",
+    ]
+    if adv.skip_reviewed:
+        bits.append("sr1")
+    return "-".join(bits)
+
+
+def pull_plan(
+    *,
+    pack_name: str,
+    paris_only: bool,
+    adv: AdvancedOptions,
+) -> tuple[list[FranceSearchParams], dict]:
+    """Searches plus the collect_companies filter kwargs for a pull."""
+    pack = get_query_pack(pack_name, paris_only=paris_only)
+
+    searches = override_searches(
+        pack.searches,
+        q=adv.q,
+        activite_principale=adv.activite_principale,
+        tranche_effectif_salarie=adv.tranche_effectif_salarie,
+        etat_administratif=adv.etat_administratif,
+    )
+
+    min_creation_date = (
+        years_ago(date.today(), adv.founded_within_years)
+        if adv.founded_within_years is not None
+        else None
+    )
+
+    eff_prefix = adv.postal_code_prefix or ("75" if paris_only else None)
+
+    return searches, {
+        # Strict mode: keep paging until we hit target_count or exhaust results.
+        "per_page": adv.per_page,
+        "max_pages_per_search": adv.max_pages_per_search,
+        "postal_code_prefix": eff_prefix,
+        "min_creation_date": min_creation_date,
+        "is_employer": EMPLOYER_FILTERS[adv.employer_filter],
+    }
+
+
+def collect_records(
+    *,
+    pack_name: str,
+    paris_only: bool,
+    target_count: int,
+    adv: AdvancedOptions,
+    on_page: Callable[[CollectProgress], None] | None = None,
+    should_stop: Callable[[], bool] | None = None,
+) -> list[CompanyRecord]:
+    searches, filters = pull_plan(pack_name=pack_name, paris_only=paris_only, adv=adv)
+
+    if adv.ranked and filters["max_pages_per_search"] is None:
+        filters["max_pages_per_search"] = RANKED_MAX_PAGES_PER_SEARCH
+
+    with FranceCompanySearchClient() as client:
+        return collect_companies(
+            client,
+            searches=searches,
+            target_count=target_count,
+            # The API does not order by creation date, so no early stop is possible.
+            rank_key=(lambda r: r.creation_date or date.min) if adv.ranked else None,
+            on_page=on_page,
+            should_stop=should_stop,
+            exclude=reviewed_sirens() if adv.skip_reviewed else None,
+            **filters,
+        )
+
+
+def iter_pull(
+    *,
+    pack_name: str,
+    paris_only: bool,
+    target_count: int,
+    adv: AdvancedOptions,
+    use_disk_cache: bool = True,
+) -> Iterator[CompanyRecord]:
+    """Records of a pull as they become available, from the disk cache when present.
+
+    First-N pulls yield each page's kept records as soon as it is processed (the
+    collector runs on a helper thread); ranked pulls can only yield once every page
+    was scanned. A complete pull is written back to the disk cache. A cached
+    `skip_reviewed` pull that companies reviewed since would leave short is pulled
+    again rather than returned short.
+    """
+    key = cache_key(
+        pack_name=pack_name, paris_only=paris_only, target_count=target_count, adv=adv
+    )
+    if use_disk_cache and has_cached_records(key):
+        if not adv.skip_reviewed:
+            yield from islice(iter_cached_records(key), target_count)
+            return
+        # Companies reviewed since the pull was cached are left out; when that leaves
+        # the pull short of a target it once reached, it is pulled again.
+        reviewed = reviewed_sirens()
+        cached = list(iter_cached_records(key))
+        kept = [r for r in cached if r.siren not in reviewed]
+        if len(kept) >= target_count or len(kept) == len(cached):
+            yield from kept[:target_count]
+            return
+
+    if adv.ranked:
+        records = collect_records(
+            pack_name=pack_name, paris_only=paris_only, target_count=target_count, adv=adv
+        )
+        yield from records
+    else:
+        records = yield from _stream_collect(
+            pack_name=pack_name, paris_only=paris_only, target_count=target_count, adv=adv
+        )
+    if use_disk_cache:
+        save_cached_records(key, records)
+
+
+def _stream_collect(
+    *,
+    pack_name: str,
+    paris_only: bool,
+    target_count: int,
+    adv: AdvancedOptions,
+) -> Iterator[CompanyRecord]:
+    pages: queue.Queue[tuple[CompanyRecord, ...] | BaseException | None] = queue.Queue()
+    stop = threading.Event()
+    result: list[list[CompanyRecord]] = []
+
+    def _work() -> None:
+        try:
+            result.append(
+                collect_records(
+                    pack_name=pack_name,
+                    paris_only=paris_only,
+                    target_count=target_count,
+                    adv=adv,
+                    on_page=lambda p: pages.put(p.new_records),
+                    should_stop=stop.is_set,
+                )
+            )
+            pages.put(None)
+        except BaseException as e:  # noqa: BLE001 - re-raised on the consuming side
+            pages.put(e)
+
+    worker = threading.Thread(target=_work, name="pull", daemon=True)
+    worker.start()
+    try:
+        while (item := pages.get()) is not None:
+            if isinstance(item, BaseException):
+                raise item
+            yield from item
+    finally:
+        stop.set()  # the consumer went away early: stop paging
+        worker.join()
+    return result[0]
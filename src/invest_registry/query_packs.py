@@ -1,6 +1,8 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from invest_registry.clients.france import FranceSearchParams
+from invest_registry.naf import plan_naf_searches
+from invest_registry.scoring import ScoringWeights
 
 
 @dataclass(frozen=True)
@@ -8,6 +10,7 @@ class QueryPack:
     name: str
     description: str
     searches: list[FranceSearchParams]
+    weights: ScoringWeights = field(default_factory=ScoringWeights)
 
 
 def blossom_like_france(*, paris_only: bool = False) -> QueryPack:
@@ -21,22 +24,30 @@ def blossom_like_france(*, paris_only: bool = False) -> QueryPack:
     # The search API expects a 5-digit postal code; passing "75" triggers a 400.
     code_postal = None
 
-    searches: list[FranceSearchParams] = []
-    for naf in naf_codes:
-        searches.append(
-            FranceSearchParams(
-                q="",
-                activite_principale=naf,
-                code_postal=code_postal,
-                tranche_effectif_salarie="00,01,02,03,11",
-                etat_administratif="A",
-            )
-        )
+    # One search for both codes: the API takes a comma list (see `plan_naf_searches`).
+    searches = plan_naf_searches(
+        naf_codes,
+        FranceSearchParams(
+            q="",
+            code_postal=code_postal,
+            tranche_effectif_salarie="00,01,02,03,11",
+            etat_administratif="A",
+        ),
+    )
 
     return QueryPack(
         name="blossom_like_france",
         description="Compact pack targeting French software/IT companies (optionally Paris-only).",
         searches=searches,
+        weights=ScoringWeights(
+            age=1.0,
+            employee_band=0.5,
+            employer=0.75,
+            naf=0.5,
+            growth=1.0,
+            max_age_years=5.0,
+            naf_weights={"58.29C": 1.0, "62.01Z": 0.8},
+        ),
     )
 
 
@@ -0,0 +1,142 @@
+import threading
+import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from multiprocessing.context import BaseContext
+
+PRIORITIES = ("normal", "low")
+
+
+class RateLimiter:
+    """Token bucket shared by every request to one upstream API.
+
+    `normal` requests (user-driven) take a token as soon as one is available.
+    `low` requests (prefetch, background warm-up) only proceed while no normal
+    request is waiting and more than `low_priority_reserve` tokens are left, so
+    they use spare budget without delaying interactive requests.
+    """
+
+    def __init__(
+        self,
+        rate_per_second: float,
+        *,
+        burst: float | None = None,
+        low_priority_reserve: float = 1.0,
+    ) -> None:
+        if rate_per_second <= 0:
+            raise ValueError("rate_per_second must be > 0")
+        self._rate = rate_per_second
+        self._capacity = burst if burst is not None else max(1.0, rate_per_second)
+        self._reserve = min(low_priority_reserve, self._capacity - 1.0)
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._normal_waiting = 0
+        self._cond = threading.Condition()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def acquire(self, *, priority: str = "normal", timeout: float | None = None) -> bool:
+        if priority not in PRIORITIES:
+            raise ValueError(f"unknown priority: {priority!r}")
+        low = priority == "low"
+        deadline = None if timeout is None else time.monotonic() + timeout
+        needed = 1.0 + (self._reserve if low else 0.0)
+
+        with self._cond:
+            if not low:
+                self._normal_waiting += 1
+            try:
+                while True:
+                    self._refill()
+                    if self._tokens >= needed and not (low and self._normal_waiting):
+                        self._tokens -= 1.0
+                        self._cond.notify_all()
+                        return True
+                    wait = (needed - self._tokens) / self._rate if self._tokens < needed else 0.05
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            return False
+                        wait = min(wait, remaining)
+                    self._cond.wait(wait)
+            finally:
+                if not low:
+                    self._normal_waiting -= 1
+
+
+class SharedRateLimiter:
+    """`RateLimiter` for several processes: the bucket lives in shared memory.
+
+    Create it in the parent and pass it to worker processes (as a `Process`
+    argument, from the same multiprocessing `context`), so a pool of workers stays
+    within one API budget. Waiters poll, sleeping outside the lock, at most
+    `poll_seconds` at a time.
+    """
+
+    _TOKENS, _UPDATED, _NORMAL_WAITING = range(3)
+
+    def __init__(
+        self,
+        rate_per_second: float,
+        *,
+        burst: float | None = None,
+        low_priority_reserve: float = 1.0,
+        context: "BaseContext | None" = None,
+        poll_seconds: float = 0.05,
+    ) -> None:
+        if rate_per_second <= 0:
+            raise ValueError("rate_per_second must be > 0")
+        import multiprocessing
+
+        ctx = context or multiprocessing.get_context()
+        self._rate = rate_per_second
+        self._capacity = burst if burst is not None else max(1.0, rate_per_second)
+        self._reserve = min(low_priority_reserve, self._capacity - 1.0)
+        self._poll = poll_seconds
+        self._lock = ctx.Lock()
+        # CLOCK_MONOTONIC is system-wide, so `updated` means the same in every process.
+        self._state = ctx.RawArray("d", [self._capacity, time.monotonic(), 0.0])
+
+    def _refill(self) -> float:
+        now = time.monotonic()
+        st = self._state
+        st[self._TOKENS] = min(
+            self._capacity, st[self._TOKENS] + (now - st[self._UPDATED]) * self._rate
+        )
+        st[self._UPDATED] = now
+        return st[self._TOKENS]
+
+    def acquire(self, *, priority: str = "normal", timeout: float | None = None) -> bool:
+        if priority not in PRIORITIES:
+            raise ValueError(f"unknown priority: {priority!r}")
+        low = priority == "low"
+        deadline = None if timeout is None else time.monotonic() + timeout
+        needed = 1.0 + (self._reserve if low else 0.0)
+        st = self._state
+
+        if not low:
+            with self._lock:
+                st[self._NORMAL_WAITING] += 1
+        try:
+            while True:
+                with self._lock:
+                    tokens = self._refill()
+                    if tokens >= needed and not (low and st[self._NORMAL_WAITING]):
+                        st[self._TOKENS] = tokens - 1.0
+                        return True
+                wait = (needed - tokens) / self._rate if tokens < needed else self._poll
+                wait = min(wait, self._poll)
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    wait = min(wait, remaining)
+                time.sleep(wait)
+        finally:
+            if not low:
+                with self._lock:
+                    st[self._NORMAL_WAITING] -= 1
@@ -0,0 +1,166 @@
+from collections.abc import Sequence
+from datetime import date
+
+from invest_registry.financials import FinancialMetrics
+from invest_registry.metrics import metrics
+from invest_registry.models import CompanyRecord
+from invest_registry.pagination import PageCursor, page_cursor, page_slice
+from invest_registry.profiling import span
+from invest_registry.scoring import (
+    ScoringFeatures,
+    ScoringWeights,
+    employee_band_label,
+    score_features,
+    top_k,
+)
+
+SORT_KEYS: dict[str, str] = {
+    "newest": "Newest first",
+    "oldest": "Oldest first",
+    "name": "Name (A→Z)",
+    "score": "Score (query pack weights)",
+    "growth": "Revenue growth (YoY)",
+    "revenue": "Revenue (latest year)",
+}
+
+# Orders that depend on attached financials and must be recomputed when they change.
+_FINANCIAL_SORTS = ("score", "growth", "revenue")
+
+
+class ResultView:
+    """Validated search results with memoized sort permutations.
+
+    Built once per fetch and kept in the session, so a rerun (e.g. Prev/Next) only
+    slices one page out of an existing permutation instead of re-validating and
+    re-sorting every row.
+    """
+
+    def __init__(
+        self,
+        records: Sequence[CompanyRecord],
+        *,
+        weights: ScoringWeights | None = None,
+    ) -> None:
+        self.records: list[CompanyRecord] = list(records)
+        self._weights = weights or ScoringWeights()
+        self._orders: dict[str, list[int]] = {}
+        self._filtered: dict[tuple[str, str], list[int]] = {}
+        self._haystack: list[str] | None = None
+        self._financials: FinancialMetrics | None = None
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Sequence[dict],
+        *,
+        weights: ScoringWeights | None = None,
+    ) -> "ResultView":
+        with span("model_validate"):
+            records = [CompanyRecord.model_validate(r) for r in rows]
+        return cls(records, weights=weights)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def attach_financials(self, financials: FinancialMetrics) -> None:
+        """Use `financials` for the growth/revenue sorts, scoring and table columns.
+
+        Cheap to call on every rerun: orders are only invalidated when a different
+        metrics object is attached.
+        """
+        if financials is self._financials:
+            return
+        self._financials = financials
+        for sort in _FINANCIAL_SORTS:
+            self._orders.pop(sort, None)
+        self._filtered = {k: v for k, v in self._filtered.items() if k[0] not in _FINANCIAL_SORTS}
+
+    def order(self, sort: str) -> list[int]:
+        if sort not in SORT_KEYS:
+            raise ValueError(f"unknown sort key: {sort!r}")
+        cached = self._orders.get(sort)
+        if cached is None:
+            with span("sort"):
+                cached = self._orders[sort] = self._compute_order(sort)
+        return cached
+
+    def _compute_order(self, sort: str) -> list[int]:
+        idx = range(len(self.records))
+        if sort == "newest":
+            return sorted(idx, key=lambda i: self.records[i].creation_date or date.min, reverse=True)
+        if sort == "oldest":
+            return sorted(idx, key=lambda i: self.records[i].creation_date or date.max)
+        if sort == "name":
+            return sorted(idx, key=lambda i: self.records[i].name.casefold())
+        if sort in ("growth", "revenue"):
+            metric = "yoy_growth" if sort == "growth" else "revenue"
+            values = self._metric(metric)
+            # Unknown values last, in fetch order.
+            return sorted(idx, key=lambda i: (values[i] is None, -(values[i] or 0.0)))
+        growth = self._financials.growth_by_siren() if self._financials else None
+        features = ScoringFeatures.from_records(self.records, growth_by_siren=growth)
+        scores = score_features(features, self._weights)
+        return top_k(scores, len(self.records)).tolist()
+
+    def _metric(self, name: str, rows: Sequence[CompanyRecord] | None = None) -> list:
+        rows = self.records if rows is None else rows
+        if self._financials is None:
+            return [None] * len(rows)
+        return self._financials.column(name, (r.siren for r in rows))
+
+    def cursor(self, *, page: int, page_size: int) -> PageCursor:
+        return page_cursor(len(self.records), page=page, page_size=page_size)
+
+    def page(self, cursor: PageCursor, *, sort: str = "newest") -> list[CompanyRecord]:
+        order = self.order(sort)
+        with span("paginate"):
+            return page_slice(self.records, cursor, order=order)
+
+    def filtered_order(self, sort: str, query: str) -> list[int]:
+        """Sort permutation restricted to records matching `query`.
+
+        Matches a case-insensitive substring of name, SIREN, NAF, commune or postal code.
+        """
+        needle = query.strip().casefold()
+        if not needle:
+            return self.order(sort)
+        key = (sort, needle)
+        cached = self._filtered.get(key)
+        if cached is not None:
+            metrics.inc("cache_hits_total", cache="result_filter")
+        else:
+            metrics.inc("cache_misses_total", cache="result_filter")
+            with span("filter"):
+                cached = self._filter(sort, needle)
+            if len(self._filtered) >= 32:
+                metrics.inc("cache_evictions_total", len(self._filtered), cache="result_filter")
+                self._filtered.clear()
+            self._filtered[key] = cached
+        return cached
+
+    def _filter(self, sort: str, needle: str) -> list[int]:
+        if self._haystack is None:
+            self._haystack = [
+                " ".join(b for b in [r.name, r.siren, r.naf, r.commune, r.postal_code] if b).casefold()
+                for r in self.records
+            ]
+        haystack = self._haystack
+        return [i for i in self.order(sort) if needle in haystack[i]]
+
+    def table(self, indices: Sequence[int]) -> dict[str, list]:
+        """Columnar rows for `indices`, ready for `st.dataframe`."""
+        rows = [self.records[i] for i in indices]
+        return {
+            "siren": [r.siren for r in rows],
+            "name": [r.name for r in rows],
+            "created": [r.creation_date for r in rows],
+            "employees": [employee_band_label(r.employee_band) for r in rows],
+            "employer": [r.is_employer for r in rows],
+            "naf": [r.naf for r in rows],
+            "revenue": self._metric("revenue", rows),
+            "yoy_growth": self._metric("yoy_growth", rows),
+            "margin": self._metric("margin", rows),
+            "commune": [r.commune for r in rows],
+            "postal_code": [r.postal_code for r in rows],
+            "inpi": [f"https://data.inpi.fr/entreprises/{r.siren}" for r in rows],
+        }
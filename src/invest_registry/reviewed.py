@@ -0,0 +1,163 @@
+"""Persistent set of reviewed (or excluded) SIRENs, skipped by later pulls.
+
+A SIREN is nine digits, so it fits a uint32: the set is one sorted numpy array
+(4 bytes per company, binary search for membership) plus a small buffer of
+recent additions that is merged in batches. Millions of entries stay a few MB on
+disk (`.cache/reviewed_sirens.npy`) and load in milliseconds.
+
+Pass the set as `collect_companies(exclude=...)`: excluded companies do not
+count towards `target_count`, so paging continues until enough new ones pass.
+"""
+
+import os
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+
+import numpy as np
+
+from invest_registry.storage import cache_dir, file_lock
+
+MERGE_EVERY = 4096  # buffered additions before they are merged into the sorted array
+
+
+def _as_int(siren: str) -> int | None:
+    siren = siren.strip()
+    if len(siren) != 9 or not siren.isdigit():
+        return None
+    return int(siren)
+
+
+def _in_sorted(arr: np.ndarray, query: np.ndarray) -> np.ndarray:
+    if not arr.size:
+        return np.zeros(query.size, dtype=bool)
+    idx = np.minimum(np.searchsorted(arr, query), arr.size - 1)
+    return arr[idx] == query
+
+
+def _union(arr: np.ndarray, other: np.ndarray) -> np.ndarray:
+    """Sorted, duplicate-free union (np.union1d hashes; sorting is much faster here)."""
+    merged = np.concatenate([arr, other.astype(np.uint32, copy=False)])
+    merged.sort()
+    keep = np.ones(merged.size, dtype=bool)
+    np.not_equal(merged[1:], merged[:-1], out=keep[1:])
+    return merged[keep]
+
+
+class SirenSet:
+    """Sorted uint32 array plus a pending buffer; exact (no false positives).
+
+    The set only grows, so concurrent writers are reconciled by a union on `save`,
+    under a lock file next to the set.
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._sorted = np.empty(0, dtype=np.uint32)
+        self._pending: set[int] = set()
+        self._mtime: float | None = None
+        if path is not None:
+            self.reload()
+
+    def _merge(self) -> None:
+        if self._pending:
+            extra = np.fromiter(self._pending, dtype=np.uint32, count=len(self._pending))
+            self._sorted = _union(self._sorted, extra)
+            self._pending.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._merge()
+            return int(self._sorted.size)
+
+    def __contains__(self, siren: object) -> bool:
+        value = _as_int(siren) if isinstance(siren, str) else None
+        if value is None:
+            return False
+        with self._lock:
+            if value in self._pending:
+                return True
+            arr = self._sorted
+        # A uint32 needle: a Python int would make numpy convert the whole array.
+        i = int(np.searchsorted(arr, np.uint32(value)))
+        return i < arr.size and int(arr[i]) == value
+
+    def contains_many(self, sirens: Iterable[str]) -> np.ndarray:
+        """Boolean mask, one entry per SIREN, in a single vectorised lookup."""
+        values = [_as_int(s) for s in sirens]
+        query = np.array([v if v is not None else 0 for v in values], dtype=np.uint32)
+        with self._lock:
+            self._merge()
+            found = _in_sorted(self._sorted, query)
+        return found & np.array([v is not None for v in values], dtype=bool)
+
+    def add(self, sirens: Iterable[str]) -> int:
+        """Add SIRENs (malformed ones are ignored); returns how many were new."""
+        values = {v for v in map(_as_int, sirens) if v is not None}
+        with self._lock:
+            values -= self._pending
+            batch = np.fromiter(values, dtype=np.uint32, count=len(values))
+            new = batch[~_in_sorted(self._sorted, batch)]
+            self._pending.update(new.tolist())
+            if len(self._pending) >= MERGE_EVERY:
+                self._merge()
+        return int(new.size)
+
+    def reload(self) -> None:
+        """Re-read the file if another process changed it since the last load or save."""
+        if self.path is None:
+            return
+        try:
+            mtime = self.path.stat().st_mtime
+        except FileNotFoundError:
+            return
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            self._sorted = _union(self._sorted, np.load(self.path))
+            self._mtime = mtime
+
+    def save(self) -> None:
+        """Write the set, merged with what other processes saved meanwhile (atomic replace)."""
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # The file lock keeps another process from replacing the file between our
+        # read and our write, which would drop its additions.
+        with self._lock, file_lock(self.path.with_suffix(".lock")):
+            self._merge()
+            if self.path.exists() and self.path.stat().st_mtime != self._mtime:
+                self._sorted = _union(self._sorted, np.load(self.path))
+            tmp = self.path.with_suffix(".tmp.npy")
+            np.save(tmp, self._sorted)
+            os.replace(tmp, self.path)
+            self._mtime = self.path.stat().st_mtime
+
+
+_reviewed: SirenSet | None = None
+_reviewed_lock = threading.Lock()
+
+
+def reviewed_path() -> Path:
+    return cache_dir().resolve() / "reviewed_sirens.npy"
+
+
+def reviewed_sirens() -> SirenSet:
+    """The process-wide reviewed set, refreshed from disk when another process saved it."""
+    global _reviewed
+    with _reviewed_lock:
+        if _reviewed is None or _reviewed.path != reviewed_path():
+            _reviewed = SirenSet(reviewed_path())
+        else:
+            _reviewed.reload()
+        return _reviewed
+
+
+def mark_reviewed(sirens: Iterable[str]) -> int:
+    """Add SIRENs to the reviewed set and persist it; returns how many were new."""
+    reviewed = reviewed_sirens()
+    added = reviewed.add(sirens)
+    if added:
+        reviewed.save()
+    return added
@@ -0,0 +1,277 @@
+"""Approximate segment statistics from randomly sampled pages.
+
+Questions like "what share of 62.01Z companies in Île-de-France were founded in
+the last five years" do not need a full pull. `sample_estimate` sizes each
+stratum (one search per partition: NAF list, department, ...) with a count-only
+request, then reads random pages without replacement. It applies the usual
+post-filters (`passes_filters`) and estimates the share of the strata's
+companies that pass them, with a confidence interval.
+
+Each page is a cluster of records, so a stratum's share is a ratio estimate with
+a between-page variance and a finite-population correction over its pages. The
+strata combine with their company counts as weights. Pages are drawn in rounds
+and go where they shrink the variance most (largest `W_h² S_h² / n_h(n_h + 1)`),
+so small or uniform strata are not oversampled. Sampling stops once the interval
+half-width is at most `margin`, the page budget is spent or every page was read
+(then the result is exact).
+
+Pages are drawn from the whole stratum, so every page must be readable: when
+the registry caps pagination (`max_page`), a stratum larger than the reachable
+`max_page * per_page` companies is refused before any page is read. Narrow it
+(by department, employee band, ...) instead.
+"""
+
+import math
+import random
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field, replace
+from datetime import date
+from statistics import NormalDist
+
+from invest_registry.clients.france import (
+    PER_PAGE_MAX,
+    FranceCompanySearchClient,
+    FranceSearchParams,
+    normalize_france_result,
+    passes_filters,
+)
+from invest_registry.metrics import metrics
+
+SAMPLE_MARGIN = 0.02  # target half-width of the interval on the share
+SAMPLE_CONFIDENCE = 0.95
+SAMPLE_MAX_PAGES = 200
+SAMPLE_ROUND_PAGES = 8
+SAMPLE_CONCURRENCY = 4
+
+
+@dataclass
+class _Stratum:
+    search: FranceSearchParams
+    population: int  # companies matching the search (`total_results`)
+    pages: int
+    drawn: set[int] = field(default_factory=set)
+    sizes: list[int] = field(default_factory=list)  # records per sampled page
+    hits: list[int] = field(default_factory=list)  # of which pass the filters
+
+    @property
+    def exhausted(self) -> bool:
+        return len(self.drawn) >= self.pages
+
+    @property
+    def share(self) -> float:
+        seen = sum(self.sizes)
+        return sum(self.hits) / seen if seen else 0.0
+
+    @property
+    def variance(self) -> float:
+        """Variance of `share`; infinite until two pages are read (unless that is all)."""
+        n = len(self.sizes)
+        if self.exhausted or not self.population:
+            return 0.0
+        if n < 2:
+            return math.inf
+        return (1 - n / self.pages) * self.page_variance() / n
+
+    def page_variance(self) -> float:
+        """S² of the per-page residuals, in share units (0.25 before two pages: the maximum).
+
+        Floored at the variance of independent records, with an Agresti-Coull share,
+        so a few pages with no (or only) hits do not give a zero-width interval.
+        """
+        n = len(self.sizes)
+        if n < 2:
+            return 0.25
+        p = self.share
+        mean_size = sum(self.sizes) / n
+        if not mean_size:
+            return 0.0
+        residuals = sum((y - p * m) ** 2 for y, m in zip(self.hits, self.sizes, strict=True))
+        adjusted = (sum(self.hits) + 2) / (sum(self.sizes) + 4)
+        return max(residuals / (n - 1), adjusted * (1 - adjusted) * mean_size) / mean_size**2
+
+    def draw(self, rng: random.Random) -> int:
+        """A page not drawn yet, uniformly at random."""
+        if len(self.drawn) * 2 < self.pages:
+            while (page := rng.randint(1, self.pages)) in self.drawn:
+                pass
+        else:
+            page = rng.choice([p for p in range(1, self.pages + 1) if p not in self.drawn])
+        self.drawn.add(page)
+        return page
+
+
+@dataclass(frozen=True)
+class StratumEstimate:
+    search: FranceSearchParams
+    population: int
+    pages_sampled: int
+    pages_total: int
+    records_seen: int
+    share: float
+
+
+@dataclass(frozen=True)
+class SampleEstimate:
+    """Share (and count) of the strata's companies that pass the post-filters."""
+
+    share: float
+    low: float
+    high: float
+    population: int  # companies in all strata
+    confidence: float
+    pages_fetched: int  # sampled pages, count requests excluded
+    records_seen: int
+    stopped: str  # "margin" | "budget" | "exhausted" ("running" in `on_round`)
+    strata: tuple[StratumEstimate, ...]
+
+    @property
+    def margin(self) -> float:
+        return (self.high - self.low) / 2
+
+    @property
+    def count(self) -> float:
+        return self.share * self.population
+
+    @property
+    def count_low(self) -> float:
+        return self.low * self.population
+
+    @property
+    def count_high(self) -> float:
+        return self.high * self.population
+
+
+def _estimate(strata: list[_Stratum], *, confidence: float, stopped: str) -> SampleEstimate:
+    population = sum(s.population for s in strata)
+    share = variance = 0.0
+    for s in strata:
+        if population and s.population:
+            weight = s.population / population
+            share += weight * s.share
+            variance += weight**2 * s.variance
+    half = NormalDist().inv_cdf((1 + confidence) / 2) * math.sqrt(variance)
+    return SampleEstimate(
+        share=share,
+        low=max(0.0, share - half),
+        high=min(1.0, share + half),
+        population=population,
+        confidence=confidence,
+        pages_fetched=sum(len(s.sizes) for s in strata),
+        records_seen=sum(sum(s.sizes) for s in strata),
+        stopped=stopped,
+        strata=tuple(
+            StratumEstimate(
+                search=s.search,
+                population=s.population,
+                pages_sampled=len(s.sizes),
+                pages_total=s.pages,
+                records_seen=sum(s.sizes),
+                share=s.share,
+            )
+            for s in strata
+        ),
+    )
+
+
+def _describe(search: FranceSearchParams) -> str:
+    fields = asdict(search)
+    return ", ".join(f"{k}={v}" for k, v in fields.items() if v and k not in ("minimal", "include"))
+
+
+def _allocate(strata: list[_Stratum], pages: int) -> list[_Stratum]:
+    """Greedy allocation of the next `pages` draws: largest variance reduction first."""
+    population = sum(s.population for s in strata) or 1
+    planned = {id(s): len(s.sizes) for s in strata}
+    out: list[_Stratum] = []
+    for _ in range(pages):
+        best, gain = None, 0.0
+        for s in strata:
+            n = planned[id(s)]
+            if not s.population or n >= s.pages:
+                continue
+            weight = s.population / population
+            g = math.inf if n < 2 else weight**2 * s.page_variance() / (n * (n + 1))
+            if best is None or g > gain:
+                best, gain = s, g
+        if best is None:
+            break
+        planned[id(best)] += 1
+        out.append(best)
+    return out
+
+
+def sample_estimate(
+    client: FranceCompanySearchClient,
+    strata: Sequence[FranceSearchParams],
+    *,
+    postal_code_prefix: str | None = None,
+    min_creation_date: date | None = None,
+    is_employer: bool | None = None,
+    per_page: int = PER_PAGE_MAX,
+    margin: float = SAMPLE_MARGIN,
+    confidence: float = SAMPLE_CONFIDENCE,
+    max_pages: int = SAMPLE_MAX_PAGES,
+    round_pages: int = SAMPLE_ROUND_PAGES,
+    concurrency: int = SAMPLE_CONCURRENCY,
+    max_page: int | None = None,
+    seed: int | None = None,
+    on_round: Callable[[SampleEstimate], None] | None = None,
+) -> SampleEstimate:
+    """Estimate the share of companies in `strata` that pass the post-filters.
+
+    The strata must not overlap (e.g. `plan_naf_searches` output, or one search per
+    department). `max_page` is the registry's pagination cap; raises ValueError if a
+    stratum has pages past it. `on_round` gets the running estimate after every round.
+    """
+    rng = random.Random(seed)
+
+    def _size(search: FranceSearchParams) -> _Stratum:
+        population = client.search(search=search, page=1, per_page=1).total_results
+        return _Stratum(search, population, math.ceil(population / per_page))
+
+    def _read(item: tuple[_Stratum, int]) -> tuple[_Stratum, int, int]:
+        stratum, page = item
+        resp = client.search(search=stratum.search, page=page, per_page=per_page)
+        metrics.inc("sample_pages_fetched_total")
+        hits = sum(
+            passes_filters(
+                normalize_france_result(r),
+                postal_code_prefix=postal_code_prefix,
+                min_creation_date=min_creation_date,
+                is_employer=is_employer,
+            )
+            for r in resp.results
+        )
+        return stratum, len(resp.results), hits
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        states = list(pool.map(_size, strata))
+        too_large = [s for s in states if max_page is not None and s.pages > max_page]
+        if too_large:
+            described = "; ".join(
+                f"{_describe(s.search)}: {s.population} companies" for s in too_large
+            )
+            raise ValueError(
+                f"only the first {max_page * per_page} companies of a search can be paged "
+                f"through, narrower strata are needed ({described})"
+            )
+        fetched = 0
+        while True:
+            current = _estimate(states, confidence=confidence, stopped="")
+            if all(s.exhausted or not s.population for s in states):
+                return replace(current, stopped="exhausted")
+            if current.margin <= margin:
+                return replace(current, stopped="margin")
+            if fetched >= max_pages:
+                return replace(current, stopped="budget")
+
+            draws = [
+                (s, s.draw(rng)) for s in _allocate(states, min(round_pages, max_pages - fetched))
+            ]
+            for stratum, size, hits in pool.map(_read, draws):
+                stratum.sizes.append(size)
+                stratum.hits.append(hits)
+            fetched += len(draws)
+            if on_round is not None:
+                on_round(_estimate(states, confidence=confidence, stopped="running"))
@@ -1,3 +1,12 @@
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass, field
+from datetime import date
+from types import MappingProxyType
+
+import numpy as np
+
+from invest_registry.models import CompanyRecord
+
 EMPLOYEE_BAND_LABELS: dict[str, str] = {
     "00": "0",
     "01": "1-2",
@@ -17,7 +26,135 @@ EMPLOYEE_BAND_LABELS: dict[str, str] = {
     "NN": "unknown",
 }
 
+# Bands are ordered by size; "NN" (unknown) deliberately has no ordinal.
+EMPLOYEE_BAND_ORDINALS: dict[str, int] = {
+    code: i for i, code in enumerate(c for c in EMPLOYEE_BAND_LABELS if c != "NN")
+}
+MAX_EMPLOYEE_BAND_ORDINAL = max(EMPLOYEE_BAND_ORDINALS.values())
+
+
 def employee_band_label(code: str | None) -> str | None:
     if code is None:
         return None
     return EMPLOYEE_BAND_LABELS.get(code, code)
+
+
+@dataclass(frozen=True)
+class ScoringWeights:
+    # Each factor is scaled to [0, 1] (growth to [-1, 1]) before weighting;
+    # unknown values contribute 0.
+    age: float = 1.0  # rewards young companies, linearly down to max_age_years
+    employee_band: float = 0.5
+    employer: float = 0.5
+    naf: float = 1.0
+    growth: float = 1.0  # YoY revenue growth, clipped to [-100%, +100%]
+    max_age_years: float = 10.0
+    naf_weights: Mapping[str, float] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        # Frozen all the way down: the mapping is copied and read-only.
+        object.__setattr__(self, "naf_weights", MappingProxyType(dict(self.naf_weights)))
+
+
+@dataclass(frozen=True)
+class ScoringFeatures:
+    age_years: np.ndarray  # float64, NaN when unknown
+    band_ordinal: np.ndarray  # float64, NaN when unknown
+    is_employer: np.ndarray  # float64: 1.0 / 0.0 / NaN
+    naf_index: np.ndarray  # int32 index into naf_vocab, -1 when unknown
+    naf_vocab: tuple[str, ...]
+    growth: np.ndarray  # float64, NaN when unknown
+
+    def __len__(self) -> int:
+        return len(self.age_years)
+
+    @classmethod
+    def from_records(
+        cls,
+        records: Sequence[CompanyRecord],
+        *,
+        today: date | None = None,
+        growth_by_siren: Mapping[str, float] | None = None,
+    ) -> "ScoringFeatures":
+        """Feature columns for `records`, in one Python pass (about 0.6 s per million).
+
+        Records are pydantic models, so reading their fields is the cost; it is paid
+        once per result set (`ResultView` keeps the order). The sub-second target for
+        a million records covers `score_features` and `top_k` on these columns, not
+        this extraction; `bench_pipeline.py` times the two separately.
+        """
+        today = today or date.today()
+        n = len(records)
+        age_days = np.full(n, np.nan)
+        band = np.full(n, np.nan)
+        employer = np.full(n, np.nan)
+        naf_index = np.full(n, -1, dtype=np.int32)
+        growth = np.full(n, np.nan)
+
+        vocab: dict[str, int] = {}
+        for i, r in enumerate(records):
+            if r.creation_date:
+                age_days[i] = (today - r.creation_date).days
+            if r.employee_band in EMPLOYEE_BAND_ORDINALS:
+                band[i] = EMPLOYEE_BAND_ORDINALS[r.employee_band]
+            if r.is_employer is not None:
+                employer[i] = 1.0 if r.is_employer else 0.0
+            if r.naf:
+                naf_index[i] = vocab.setdefault(r.naf, len(vocab))
+            if growth_by_siren is not None:
+                g = growth_by_siren.get(r.siren)
+                if g is not None:
+                    growth[i] = g
+
+        return cls(
+            age_years=age_days / 365.25,
+            band_ordinal=band,
+            is_employer=employer,
+            naf_index=naf_index,
+            naf_vocab=tuple(vocab),
+            growth=growth,
+        )
+
+
+def score_features(features: ScoringFeatures, weights: ScoringWeights) -> np.ndarray:
+    recency = np.clip(1.0 - features.age_years / weights.max_age_years, 0.0, 1.0)
+    band = features.band_ordinal / MAX_EMPLOYEE_BAND_ORDINAL
+    growth = np.clip(features.growth, -1.0, 1.0)
+
+    # One extra slot at the end so that naf_index == -1 looks up a 0 weight.
+    naf_lookup = np.array(
+        [weights.naf_weights.get(code, 0.0) for code in features.naf_vocab] + [0.0]
+    )
+    naf = naf_lookup[features.naf_index]
+
+    score = weights.age * np.nan_to_num(recency)
+    score += weights.employee_band * np.nan_to_num(band)
+    score += weights.employer * np.nan_to_num(features.is_employer)
+    score += weights.naf * naf
+    score += weights.growth * np.nan_to_num(growth)
+    return score
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first, without sorting the whole array."""
+    n = len(scores)
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.intp)
+    if k >= n:
+        return np.argsort(-scores, kind="stable")
+    idx = np.argpartition(-scores, k - 1)[:k]
+    return idx[np.argsort(-scores[idx], kind="stable")]
+
+
+def rank_records(
+    records: Sequence[CompanyRecord],
+    weights: ScoringWeights,
+    *,
+    k: int | None = None,
+    today: date | None = None,
+    growth_by_siren: Mapping[str, float] | None = None,
+) -> list[tuple[CompanyRecord, float]]:
+    features = ScoringFeatures.from_records(records, today=today, growth_by_siren=growth_by_siren)
+    scores = score_features(features, weights)
+    order = top_k(scores, len(records) if k is None else k)
+    return [(records[i], float(scores[i])) for i in order]
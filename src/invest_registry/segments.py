@@ -0,0 +1,211 @@
+"""Segment sizing from count-only queries: market maps without downloading records.
+
+Every `/search` response carries the exact `total_results` of its filters, so a
+`per_page=1`, `minimal=True` request sizes a segment for a few hundred bytes.
+`market_map` fans such requests out over the cross product of dimension values
+(NAF × department × employee band × administrative state), `SEGMENT_CONCURRENCY`
+at a time through the client's rate limiter.
+
+Before the cells, one request per dimension value sizes that value alone; cells
+with an empty value are known to be empty and are never requested. Counts are
+cached in `.cache/segments/counts.json` for `COUNT_TTL_SECONDS`, so re-slicing
+the same market costs no requests.
+"""
+
+import itertools
+import json
+import os
+import threading
+import time
+from collections.abc import Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+
+from invest_registry.clients.france import FranceCompanySearchClient, FranceSearchParams
+from invest_registry.metrics import metrics
+from invest_registry.naf import expand_naf, plan_naf_searches
+from invest_registry.storage import cache_dir
+
+# Dimension name -> search parameter it filters on ("naf" takes any NAF node, see naf.py).
+SEGMENT_DIMENSIONS = {
+    "naf": "activite_principale",
+    "departement": "departement",
+    "tranche_effectif_salarie": "tranche_effectif_salarie",
+    "etat_administratif": "etat_administratif",
+}
+SEGMENT_CONCURRENCY = 4
+COUNT_TTL_SECONDS = 24 * 60 * 60
+
+
+def _cache_key(search: FranceSearchParams) -> str:
+    return json.dumps(asdict(search), sort_keys=True)
+
+
+class CountCache:
+    """`total_results` per search, in memory and in a JSON file, with a TTL."""
+
+    def __init__(self, path: Path | None = None, *, ttl_seconds: float = COUNT_TTL_SECONDS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._counts: dict[str, tuple[int, float]] = {}
+        if path is not None and path.exists():
+            raw = json.loads(path.read_text(encoding="utf-8"))
+            self._counts = {key: (int(c), float(t)) for key, (c, t) in raw.items()}
+
+    def get(self, search: FranceSearchParams) -> int | None:
+        with self._lock:
+            hit = self._counts.get(_cache_key(search))
+        if hit is None or time.time() - hit[1] > self.ttl_seconds:
+            return None
+        return hit[0]
+
+    def put(self, search: FranceSearchParams, count: int) -> None:
+        with self._lock:
+            self._counts[_cache_key(search)] = (count, time.time())
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        now = time.time()
+        with self._lock:
+            live = {k: v for k, v in self._counts.items() if now - v[1] <= self.ttl_seconds}
+            tmp = self.path.with_suffix(".json.tmp")
+            tmp.write_text(json.dumps(live), encoding="utf-8")
+            os.replace(tmp, self.path)
+
+
+def count_cache() -> CountCache:
+    d = cache_dir() / "segments"
+    d.mkdir(parents=True, exist_ok=True)
+    return CountCache(d / "counts.json")
+
+
+@dataclass(frozen=True)
+class MarketMap:
+    """Company counts per cell (one value per dimension, in `dimensions` order)."""
+
+    dimensions: tuple[str, ...]
+    cells: dict[tuple[str, ...], int]
+    marginals: dict[str, dict[str, int]]  # each dimension value on its own
+    total: int  # the base search alone, every dimension unfiltered
+    requests: int  # count queries sent upstream
+    cached: int  # count queries answered by the cache
+    pruned: int  # cells skipped because one of their values is empty
+
+    def rows(self) -> list[dict[str, str | int]]:
+        return [
+            {**dict(zip(self.dimensions, values, strict=True)), "count": count}
+            for values, count in self.cells.items()
+        ]
+
+    def pivot(self, row: str, column: str) -> dict[str, dict[str, int]]:
+        """Two-way table, summed over the other dimensions."""
+        r, c = self.dimensions.index(row), self.dimensions.index(column)
+        table: dict[str, dict[str, int]] = {}
+        for values, count in self.cells.items():
+            cell = table.setdefault(values[r], {})
+            cell[values[c]] = cell.get(values[c], 0) + count
+        return table
+
+
+def _segment_searches(
+    base: FranceSearchParams, assignment: Mapping[str, str]
+) -> list[FranceSearchParams]:
+    """Disjoint searches whose counts add up to the segment (a NAF node may need several)."""
+    search = replace(base, minimal=True, include=None)
+    for dimension, value in assignment.items():
+        if dimension != "naf":
+            search = replace(search, **{SEGMENT_DIMENSIONS[dimension]: value})
+    if "naf" not in assignment:
+        return [search]
+    return plan_naf_searches(expand_naf(assignment["naf"]), search)
+
+
+def market_map(
+    client: FranceCompanySearchClient,
+    dimensions: Mapping[str, Sequence[str]],
+    *,
+    base: FranceSearchParams | None = None,
+    concurrency: int = SEGMENT_CONCURRENCY,
+    cache: CountCache | None = None,
+) -> MarketMap:
+    """Count every combination of `dimensions` values (each a list of filter values).
+
+    `base` carries the filters shared by every cell (e.g. `q`); its own value for a
+    dimension is replaced in each cell. NAF values may be any NAF node (`J`, `62`,
+    `58.2`, `62.01Z`) but must not overlap (`62` and `62.01Z`), so that cells and
+    marginals add up; the other values are passed to the API as they are.
+    """
+    unknown = set(dimensions) - set(SEGMENT_DIMENSIONS)
+    if unknown:
+        raise ValueError(f"unknown segment dimension(s): {', '.join(sorted(unknown))}")
+    claimed: dict[str, str] = {}  # NAF code -> the value that covers it
+    for value in dimensions.get("naf", ()):
+        codes = expand_naf(value)
+        if not codes:
+            raise ValueError(f"unknown NAF code or prefix: {value}")
+        for code in codes:
+            other = claimed.setdefault(code, value)
+            if other != value:
+                raise ValueError(
+                    f"NAF values {other} and {value} overlap; their companies would be "
+                    "counted twice"
+                )
+    base = base or FranceSearchParams(q="")
+    names = tuple(dimensions)
+    stats = {"requests": 0, "cached": 0}
+    stats_lock = threading.Lock()
+
+    def _count(search: FranceSearchParams) -> int:
+        if cache is not None and (hit := cache.get(search)) is not None:
+            with stats_lock:
+                stats["cached"] += 1
+            return hit
+        count = client.search(search=search, page=1, per_page=1).total_results
+        metrics.inc("segment_count_requests_total")
+        with stats_lock:
+            stats["requests"] += 1
+        if cache is not None:
+            cache.put(search, count)
+        return count
+
+    def _size(assignment: Mapping[str, str]) -> int:
+        return sum(_count(s) for s in _segment_searches(base, assignment))
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        singles = [{}] + [{name: value} for name in names for value in dimensions[name]]
+        sizes = list(pool.map(_size, singles))
+        total = sizes[0]
+        marginals: dict[str, dict[str, int]] = {name: {} for name in names}
+        for single, size in zip(singles[1:], sizes[1:], strict=True):
+            ((name, value),) = single.items()
+            marginals[name][value] = size
+
+        combos = list(itertools.product(*(dimensions[name] for name in names)))
+        live = [
+            values
+            for values in combos
+            if total and all(marginals[n][v] for n, v in zip(names, values, strict=True))
+        ]
+        if len(names) == 1:
+            counts = [marginals[names[0]][values[0]] for values in live]  # already sized
+        else:
+            counts = list(
+                pool.map(lambda values: _size(dict(zip(names, values, strict=True))), live)
+            )
+
+    cells = dict.fromkeys(combos, 0)
+    cells.update(zip(live, counts, strict=True))
+    if cache is not None:
+        cache.save()
+    return MarketMap(
+        dimensions=names,
+        cells=cells,
+        marginals=marginals,
+        total=total,
+        requests=stats["requests"],
+        cached=stats["cached"],
+        pruned=len(combos) - len(live),
+    )
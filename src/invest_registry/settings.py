@@ -1,3 +1,5 @@
+from functools import cache
+
 from pydantic_settings import BaseSettings
 
 
@@ -5,6 +7,12 @@ class Settings(BaseSettings):
     france_api_base_url: str = "https://recherche-entreprises.api.gouv.fr"
     http_timeout_seconds: float = 20.0
     http_max_retries: int = 3
+    # Exponential backoff base between retries; a Retry-After header takes precedence.
+    http_retry_backoff_seconds: float = 0.5
+    # Shared request budget for the registry API (documented limit: 7 req/s per IP).
+    france_api_rate_limit_per_second: float = 7.0
+    # Last page the registry serves for one search, if it caps pagination; unset means no cap.
+    france_api_max_page: int | None = None
 
     # Optional: enable semi-automatic social discovery in the UI.
     # If unset, the app will fall back to plain search links.
@@ -12,7 +20,24 @@ class Settings(BaseSettings):
     serpapi_api_key: str | None = None
     google_cse_api_key: str | None = None
     google_cse_cx: str | None = None
+    # Paid-query guard rails for social discovery.
+    social_daily_query_budget: int = 100
+    social_cache_ttl_hours: float = 7 * 24
+    social_max_concurrency: int = 4
+
+    # Optional shared backend (`python -m invest_registry.backend`); unset runs in-process.
+    backend_url: str | None = None
+    backend_timeout_seconds: float = 300.0
+
 
+@cache
+def get_settings() -> Settings:
+    """The process-wide settings, read from the environment on first call."""
+    return Settings()
 
-settings = Settings()
 
+def __getattr__(name: str) -> Settings:
+    # `settings` is resolved on first access, not when this module is imported.
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,9 +1,26 @@
-from dataclasses import dataclass
+import hashlib
+import json
+import threading
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import TYPE_CHECKING
 from urllib.parse import quote_plus
 
-import httpx
+from invest_registry.france_people import dirigeants_personnes_physiques
+from invest_registry.metrics import metrics
+from invest_registry.models import FranceSearchResult
+from invest_registry.storage import cache_dir, file_lock, write_text_atomic
 
-from invest_registry.settings import Settings, settings
+if TYPE_CHECKING:
+    import httpx
+
+    from invest_registry.settings import Settings
+
+SOCIAL_KINDS = ("linkedin", "x")
 
 
 @dataclass(frozen=True)
@@ -29,13 +46,31 @@ def google_search_url(query: str) -> str:
     return f"https://www.google.com/search?q={quote_plus(query)}"
 
 
+def _default_settings() -> "Settings":
+    from invest_registry.settings import get_settings
+
+    return get_settings()
+
+
+def provider_configured(app_settings: "Settings | None" = None) -> bool:
+    app_settings = app_settings or _default_settings()
+    provider = (app_settings.search_provider or "").strip().lower()
+    if provider == "serpapi":
+        return bool(app_settings.serpapi_api_key)
+    if provider == "google_cse":
+        return bool(app_settings.google_cse_api_key and app_settings.google_cse_cx)
+    return False
+
+
 def search_candidates(
     *,
     query: str,
     kind: str,
-    app_settings: Settings = settings,
+    app_settings: "Settings | None" = None,
     max_results: int = 5,
+    http: "httpx.Client | None" = None,
 ) -> list[SocialCandidate]:
+    app_settings = app_settings or _default_settings()
     provider = (app_settings.search_provider or "").strip().lower()
     if not provider:
         return []
@@ -43,7 +78,12 @@ def search_candidates(
     if provider == "serpapi":
         if not app_settings.serpapi_api_key:
             return []
-        return _search_serpapi(query=query, api_key=app_settings.serpapi_api_key, max_results=max_results)
+        return _search_serpapi(
+            query=query,
+            api_key=app_settings.serpapi_api_key,
+            max_results=max_results,
+            http=http,
+        )
 
     if provider == "google_cse":
         if not app_settings.google_cse_api_key or not app_settings.google_cse_cx:
@@ -53,13 +93,22 @@ def search_candidates(
             api_key=app_settings.google_cse_api_key,
             cx=app_settings.google_cse_cx,
             max_results=max_results,
+            http=http,
         )
 
     raise ValueError(f"unknown search_provider: {provider!r}")
 
 
-def _search_serpapi(*, query: str, api_key: str, max_results: int) -> list[SocialCandidate]:
-    resp = httpx.get(
+def _search_serpapi(
+    *,
+    query: str,
+    api_key: str,
+    max_results: int,
+    http: "httpx.Client | None" = None,
+) -> list[SocialCandidate]:
+    import httpx
+
+    resp = (http or httpx).get(
         "https://serpapi.com/search.json",
         params={"engine": "google", "q": query, "api_key": api_key, "num": max_results},
         timeout=20.0,
@@ -83,8 +132,11 @@ def _search_google_cse(
     api_key: str,
     cx: str,
     max_results: int,
+    http: "httpx.Client | None" = None,
 ) -> list[SocialCandidate]:
-    resp = httpx.get(
+    import httpx
+
+    resp = (http or httpx).get(
         "https://www.googleapis.com/customsearch/v1",
         params={"key": api_key, "cx": cx, "q": query, "num": max_results},
         timeout=20.0,
@@ -101,3 +153,237 @@ def _search_google_cse(
         out.append(SocialCandidate(title=title, url=url, snippet=item.get("snippet")))
     return out
 
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.casefold().split())
+
+
+class SocialSearchCache:
+    """Persistent search results, one JSON file per normalized query, with a TTL."""
+
+    def __init__(self, *, ttl_seconds: float, root: Path | None = None) -> None:
+        self._ttl = ttl_seconds
+        self._root = root or cache_dir() / "social"
+        self._root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, provider: str, query: str) -> Path:
+        digest = hashlib.sha1(f"{provider}:{normalize_query(query)}".encode()).hexdigest()
+        return self._root / f"{digest}.json"
+
+    def get(self, provider: str, query: str) -> list[SocialCandidate] | None:
+        path = self._path(provider, query)
+        if not path.exists():
+            metrics.inc("cache_misses_total", cache="social")
+            return None
+        with metrics.timer("cache_load_seconds", cache="social"):
+            raw = json.loads(path.read_text(encoding="utf-8"))
+        if time.time() - raw["fetched_at"] > self._ttl:
+            metrics.inc("cache_evictions_total", cache="social")
+            metrics.inc("cache_misses_total", cache="social")
+            return None
+        metrics.inc("cache_hits_total", cache="social")
+        return [SocialCandidate(**c) for c in raw["candidates"]]
+
+    def put(self, provider: str, query: str, candidates: list[SocialCandidate]) -> None:
+        payload = {
+            "query": normalize_query(query),
+            "provider": provider,
+            "fetched_at": time.time(),
+            "candidates": [asdict(c) for c in candidates],
+        }
+        write_text_atomic(self._path(provider, query), json.dumps(payload, ensure_ascii=False))
+
+
+# One lock for every QueryBudget in the process (callers build their own instances);
+# the file lock in `try_spend` covers other processes.
+_budget_lock = threading.Lock()
+
+
+class QueryBudget:
+    """Daily cap on paid search queries, persisted so restarts don't reset it.
+
+    Spending is serialized across threads and processes, so concurrent callers (the
+    pages, the backend's request threads, CLI runs) never overspend the day's budget.
+    """
+
+    def __init__(self, daily_limit: int, *, root: Path | None = None) -> None:
+        self.daily_limit = daily_limit
+        self._root = root or cache_dir() / "social"
+        self._root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self) -> Path:
+        return self._root / f"quota-{date.today().isoformat()}.json"
+
+    def used(self) -> int:
+        path = self._path()
+        if not path.exists():
+            return 0
+        return int(json.loads(path.read_text(encoding="utf-8"))["used"])
+
+    def remaining(self) -> int:
+        return max(0, self.daily_limit - self.used())
+
+    def try_spend(self) -> bool:
+        with _budget_lock, file_lock(self._root / "quota.lock"):
+            used = self.used()
+            if used >= self.daily_limit:
+                return False
+            write_text_atomic(self._path(), json.dumps({"used": used + 1}))
+            return True
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+def cached_search_candidates(
+    *,
+    query: str,
+    kind: str,
+    app_settings: "Settings | None" = None,
+    cache: SocialSearchCache | None = None,
+    budget: QueryBudget | None = None,
+    max_results: int = 5,
+    http: "httpx.Client | None" = None,
+) -> tuple[list[SocialCandidate], bool]:
+    """search_candidates behind the persistent cache and the daily budget.
+
+    Returns the candidates and whether they came from the cache. Raises
+    QueryBudgetExceeded instead of sending a query over budget.
+    """
+    app_settings = app_settings or _default_settings()
+    if not provider_configured(app_settings):
+        return [], False
+    provider = (app_settings.search_provider or "").strip().lower()
+    cache = cache or SocialSearchCache(ttl_seconds=app_settings.social_cache_ttl_hours * 3600)
+    budget = budget or QueryBudget(app_settings.social_daily_query_budget)
+
+    cached = cache.get(provider, query)
+    if cached is not None:
+        return cached, True
+    if not budget.try_spend():
+        raise QueryBudgetExceeded(
+            f"daily search budget of {budget.daily_limit} queries is used up"
+        )
+    found = search_candidates(
+        query=query, kind=kind, app_settings=app_settings, max_results=max_results, http=http
+    )
+    cache.put(provider, query, found)
+    return found, False
+
+
+@dataclass(frozen=True)
+class FounderQuery:
+    siren: str
+    person_name: str
+    company_name: str
+    kind: str
+
+    @property
+    def query(self) -> str:
+        if self.kind == "linkedin":
+            return linkedin_people_query(self.person_name, self.company_name)
+        return x_people_query(self.person_name, self.company_name)
+
+
+@dataclass
+class DiscoveryReport:
+    candidates: dict[FounderQuery, list[SocialCandidate]] = field(default_factory=dict)
+    queries_made: int = 0
+    cache_hits: int = 0
+    deduplicated: int = 0  # same normalized query asked for several founders
+    skipped_over_budget: int = 0
+    failed: int = 0  # queries the provider answered with an error
+
+    @property
+    def queries_saved(self) -> int:
+        return self.cache_hits + self.deduplicated
+
+
+def founder_queries(
+    companies: Iterable[FranceSearchResult],
+    *,
+    kinds: Iterable[str] = SOCIAL_KINDS,
+) -> list[FounderQuery]:
+    out: list[FounderQuery] = []
+    kinds = tuple(kinds)
+    for c in companies:
+        company_name = c.nom_raison_sociale or c.nom_complet or ""
+        for d in dirigeants_personnes_physiques(c.dirigeants):
+            full_name = " ".join([p for p in [d.prenoms, d.nom] if p]).strip()
+            if not full_name:
+                continue
+            out.extend(FounderQuery(c.siren, full_name, company_name, kind) for kind in kinds)
+    return out
+
+
+def discover_founder_socials(
+    companies: Iterable[FranceSearchResult],
+    *,
+    kinds: Iterable[str] = SOCIAL_KINDS,
+    app_settings: "Settings | None" = None,
+    cache: SocialSearchCache | None = None,
+    budget: QueryBudget | None = None,
+    max_results: int = 5,
+) -> DiscoveryReport:
+    """Candidate profiles for every physical-person dirigeant across a shortlist.
+
+    Queries are deduplicated, answered from the persistent cache when fresh, and
+    otherwise sent with bounded concurrency over one HTTP connection pool until the
+    daily budget runs out. A failed query is counted in `failed` and does not stop
+    the others.
+    """
+    app_settings = app_settings or _default_settings()
+    report = DiscoveryReport()
+    wanted = founder_queries(companies, kinds=kinds)
+    if not wanted or not provider_configured(app_settings):
+        return report
+
+    cache = cache or SocialSearchCache(ttl_seconds=app_settings.social_cache_ttl_hours * 3600)
+    budget = budget or QueryBudget(app_settings.social_daily_query_budget)
+
+    by_query: dict[str, list[FounderQuery]] = {}
+    for fq in wanted:
+        by_query.setdefault(normalize_query(fq.query), []).append(fq)
+    report.deduplicated = len(wanted) - len(by_query)
+
+    lock = threading.Lock()
+
+    def _run(key: str, http: "httpx.Client") -> None:
+        fqs = by_query[key]
+        try:
+            found, from_cache = cached_search_candidates(
+                query=fqs[0].query,
+                kind=fqs[0].kind,
+                app_settings=app_settings,
+                cache=cache,
+                budget=budget,
+                max_results=max_results,
+                http=http,
+            )
+        except QueryBudgetExceeded:
+            with lock:
+                report.skipped_over_budget += 1
+            return
+        except Exception:  # noqa: BLE001 - one failed query must not lose the batch
+            metrics.inc("social_query_failures_total")
+            with lock:
+                report.failed += 1
+            return
+        with lock:
+            if from_cache:
+                report.cache_hits += 1
+            else:
+                report.queries_made += 1
+            for fq in fqs:
+                report.candidates[fq] = found
+
+    import httpx
+
+    workers = max(1, app_settings.social_max_concurrency)
+    with httpx.Client(timeout=20.0) as http, ThreadPoolExecutor(max_workers=workers) as pool:
+        for f in [pool.submit(_run, key, http) for key in by_query]:
+            f.result()
+
+    return report
@@ -1,6 +1,13 @@
 import json
+import os
+import sys
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
+from invest_registry.metrics import metrics
 from invest_registry.models import CompanyRecord
 
 
@@ -10,21 +17,87 @@ def cache_dir() -> Path:
     return d
 
 
-def cache_path(key: str) -> Path:
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """Hold an exclusive lock on `path` (created if missing) across processes and threads.
+
+    Guards read-modify-write cycles on shared cache files; the lock file itself stays empty.
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if sys.platform == "win32":
+            import msvcrt
+
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield  # closing the descriptor releases the lock
+    finally:
+        os.close(fd)
+
+
+def write_text_atomic(path: Path, text: str) -> None:
+    """Replace `path` with `text` in one step; readers never see a partial file."""
+    tmp = path.with_name(f"{path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def cache_path(key: str, *, suffix: str = ".ndjson") -> Path:
     safe = "".join(ch for ch in key if ch.isalnum() or ch in ("-", "_", "."))
-    return cache_dir() / f"{safe}.json"
+    return cache_dir() / f"{safe}{suffix}"
 
 
-def load_cached_records(key: str) -> list[CompanyRecord] | None:
+def iter_cached_records(key: str) -> Iterator[CompanyRecord]:
+    """Stream cached records one line at a time (NDJSON, one record per line)."""
     path = cache_path(key)
     if not path.exists():
+        legacy = cache_path(key, suffix=".json")
+        if legacy.exists():
+            # Older caches are a single JSON array; they have to be read whole.
+            for r in json.loads(legacy.read_text(encoding="utf-8")):
+                yield CompanyRecord.model_validate(r)
+        return
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield CompanyRecord.model_validate_json(line)
+
+
+def has_cached_records(key: str) -> bool:
+    return cache_path(key).exists() or cache_path(key, suffix=".json").exists()
+
+
+def cached_records_age(key: str) -> float | None:
+    """Seconds since the cached records for `key` were written, or None if there are none."""
+    for path in (cache_path(key), cache_path(key, suffix=".json")):
+        try:
+            return time.time() - path.stat().st_mtime
+        except FileNotFoundError:
+            continue
+    return None
+
+
+def load_cached_records(key: str) -> list[CompanyRecord] | None:
+    if not has_cached_records(key):
+        metrics.inc("cache_misses_total", cache="records")
         return None
-    raw = json.loads(path.read_text(encoding="utf-8"))
-    return [CompanyRecord.model_validate(r) for r in raw]
+    metrics.inc("cache_hits_total", cache="records")
+    with metrics.timer("cache_load_seconds", cache="records"):
+        return list(iter_cached_records(key))
 
 
-def save_cached_records(key: str, records: list[CompanyRecord]) -> None:
+def save_cached_records(key: str, records: Iterable[CompanyRecord]) -> None:
     path = cache_path(key)
-    payload = [r.model_dump(mode="json") for r in records]
-    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
-
+    tmp = path.with_suffix(".ndjson.tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        for r in records:
+            f.write(r.model_dump_json() + "\n")
+    tmp.replace(path)
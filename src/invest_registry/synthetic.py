@@ -0,0 +1,106 @@
+"""Deterministic synthetic registry data, shaped like `/search` API payloads.
+
+Used by the benchmarks and offline tests. Creation dates are spread uniformly over
+the last `CREATION_SPAN_YEARS` years, so a `min_creation_date` cut-off at
+`years_back` years passes about `years_back / CREATION_SPAN_YEARS` of the corpus.
+"""
+
+import random
+from datetime import date, timedelta
+
+from invest_registry.clients.france import PER_PAGE_MAX
+
+CREATION_SPAN_YEARS = 20
+
+NAF_CODES = ("62.01Z", "58.29C", "70.22Z", "62.02A", "63.11Z", "72.19Z", "47.91B", "56.10A")
+POSTAL_CODES = ("75001", "75011", "75017", "69002", "13001", "33000", "92100", "31000")
+EMPLOYEE_BANDS = ("NN", "00", "01", "02", "03", "11", "12")
+_NAMES = ("ALPHA", "NOVA", "LUMEN", "ORBIT", "PIXEL", "VERTEX", "QUARTZ", "SOLEIL")
+_FIRST_NAMES = ("JEAN", "MARIE", "LUCAS", "CAMILLE", "HUGO", "LEA", "NICOLAS", "SARAH")
+_LAST_NAMES = ("MARTIN", "BERNARD", "DUBOIS", "THOMAS", "ROBERT", "PETIT", "DURAND", "LEROY")
+
+
+def synthetic_result(
+    i: int,
+    *,
+    rng: random.Random,
+    today: date,
+    include_details: bool = False,
+) -> dict:
+    """One `results[]` item; SIRENs are the zero-padded index, so they are unique."""
+    siren = f"{i:09d}"
+    created = today - timedelta(days=rng.randrange(CREATION_SPAN_YEARS * 365))
+    postal_code = rng.choice(POSTAL_CODES)
+    naf = rng.choice(NAF_CODES)
+    band = rng.choice(EMPLOYEE_BANDS)
+    result: dict = {
+        "siren": siren,
+        "nom_raison_sociale": f"{rng.choice(_NAMES)} {rng.choice(_NAMES)} {i}",
+        "activite_principale": naf,
+        "date_creation": created.isoformat(),
+        "nombre_etablissements": 1,
+        "nombre_etablissements_ouverts": 1,
+        "siege": {
+            "siret": f"{siren}00017",
+            "activite_principale": naf,
+            "code_postal": postal_code,
+            "libelle_commune": "PARIS" if postal_code.startswith("75") else "VILLE",
+            "departement": postal_code[:2],
+            "region": "11",
+            "adresse": f"{rng.randrange(1, 200)} RUE DE LA PAIX {postal_code}",
+            "geo_adresse": f"{rng.randrange(1, 200)} Rue de la Paix {postal_code}",
+            "date_creation": created.isoformat(),
+            "tranche_effectif_salarie": None if band == "NN" else band,
+            "annee_tranche_effectif_salarie": None if band == "NN" else str(today.year - 2),
+            "etat_administratif": "A",
+            "caractere_employeur": rng.choice(["O", "N"]),
+        },
+    }
+    if include_details:
+        result["dirigeants"] = [
+            {
+                "type_dirigeant": "personne physique",
+                "qualite": "Président de SAS",
+                "nom": rng.choice(_LAST_NAMES),
+                "prenoms": rng.choice(_FIRST_NAMES),
+                "annee_de_naissance": str(rng.randrange(1960, 2000)),
+            }
+        ]
+        revenue = rng.randrange(10_000, 5_000_000)
+        result["finances"] = {
+            str(today.year - k): {
+                "ca": int(revenue / (1.3**k)),
+                "resultat_net": int(revenue / (1.3**k) * rng.uniform(-0.2, 0.2)),
+            }
+            for k in range(1, 4)
+        }
+    return result
+
+
+def synthetic_results(
+    n: int,
+    *,
+    seed: int = 0,
+    start: int = 0,
+    today: date | None = None,
+    include_details: bool = False,
+) -> list[dict]:
+    rng = random.Random(seed)
+    today = today or date.today()
+    return [
+        synthetic_result(i, rng=rng, today=today, include_details=include_details)
+        for i in range(start, start + n)
+    ]
+
+
+def synthetic_page(results: list[dict], *, page: int, per_page: int = PER_PAGE_MAX) -> dict:
+    """The `/search` response for `page` of `results` (1-based, like the API)."""
+    total_pages = (len(results) + per_page - 1) // per_page
+    start = (page - 1) * per_page
+    return {
+        "results": results[start : start + per_page],
+        "total_results": len(results),
+        "page": page,
+        "per_page": per_page,
+        "total_pages": total_pages,
+    }
@@ -0,0 +1,360 @@
+"""Watchlist: periodic change detection for portfolio and pipeline companies.
+
+Each watched SIREN keeps one short content hash per watched field (dirigeants,
+employee band, employer status, administrative state, filed financial years).
+A refresh re-fetches the companies that are due, compares hashes and only diffs
+the fields whose hash moved, appending one compact line per change to the feed.
+
+State lives in `.cache/watchlist/`:
+
+- `entries.json`: every watched company with its hashes, last values,
+  schedule and its last few changes, rewritten atomically after each batch.
+  Writers (the CLI, the Deep Dive page) replay their own additions, removals
+  and checks onto the current file under `entries.lock`, so concurrent
+  writers do not undo each other. A check is only replayed (and its changes
+  only reach the feed) if the entry's hashes are still the ones it started
+  from; otherwise a concurrent refresh already recorded that check.
+- `changes.ndjson`: the change feed, append-only.
+
+The API has no multi-SIREN lookup, so a batch is a bounded set of concurrent
+single-company requests (with a lighter `include` than the Deep Dive's), the
+most overdue high-priority companies first. Each company's refresh interval
+adapts to how often it actually changes: halved after a change, stretched
+after a quiet check.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from invest_registry.clients.france import FranceCompanySearchClient
+from invest_registry.details import fetch_details_by_siren
+from invest_registry.financials import parse_finances
+from invest_registry.metrics import metrics
+from invest_registry.models import FranceSearchResult
+from invest_registry.storage import cache_dir, file_lock, write_text_atomic
+
+WATCH_FIELDS = (
+    "dirigeants",
+    "employee_band",
+    "is_employer",
+    "etat_administratif",
+    "financial_years",
+)
+WATCH_INCLUDE = "dirigeants,siege,finances"  # no complements: not watched
+
+DEFAULT_INTERVAL_SECONDS = 24 * 60 * 60
+MIN_INTERVAL_SECONDS = 6 * 60 * 60
+MAX_INTERVAL_SECONDS = 30 * 24 * 60 * 60
+QUIET_BACKOFF = 1.5  # interval factor after a check that found nothing
+REFRESH_BATCH_SIZE = 50
+REFRESH_CONCURRENCY = 4
+RECENT_CHANGES = 5  # changes kept on each entry, for a quick look without the feed
+
+FieldValue = str | bool | list[str] | list[int] | None
+
+
+def _dirigeant_label(d) -> str:
+    name = d.denomination or " ".join(p for p in (d.nom, d.prenoms) if p) or "?"
+    return f"{name} ({d.qualite})" if d.qualite else name
+
+
+def watched_values(result: FranceSearchResult) -> dict[str, FieldValue]:
+    """The watched fields of one company, in a canonical (sorted) form."""
+    siege = result.siege
+    employer = siege.caractere_employeur if siege else None
+    return {
+        "dirigeants": sorted({_dirigeant_label(d) for d in result.dirigeants}),
+        "employee_band": siege.tranche_effectif_salarie if siege else None,
+        "is_employer": {"O": True, "N": False}.get(employer) if employer else None,
+        "etat_administratif": result.etat_administratif
+        or (siege.etat_administratif if siege else None),
+        "financial_years": [y.year for y in parse_finances(result.finances)],
+    }
+
+
+def content_hash(value: FieldValue) -> str:
+    raw = json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=8).hexdigest()
+
+
+@dataclass
+class WatchEntry:
+    siren: str
+    priority: float = 1.0  # higher is refreshed first when several companies are due
+    added_at: float = 0.0
+    last_checked: float | None = None
+    next_due: float = 0.0  # epoch seconds; 0 means "check at the next refresh"
+    interval_seconds: float = DEFAULT_INTERVAL_SECONDS
+    hashes: dict[str, str] = field(default_factory=dict)
+    values: dict[str, FieldValue] = field(default_factory=dict)
+    checks: int = 0
+    changes: int = 0
+    missing: bool = False  # the last check found no such company
+    recent_changes: list[dict] = field(default_factory=list)  # Change fields, oldest first
+
+    def urgency(self, now: float) -> float:
+        """How overdue the entry is, in intervals, weighted by priority (<= 0: not due)."""
+        return (now - self.next_due) / self.interval_seconds * self.priority
+
+
+@dataclass(frozen=True)
+class Change:
+    """One field that moved. List fields only carry the removed / added items."""
+
+    siren: str
+    field: str
+    before: FieldValue
+    after: FieldValue
+    detected_at: float
+
+
+@dataclass(frozen=True)
+class RefreshReport:
+    checked: int
+    changed: int  # companies with at least one change
+    missing: int
+    failed: int
+    changes: tuple[Change, ...]
+
+
+def _diff(siren: str, name: str, before: FieldValue, after: FieldValue, now: float) -> Change:
+    if isinstance(before, list) and isinstance(after, list):
+        old, new = set(before), set(after)
+        removed = [v for v in before if v not in new]
+        added = [v for v in after if v not in old]
+        return Change(siren, name, removed, added, now)
+    return Change(siren, name, before, after, now)
+
+
+def watchlist_dir() -> Path:
+    d = cache_dir() / "watchlist"
+    d.mkdir(parents=True, exist_ok=True)
+    return d
+
+
+# A pending write: (op, siren, entry, for a "check": the hashes it started from and its changes)
+_Op = tuple[str, str, WatchEntry | None, tuple[dict[str, str], list[Change]] | None]
+
+
+class Watchlist:
+    """Watched companies and their change feed, persisted under `root`."""
+
+    def __init__(self, root: Path | None = None) -> None:
+        self.root = root or watchlist_dir()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._entries_path = self.root / "entries.json"
+        self._feed_path = self.root / "changes.ndjson"
+        self._lock = threading.Lock()
+        # Additions, removals and checks not yet written; `_save` replays them.
+        self._ops: list[_Op] = []
+        self._entries = self._load()
+
+    def _load(self) -> dict[str, WatchEntry]:
+        if not self._entries_path.exists():
+            return {}
+        raw = json.loads(self._entries_path.read_text(encoding="utf-8"))
+        return {siren: WatchEntry(**data) for siren, data in raw.items()}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, siren: object) -> bool:
+        return siren in self._entries
+
+    def entries(self) -> list[WatchEntry]:
+        with self._lock:
+            return list(self._entries.values())
+
+    def recent_changes(self, siren: str) -> list[Change]:
+        """The last `RECENT_CHANGES` changes of one company, oldest first."""
+        with self._lock:
+            entry = self._entries.get(siren)
+            return [Change(**c) for c in entry.recent_changes] if entry else []
+
+    def reload(self) -> None:
+        """Pick up what other processes saved since this instance last read the file."""
+        with self._lock:
+            self._save()
+
+    def _save(self) -> list[Change]:
+        # Caller holds self._lock. Replays this instance's pending operations onto
+        # the file as it is now, so another process's changes since our last load
+        # are kept (and picked up), and appends the replayed checks' changes to the
+        # feed, which it returns.
+        changes: list[Change] = []
+        with file_lock(self.root / "entries.lock"):
+            entries = self._load()
+            for op, siren, entry, check in self._ops:
+                current = entries.get(siren)
+                if op == "add" and current is not None:
+                    current.priority = entry.priority
+                elif op == "add":
+                    entries[siren] = entry
+                elif op == "remove":
+                    entries.pop(siren, None)
+                # "check": only if still watched and not checked by someone else since.
+                elif current is not None and current.hashes == check[0]:
+                    entry.priority = current.priority
+                    entries[siren] = entry
+                    changes.extend(check[1])
+            if self._ops:
+                payload = {siren: asdict(e) for siren, e in entries.items()}
+                write_text_atomic(self._entries_path, json.dumps(payload, ensure_ascii=False))
+            if changes:
+                with self._feed_path.open("a", encoding="utf-8") as f:
+                    f.writelines(json.dumps(asdict(c), ensure_ascii=False) + "\n" for c in changes)
+        self._entries = entries
+        self._ops.clear()
+        return changes
+
+    def add(self, sirens: Iterable[str], *, priority: float = 1.0, now: float | None = None) -> int:
+        """Watch SIRENs (malformed ones are ignored); returns how many were new.
+
+        Already watched companies only get their priority updated.
+        """
+        now = time.time() if now is None else now
+        added = 0
+        with self._lock:
+            for siren in sirens:
+                siren = siren.strip()
+                if len(siren) != 9 or not siren.isdigit():
+                    continue
+                if siren in self._entries:
+                    self._entries[siren].priority = priority
+                else:
+                    self._entries[siren] = WatchEntry(siren, priority=priority, added_at=now)
+                    added += 1
+                self._ops.append(("add", siren, self._entries[siren], None))
+            self._save()
+        return added
+
+    def remove(self, sirens: Iterable[str]) -> int:
+        with self._lock:
+            removed = 0
+            for siren in sirens:
+                siren = siren.strip()
+                removed += self._entries.pop(siren, None) is not None
+                self._ops.append(("remove", siren, None, None))
+            self._save()
+        return removed
+
+    def due(self, *, now: float | None = None, limit: int | None = None) -> list[WatchEntry]:
+        """Entries whose next check is due: never checked first, then most urgent."""
+        now = time.time() if now is None else now
+        with self._lock:
+            due = [e for e in self._entries.values() if e.next_due <= now]
+        due.sort(key=lambda e: (e.last_checked is None, e.urgency(now), e.priority), reverse=True)
+        return due[:limit] if limit is not None else due
+
+    def _apply(
+        self, entry: WatchEntry, result: FranceSearchResult | None, now: float
+    ) -> list[Change]:
+        entry.last_checked = now
+        entry.checks += 1
+        if result is None:
+            # Unknown (or not yet indexed) SIREN: keep the baseline, check less often.
+            entry.missing = True
+            entry.interval_seconds = min(
+                MAX_INTERVAL_SECONDS, entry.interval_seconds * QUIET_BACKOFF
+            )
+            entry.next_due = now + entry.interval_seconds
+            return []
+
+        entry.missing = False
+        values = watched_values(result)
+        hashes = {name: content_hash(values[name]) for name in WATCH_FIELDS}
+        baseline = not entry.hashes
+        changes = [
+            _diff(entry.siren, name, entry.values.get(name), values[name], now)
+            for name in WATCH_FIELDS
+            if not baseline and entry.hashes.get(name) != hashes[name]
+        ]
+        entry.hashes = hashes
+        entry.values = values
+        if changes:
+            entry.changes += 1
+            recent = entry.recent_changes + [asdict(c) for c in changes]
+            entry.recent_changes = recent[-RECENT_CHANGES:]
+            entry.interval_seconds = max(MIN_INTERVAL_SECONDS, entry.interval_seconds / 2)
+        else:
+            entry.interval_seconds = min(
+                MAX_INTERVAL_SECONDS, entry.interval_seconds * QUIET_BACKOFF
+            )
+        entry.next_due = now + entry.interval_seconds
+        return changes
+
+    def refresh(
+        self,
+        client: FranceCompanySearchClient,
+        *,
+        limit: int | None = None,
+        batch_size: int = REFRESH_BATCH_SIZE,
+        concurrency: int = REFRESH_CONCURRENCY,
+        force: bool = False,
+        now: float | None = None,
+    ) -> RefreshReport:
+        """Check due companies (every company with `force`), at most `limit` of them.
+
+        Batches go out `concurrency` requests at a time through the client's rate
+        limiter; entries and the feed are saved after each batch, so an interrupted
+        refresh keeps what it already checked. Checks another refresh recorded first
+        are dropped, and left out of the report's `changed` and `changes`.
+        """
+        clock = (lambda: now) if now is not None else time.time
+        self.reload()
+        if force:
+            todo = sorted(self.entries(), key=lambda e: e.priority, reverse=True)[:limit]
+        else:
+            todo = self.due(now=clock(), limit=limit)
+
+        def _fetch(
+            entry: WatchEntry,
+        ) -> tuple[WatchEntry, FranceSearchResult | None, Exception | None]:
+            try:
+                return (
+                    entry,
+                    fetch_details_by_siren(client, entry.siren, include=WATCH_INCLUDE),
+                    None,
+                )
+            except Exception as e:  # noqa: BLE001 - one failure must not stop the batch
+                return entry, None, e
+
+        checked = missing = failed = 0
+        all_changes: list[Change] = []
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            for start in range(0, len(todo), batch_size):
+                for entry, result, error in pool.map(_fetch, todo[start : start + batch_size]):
+                    if error is not None:
+                        failed += 1
+                        metrics.inc("watchlist_checks_total", outcome="failed")
+                        continue
+                    with self._lock:
+                        baseline = dict(entry.hashes)
+                        changes = self._apply(entry, result, clock())
+                        self._ops.append(("check", entry.siren, entry, (baseline, changes)))
+                    checked += 1
+                    missing += result is None
+                    outcome = "missing" if result is None else "changed" if changes else "unchanged"
+                    metrics.inc("watchlist_checks_total", outcome=outcome)
+                with self._lock:
+                    all_changes.extend(self._save())
+        changed = len({c.siren for c in all_changes})
+        return RefreshReport(checked, changed, missing, failed, tuple(all_changes))
+
+    def iter_changes(self, *, since: float = 0.0, siren: str | None = None) -> Iterator[Change]:
+        """The change feed, oldest first, detected at or after `since` (epoch seconds)."""
+        if not self._feed_path.exists():
+            return
+        with self._feed_path.open(encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                change = Change(**json.loads(line))
+                if change.detected_at >= since and (siren is None or change.siren == siren):
+                    yield change
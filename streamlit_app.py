@@ -1,5 +1,7 @@
 import streamlit as st
 
+from invest_registry.profiling import Profile, profile_run, trace_path
+
 st.set_page_config(page_title="Invest Registry", layout="wide")
 
 nav = st.navigation(
@@ -8,4 +10,50 @@ nav = st.navigation(
         st.Page("pages/2_Company_Deep_Dive.py", title="Company Deep Dive", url_path="deep-dive"),
     ]
 )
-nav.run()
+
+with st.sidebar:
+    profiling = st.toggle(
+        "Debug: profile reruns",
+        value=False,
+        help="Times each phase of a rerun and appends it to .cache/traces.jsonl.",
+    )
+    sample = profiling and st.checkbox("Sampling profiler", value=False)
+    profile_panel = st.empty()
+
+
+def _render_profile(profile: Profile) -> None:
+    title = f"Rerun profile · {profile.label} · {profile.total_ms:.0f} ms"
+    with profile_panel.container(), st.expander(title):
+        st.dataframe(
+            profile.breakdown(),
+            hide_index=True,
+            column_config={
+                "share": st.column_config.ProgressColumn("Share", min_value=0, max_value=1)
+            },
+        )
+        if profile.top_frames:
+            st.caption(f"Hottest frames ({profile.samples} samples)")
+            st.dataframe(
+                {
+                    "frame": [f for f, _ in profile.top_frames],
+                    "samples": [n for _, n in profile.top_frames],
+                },
+                hide_index=True,
+            )
+        st.caption(f"Trace: `{trace_path()}`")
+        if profile.folded_path:
+            st.caption(f"Folded stacks: `{profile.folded_path}`")
+
+
+if profiling:
+    # A page that calls st.stop() ends the script before the panel can be updated, so
+    # the previous profile stays visible until this rerun's replaces it.
+    previous = st.session_state.get("last_profile")
+    if previous is not None:
+        _render_profile(previous)
+    with profile_run(nav.title, sample=sample) as profile:
+        st.session_state["last_profile"] = profile  # filled in when the run exits
+        nav.run()
+    _render_profile(profile)
+else:
+    nav.run()
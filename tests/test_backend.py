@@ -0,0 +1,157 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from invest_registry import backend
+from invest_registry.backend import BackendClient, BackendServer, BackendService
+from invest_registry.details import detail_cache
+from invest_registry.mock_api import MockRegistry, MockRegistryServer
+from invest_registry.pulls import AdvancedOptions, cache_key
+from invest_registry.settings import Settings, get_settings
+from invest_registry.social_discovery import QueryBudgetExceeded
+from invest_registry.storage import cache_path
+
+_ADV = AdvancedOptions(per_page=20, founded_within_years=None)
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    detail_cache.clear()
+    registry = MockRegistry.synthetic(2_000, seed=9)
+    with MockRegistryServer(registry) as server:
+        monkeypatch.setattr(get_settings(), "france_api_base_url", server.base_url)
+        yield registry
+    detail_cache.clear()
+
+
+def _session(client: BackendClient) -> None:
+    """One analyst: a pull, then the details of its first companies."""
+    records = client.records(
+        pack_name="blossom_like_france", paris_only=False, target_count=30, adv=_ADV
+    )
+    assert len(records) == 30
+    for r in records[:5]:
+        assert client.details(r.siren).siren == r.siren
+
+
+def _upstream_requests(registry: MockRegistry, replicas: int) -> int:
+    registry.requests = 0
+    start = threading.Barrier(replicas)
+    with BackendServer(BackendService(use_disk_cache=False)) as server:
+        clients = [BackendClient(server.base_url) for _ in range(replicas)]
+
+        def _run(client: BackendClient) -> None:
+            start.wait()
+            _session(client)
+
+        with ThreadPoolExecutor(max_workers=replicas) as pool:
+            for f in [pool.submit(_run, c) for c in clients]:
+                f.result()
+        for c in clients:
+            c.close()
+    return registry.requests
+
+
+def test_replicas_share_one_upstream_budget(registry, tmp_path, monkeypatch) -> None:
+    single = _upstream_requests(registry, 1)
+
+    detail_cache.clear()
+    (tmp_path / "fresh").mkdir()
+    monkeypatch.chdir(tmp_path / "fresh")  # empty detail store
+    shared = _upstream_requests(registry, 6)
+
+    assert single > 0
+    assert shared == single
+
+
+def test_module_functions_fall_back_to_in_process(registry, monkeypatch) -> None:
+    assert backend.backend_client() is None
+    local = backend.fetch_records(
+        pack_name="blossom_like_france", paris_only=False, target_count=10, adv=_ADV
+    )
+
+    with BackendServer(BackendService()) as server:
+        monkeypatch.setattr(get_settings(), "backend_url", server.base_url)
+        assert backend.backend_client() is not None
+        remote = backend.fetch_records(
+            pack_name="blossom_like_france", paris_only=False, target_count=10, adv=_ADV
+        )
+        details = backend.fetch_details(remote[0].siren)
+
+    assert remote == local
+    assert details is not None and details.siren == local[0].siren
+
+
+def test_budget_errors_reach_the_replica(registry) -> None:
+    service = BackendService(
+        app_settings=Settings(
+            search_provider="serpapi", serpapi_api_key="k", social_daily_query_budget=0
+        )
+    )
+    with BackendServer(service) as server:
+        client = BackendClient(server.base_url)
+        with pytest.raises(QueryBudgetExceeded):
+            client.candidates(query="Jane Doe Acme", kind="linkedin")
+        assert client.budget() == (0, 0)
+        client.close()
+
+
+def _pull(service: BackendService, target_count: int) -> None:
+    service.records(
+        pack_name="blossom_like_france", paris_only=False, target_count=target_count, adv=_ADV
+    )
+
+
+def test_records_cache_keeps_the_most_recent_pulls(registry) -> None:
+    service = BackendService(use_disk_cache=False, max_entries=2)
+    for target_count in (10, 20, 10, 30):
+        _pull(service, target_count)
+    assert len(service) == 2
+
+    registry.requests = 0
+    _pull(service, 10)  # used more recently than 20, so still cached
+    assert registry.requests == 0
+    _pull(service, 20)
+    assert registry.requests > 0
+
+
+def test_stale_disk_records_are_not_served(registry) -> None:
+    _pull(BackendService(ttl_seconds=60), 10)
+    path = cache_path(
+        cache_key(pack_name="blossom_like_france", paris_only=False, target_count=10, adv=_ADV)
+    )
+
+    registry.requests = 0
+    _pull(BackendService(ttl_seconds=60), 10)
+    assert registry.requests == 0
+
+    old = time.time() - 120
+    os.utime(path, (old, old))
+    _pull(BackendService(ttl_seconds=60), 10)
+    assert registry.requests > 0
+
+
+def test_cached_pulls_leave_out_companies_marked_reviewed_through_the_backend(
+    registry, monkeypatch
+) -> None:
+    adv = AdvancedOptions(per_page=20, founded_within_years=None, skip_reviewed=True)
+    with BackendServer(BackendService()) as server:
+        monkeypatch.setattr(get_settings(), "backend_url", server.base_url)
+
+        def _fetch() -> list[str]:
+            records = backend.fetch_records(
+                pack_name="blossom_like_france", paris_only=False, target_count=10, adv=adv
+            )
+            return [r.siren for r in records]
+
+        first = _fetch()
+        assert backend.mark_reviewed(first[:3]) == 3
+        second = _fetch()
+
+    assert len(second) == 10
+    assert not set(first[:3]) & set(second)
+    assert second[:7] == first[3:]
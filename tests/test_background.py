@@ -0,0 +1,75 @@
+import threading
+
+from invest_registry.background import BackgroundCollection
+from invest_registry.clients.france import CollectProgress
+from invest_registry.models import CompanyRecord
+
+
+def _record(siren: str) -> CompanyRecord:
+    return CompanyRecord(
+        country="FR",
+        siren=siren,
+        siret=None,
+        name=siren,
+        naf=None,
+        creation_date=None,
+        address=None,
+        postal_code=None,
+        commune=None,
+        departement=None,
+        region=None,
+        employee_band=None,
+        employee_band_year=None,
+        is_employer=None,
+        source="test",
+    )
+
+
+def test_background_collection_streams_records_then_finishes() -> None:
+    first_page_seen = threading.Event()
+    release = threading.Event()
+
+    def run(on_page, should_stop) -> list[CompanyRecord]:
+        page1 = (_record("1"), _record("2"))
+        on_page(CollectProgress(1, 25, 2, 4, new_records=page1))
+        first_page_seen.set()
+        release.wait(5)
+        on_page(CollectProgress(2, 50, 3, 4, new_records=(_record("3"),)))
+        return [*page1, _record("3")]
+
+    job = BackgroundCollection(run, target_count=3).start()
+    assert first_page_seen.wait(5)
+
+    snap = job.snapshot()
+    assert snap.status == "running"
+    assert [r.siren for r in snap.records] == ["1", "2"]
+    assert snap.progress is not None and snap.progress.pass_rate == 2 / 25
+    assert snap.eta_seconds is not None
+
+    release.set()
+    job.join(5)
+    snap = job.snapshot()
+    assert snap.status == "done"
+    assert [r.siren for r in snap.records] == ["1", "2", "3"]
+    assert snap.eta_seconds is None
+
+
+def test_background_collection_cancel_and_failure() -> None:
+    def run(on_page, should_stop) -> list[CompanyRecord]:
+        while not should_stop():
+            pass
+        return [_record("1")]
+
+    job = BackgroundCollection(run, target_count=10).start()
+    job.cancel()
+    job.join(5)
+    assert job.snapshot().status == "cancelled"
+
+    def boom(on_page, should_stop) -> list[CompanyRecord]:
+        raise RuntimeError("API down")
+
+    job = BackgroundCollection(boom, target_count=10).start()
+    job.join(5)
+    snap = job.snapshot()
+    assert snap.status == "failed"
+    assert snap.error == "API down"
@@ -0,0 +1,179 @@
+import io
+import json
+
+import pytest
+
+from invest_registry.cli import main
+from invest_registry.mock_api import MockRegistry, MockRegistryServer
+from invest_registry.settings import get_settings
+from invest_registry.synthetic import synthetic_results
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    registry = MockRegistry.synthetic(1_000, seed=3)
+    with MockRegistryServer(registry) as server:
+        monkeypatch.setattr(get_settings(), "france_api_base_url", server.base_url)
+        yield registry
+
+
+def _ndjson(text: str) -> list[dict]:
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def test_pull_streams_ndjson_and_reuses_the_disk_cache(registry, capsys) -> None:
+    assert main(["pull", "--target", "10", "--paris-only"]) == 0
+    first = _ndjson(capsys.readouterr().out)
+    requests = registry.requests
+
+    assert main(["pull", "--target", "10", "--paris-only"]) == 0
+    second = _ndjson(capsys.readouterr().out)
+
+    assert len(first) == 10
+    assert all(r["postal_code"].startswith("75") for r in first)
+    assert second == first
+    assert registry.requests == requests  # served from .cache/
+
+
+def test_enrich_export_and_cache_stats(registry, capsys, monkeypatch, tmp_path) -> None:
+    main(["pull", "--target", "5"])
+    pulled = capsys.readouterr().out
+    (tmp_path / "pull.ndjson").write_text(pulled, encoding="utf-8")
+
+    assert main(["enrich", "--input", "pull.ndjson"]) == 0
+    details = _ndjson(capsys.readouterr().out)
+    assert [d["siren"] for d in details] == [r["siren"] for r in _ndjson(pulled)]
+    assert all(d["dirigeants"] for d in details)
+
+    monkeypatch.setattr("sys.stdin", io.StringIO(pulled))
+    assert main(["export", "--format", "csv", "--out", "pull.csv"]) == 0
+    assert len((tmp_path / "pull.csv").read_text(encoding="utf-8").splitlines()) == 6
+
+    assert main(["cache-stats"]) == 0
+    stats = {s["cache"]: s for s in _ndjson(capsys.readouterr().out)}
+    assert stats["records"]["records"] == 5
+    assert stats["details"]["entries"] == 5
+
+
+def test_pull_rejects_invalid_naf(registry, capsys) -> None:
+    with pytest.raises(SystemExit):
+        main(["pull", "--naf", "6201"])
+    assert "invalid NAF" in capsys.readouterr().err
+
+
+def test_harvest_runs_a_sharded_job(registry, capsys) -> None:
+    assert main(["harvest", "--target", "10", "--paris-only", "--workers", "2"]) == 0
+    out = capsys.readouterr()
+
+    records = _ndjson(out.out)
+    assert len(records) == len({r["siren"] for r in records}) == 10
+    assert "job " in out.err and " done" in out.err
+
+
+def test_pull_skips_companies_marked_reviewed(registry, capsys, monkeypatch) -> None:
+    main(["pull", "--target", "10", "--no-cache"])
+    first = _ndjson(capsys.readouterr().out)
+    monkeypatch.setattr("sys.stdin", io.StringIO("\n".join(r["siren"] for r in first[:4])))
+    assert main(["mark-reviewed"]) == 0
+    capsys.readouterr()
+
+    main(["pull", "--target", "10", "--skip-reviewed"])
+    second = _ndjson(capsys.readouterr().out)
+
+    assert len(second) == 10
+    assert not {r["siren"] for r in first[:4]} & {r["siren"] for r in second}
+    assert [r["siren"] for r in second[:6]] == [r["siren"] for r in first[4:]]
+
+
+def test_cached_skip_reviewed_pull_is_pulled_again_when_left_short(
+    registry, capsys, monkeypatch
+) -> None:
+    main(["pull", "--target", "10", "--skip-reviewed"])
+    first = _ndjson(capsys.readouterr().out)
+    monkeypatch.setattr("sys.stdin", io.StringIO("\n".join(r["siren"] for r in first[:3])))
+    assert main(["mark-reviewed"]) == 0
+    capsys.readouterr()
+
+    main(["pull", "--target", "10", "--skip-reviewed"])
+    second = _ndjson(capsys.readouterr().out)
+
+    assert len(second) == 10
+    assert not {r["siren"] for r in first[:3]} & {r["siren"] for r in second}
+
+
+
+def test_malformed_input_lines_are_reported_and_skipped(tmp_path, capsys, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    lines = [
+        '{"siren": "111111111"}',
+        '{"siren": "2222',
+        '{"name": "no siren"}',
+        "333333333",
+        "abc",
+        '{"siren": "12345"}',
+    ]
+    monkeypatch.setattr("sys.stdin", io.StringIO("\n".join(lines)))
+
+    assert main(["mark-reviewed"]) == 1
+
+    err = capsys.readouterr().err
+    assert "line 2: not a record with a siren (JSONDecodeError)" in err
+    assert "line 3: not a record with a siren (KeyError)" in err
+    assert "line 5: not a SIREN: 'abc'" in err
+    assert "line 6: not a SIREN: '12345'" in err
+    assert "2 new · 2 reviewed" in err
+
+def test_watch_reports_changed_fields(tmp_path, capsys, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    corpus = synthetic_results(50, seed=3, include_details=True)
+    siren = corpus[0]["siren"]
+    monkeypatch.setattr("sys.stdin", io.StringIO(siren + "\n"))
+    with MockRegistryServer(MockRegistry(corpus)) as server:
+        monkeypatch.setattr(get_settings(), "france_api_base_url", server.base_url)
+        assert main(["watch", "add"]) == 0
+        assert main(["watch", "refresh"]) == 0
+        assert _ndjson(capsys.readouterr().out) == []  # first check: baseline only
+
+        corpus[0]["siege"]["tranche_effectif_salarie"] = "NN"
+        assert main(["watch", "refresh", "--all"]) == 0
+        changes = _ndjson(capsys.readouterr().out)
+    assert main(["watch", "changes", "--siren", siren]) == 0
+
+    assert [(c["field"], c["after"]) for c in changes] == [("employee_band", "NN")]
+    assert _ndjson(capsys.readouterr().out) == changes
+
+
+def test_segments_prints_counts_and_pivots(registry, capsys) -> None:
+    assert main(["segments", "--naf", "62,58.29C", "--departement", "75,69"]) == 0
+    out = capsys.readouterr()
+    cells = _ndjson(out.out)
+    assert [(c["naf"], c["departement"]) for c in cells] == [
+        ("62", "75"),
+        ("62", "69"),
+        ("58.29C", "75"),
+        ("58.29C", "69"),
+    ]
+    assert "requests" in out.err
+
+    pivot = ["--pivot", "naf,departement"]
+    assert main(["segments", "--naf", "62,58.29C", "--departement", "75,69", *pivot]) == 0
+    out = capsys.readouterr()
+    assert _ndjson(out.out)[0] == {"naf": "62", "75": cells[0]["count"], "69": cells[1]["count"]}
+    assert "0 requests" in out.err  # served from the count cache
+
+    with pytest.raises(SystemExit):
+        main(["segments", "--naf", "62,62.01Z"])
+    assert "overlap" in capsys.readouterr().err
+
+
+def test_sample_prints_an_estimate(registry, capsys) -> None:
+    args = ["sample", "--naf", "62.01Z", "--tranche", "", "--by-departement", "75,69"]
+    assert main([*args, "--margin", "0.05", "--seed", "1"]) == 0
+    out = capsys.readouterr()
+
+    (estimate,) = _ndjson(out.out)
+    assert estimate["low"] <= estimate["share"] <= estimate["high"]
+    assert [s["departement"] for s in estimate["strata"]] == ["75", "69"]
+    assert estimate["stopped"] in {"margin", "exhausted"}
+    assert "pages" in out.err
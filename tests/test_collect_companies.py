@@ -1,6 +1,9 @@
 from datetime import date
 
+import pytest
+
 from invest_registry.clients.france import FranceSearchParams, collect_companies
+from invest_registry.metrics import metrics
 from invest_registry.models import FranceSearchResponse
 
 
@@ -76,3 +79,139 @@ def test_collect_companies_keeps_paging_until_filtered_target_or_exhaustion() ->
     assert [c.siren for c in out] == ["222222222", "333333333"]
     assert ("62.01Z", 2) in client.calls
 
+
+
+def _company(siren: str, created: str) -> dict:
+    return {
+        "siren": siren,
+        "nom_raison_sociale": f"CO {siren}",
+        "activite_principale": "62.01Z",
+        "date_creation": created,
+        "siege": {"code_postal": "75001"},
+    }
+
+
+def test_collect_companies_ranked_keeps_best_across_all_pages() -> None:
+    pages = {
+        ("62.01Z", 1): {"results": [_company("1", "2021-01-01"), _company("2", "2023-01-01")]},
+        ("62.01Z", 2): {"results": [_company("3", "2020-01-01"), _company("4", "2025-01-01")]},
+        ("62.01Z", 3): {"results": [_company("5", "2022-01-01")]},
+    }
+    client = _FakeClient(pages, total_pages=3)
+
+    out = collect_companies(
+        client,  # type: ignore[arg-type]
+        searches=[FranceSearchParams(q="", activite_principale="62.01Z")],
+        target_count=2,
+        max_pages_per_search=None,
+        rank_key=lambda r: r.creation_date,
+    )
+
+    assert [c.siren for c in out] == ["4", "2"]
+    assert len(client.calls) == 3
+
+
+def test_collect_companies_ranked_monotonic_stops_early() -> None:
+    pages = {
+        ("62.01Z", 1): {"results": [_company("1", "2025-01-01"), _company("2", "2024-01-01")]},
+        ("62.01Z", 2): {"results": [_company("3", "2023-01-01"), _company("4", "2022-01-01")]},
+        ("62.01Z", 3): {"results": [_company("5", "2021-01-01")]},
+    }
+    client = _FakeClient(pages, total_pages=3)
+    keyed: list[str] = []
+
+    def newest(record):
+        keyed.append(record.siren)
+        return record.creation_date
+
+    out = collect_companies(
+        client,  # type: ignore[arg-type]
+        searches=[FranceSearchParams(q="", activite_principale="62.01Z")],
+        target_count=2,
+        max_pages_per_search=None,
+        rank_key=newest,
+        rank_key_monotonic=True,
+    )
+
+    assert [c.siren for c in out] == ["1", "2"]
+    assert ("62.01Z", 2) not in client.calls
+    assert keyed == ["1", "2"]  # each record normalized and keyed once
+
+
+def test_collect_companies_reports_progress_and_honours_stop() -> None:
+    pages = {
+        ("62.01Z", 1): {"results": [_company("1", "2024-01-01"), _company("2", "2024-01-01")]},
+        ("62.01Z", 2): {"results": [_company("3", "2024-01-01")]},
+    }
+    client = _FakeClient(pages, total_pages=2)
+    reports = []
+
+    out = collect_companies(
+        client,  # type: ignore[arg-type]
+        searches=[FranceSearchParams(q="", activite_principale="62.01Z")],
+        target_count=10,
+        max_pages_per_search=None,
+        on_page=reports.append,
+        should_stop=lambda: len(reports) >= 1,
+    )
+
+    assert [c.siren for c in out] == ["1", "2"]
+    assert client.calls == [("62.01Z", 1)]
+    assert [r.siren for r in reports[0].new_records] == ["1", "2"]
+    assert (reports[0].pages_fetched, reports[0].reachable_pages) == (1, 2)
+
+
+def test_collect_companies_filters_on_employer_flag() -> None:
+    employer = {**_company("1", "2024-01-01"), "siege": {"caractere_employeur": "O"}}
+    pages = {("62.01Z", 1): {"results": [_company("2", "2024-01-01"), employer]}}
+    client = _FakeClient(pages, total_pages=1)
+
+    out = collect_companies(
+        client,  # type: ignore[arg-type]
+        searches=[FranceSearchParams(q="", activite_principale="62.01Z")],
+        target_count=10,
+        is_employer=True,
+    )
+
+    assert [c.siren for c in out] == ["1"]
+
+
+def test_collect_companies_records_metrics() -> None:
+    pages = {
+        ("62.01Z", 1): {"results": [_company("1", "2010-01-01")]},
+        ("62.01Z", 2): {"results": [_company("2", "2024-01-01"), _company("3", "2024-01-01")]},
+    }
+    metrics.reset()
+
+    collect_companies(
+        _FakeClient(pages, total_pages=2),  # type: ignore[arg-type]
+        searches=[FranceSearchParams(q="", activite_principale="62.01Z")],
+        target_count=10,
+        min_creation_date=date(2020, 1, 1),
+    )
+
+    assert metrics.value("collect_pages_fetched_total") == 2
+    assert metrics.value("collect_pages_used_total") == 1
+    assert metrics.value("collect_results_seen_total") == 3
+    assert metrics.value("collect_records_kept_total") == 2
+    assert metrics.value("collect_last_pass_rate") == pytest.approx(2 / 3)
+    metrics.reset()
+
+
+def test_collect_companies_skips_excluded_sirens_and_keeps_paging() -> None:
+    pages = {
+        ("62.01Z", 1): {"results": [_company("100000001", "2024-01-01"), _company("100000002", "2024-01-01")]},
+        ("62.01Z", 2): {"results": [_company("100000003", "2024-01-01"), _company("100000004", "2024-01-01")]},
+    }
+    client = _FakeClient(pages, total_pages=2)
+
+    out = collect_companies(
+        client,  # type: ignore[arg-type]
+        searches=[FranceSearchParams(q="", activite_principale="62.01Z")],
+        target_count=2,
+        max_pages_per_search=None,
+        exclude={"100000001", "100000003"},
+    )
+
+    assert [c.siren for c in out] == ["100000002", "100000004"]
+    assert ("62.01Z", 2) in client.calls
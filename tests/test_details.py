@@ -0,0 +1,65 @@
+import threading
+import time
+
+from invest_registry.clients.france import FranceSearchParams
+from invest_registry.details import DETAIL_INCLUDE, DetailCache
+from invest_registry.models import FranceSearchResponse
+
+
+class _SlowClient:
+    def __init__(self) -> None:
+        self.calls: list[FranceSearchParams] = []
+
+    def search(self, *, search: FranceSearchParams, page: int = 1, per_page: int = 25) -> FranceSearchResponse:
+        self.calls.append(search)
+        time.sleep(0.05)
+        return FranceSearchResponse.model_validate(
+            {
+                "page": 1,
+                "per_page": per_page,
+                "total_pages": 1,
+                "total_results": 1,
+                "results": [{"siren": search.q, "nom_raison_sociale": "ACME"}],
+            }
+        )
+
+
+def test_concurrent_fetches_share_one_upstream_call() -> None:
+    cache = DetailCache(persist=False)
+    client = _SlowClient()
+    results = []
+
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.fetch("123456789", client)))  # type: ignore[arg-type]
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(client.calls) == 1
+    assert client.calls[0].include == DETAIL_INCLUDE
+    assert {r.nom_raison_sociale for r in results} == {"ACME"}
+    assert "123456789" in cache
+
+
+def test_entries_expire_after_ttl() -> None:
+    cache = DetailCache(ttl_seconds=0.0, persist=False)
+    client = _SlowClient()
+    cache.fetch("1", client)  # type: ignore[arg-type]
+    cache.fetch("1", client)  # type: ignore[arg-type]
+    assert len(client.calls) == 2
+
+
+def test_least_recently_used_entries_are_evicted_past_max_entries() -> None:
+    cache = DetailCache(persist=False, max_entries=2)
+    client = _SlowClient()
+    cache.fetch("1", client)  # type: ignore[arg-type]
+    cache.fetch("2", client)  # type: ignore[arg-type]
+    assert "1" in cache  # now most recently used
+    cache.fetch("3", client)  # type: ignore[arg-type]
+
+    assert len(cache) == 2
+    assert "1" in cache and "3" in cache
+    assert "2" not in cache
@@ -0,0 +1,77 @@
+import csv
+import io
+import json
+
+import pyarrow.parquet as pq
+import pytest
+
+from invest_registry.export import (
+    EXPORT_FIELDS,
+    iter_csv_chunks,
+    main,
+    write_parquet,
+    write_records,
+)
+from invest_registry.models import CompanyRecord
+
+
+def _records(n: int) -> list[CompanyRecord]:
+    return [
+        CompanyRecord(
+            country="FR",
+            siren=f"{i:09d}",
+            siret=None,
+            name=f"CO {i}",
+            naf="62.01Z",
+            creation_date=None,
+            address=None,
+            postal_code="75001",
+            commune="PARIS",
+            departement="75",
+            region=None,
+            employee_band="11",
+            employee_band_year=2023,
+            is_employer=True,
+            source="test",
+        )
+        for i in range(n)
+    ]
+
+
+def test_csv_is_streamed_in_chunks() -> None:
+    chunks = list(iter_csv_chunks(iter(_records(5)), chunk_rows=2))
+    assert len(chunks) == 3
+
+    rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+    assert [r["siren"] for r in rows] == [f"{i:09d}" for i in range(5)]
+    assert list(rows[0]) == EXPORT_FIELDS
+
+
+def test_csv_without_records_still_has_header() -> None:
+    assert b"".join(iter_csv_chunks([])).decode("utf-8").strip() == ",".join(EXPORT_FIELDS)
+
+
+def test_ndjson_round_trips() -> None:
+    buf = io.BytesIO()
+    write_records(_records(3), buf, fmt="ndjson")
+    lines = buf.getvalue().decode("utf-8").splitlines()
+    assert [json.loads(line)["siren"] for line in lines] == ["000000000", "000000001", "000000002"]
+
+
+def test_parquet_uses_row_groups(tmp_path) -> None:
+    path = tmp_path / "out.parquet"
+    assert write_parquet(iter(_records(5)), path, row_group_size=2) == 5
+
+    f = pq.ParquetFile(path)
+    assert f.metadata.num_row_groups == 3
+    assert f.read().column("siren").to_pylist()[-1] == "000000004"
+
+
+def test_unknown_sources_are_usage_errors(tmp_path, monkeypatch, capsys) -> None:
+    monkeypatch.chdir(tmp_path)
+    for source in (["--cache-key", "nope"], ["--job", "nope"]):
+        with pytest.raises(SystemExit) as exc:
+            main([*source, "--out", "out.ndjson"])
+        assert exc.value.code == 2
+        assert "nope" in capsys.readouterr().err
+    assert not (tmp_path / "out.ndjson").exists()
@@ -0,0 +1,55 @@
+import math
+
+from invest_registry.financials import (
+    FinancialIndex,
+    FinancialYear,
+    compute_metrics,
+    parse_finances,
+)
+from invest_registry.models import FranceSearchResult
+
+
+def test_parse_finances_skips_non_year_keys_and_missing_values() -> None:
+    years = parse_finances(
+        {
+            "2023": {"ca": 1200, "resultat_net": "-50"},
+            "2021": {"ca": None},
+            "meta": {"ca": 1},
+            "2022": "n/a",
+        }
+    )
+    assert [y.year for y in years] == [2021, 2023]
+    assert math.isnan(years[0].revenue) and math.isnan(years[0].net_income)
+    assert years[1] == FinancialYear(2023, 1200.0, -50.0)
+
+
+def test_compute_metrics_growth_cagr_and_margin() -> None:
+    m = compute_metrics(
+        {
+            "a": [FinancialYear(2020, 100.0, 5.0), FinancialYear(2022, 400.0, 40.0)],
+            "b": [FinancialYear(2022, 100.0, 1.0), FinancialYear(2023, 150.0, -15.0)],
+            "c": [FinancialYear(2023, 0.0, -3.0)],
+            "d": [],
+        }
+    )
+    assert m.sirens == ("a", "b", "c")
+    assert list(m.latest_year) == [2022, 2023, 2023]
+    # "a" did not file 2021: no YoY growth, but a 2-year CAGR.
+    assert m.column("yoy_growth", ["a", "b", "c", "d"]) == [None, 0.5, None, None]
+    assert m.column("cagr", ["a", "b"]) == [1.0, 0.5]
+    assert m.column("margin", ["a", "b", "c"]) == [0.1, -0.1, None]
+    assert m.growth_by_siren() == {"b": 0.5}
+
+
+def test_financial_index_caches_metrics_until_financials_change() -> None:
+    index = FinancialIndex()
+    index.add_company(
+        FranceSearchResult(siren="1", finances={"2022": {"ca": 10}, "2023": {"ca": 20}})
+    )
+    m = index.metrics()
+    assert index.metrics() is m
+    assert m.growth_by_siren() == {"1": 1.0}
+
+    index.add_company(FranceSearchResult(siren="2", finances={"2023": {"ca": 5}}))
+    assert index.metrics() is not m
+    assert len(index.metrics()) == 2
@@ -1,5 +1,13 @@
-from invest_registry.france_people import dirigeants_personnes_physiques
-from invest_registry.models import FranceSearchResponse
+import os
+import time
+
+from invest_registry.details import load_stored_details, save_details
+from invest_registry.france_people import (
+    PersonIndex,
+    dirigeants_personnes_physiques,
+    person_key,
+)
+from invest_registry.models import FranceDirigeant, FranceSearchResponse, FranceSearchResult
 
 
 def test_parses_dirigeants_and_filters_personne_physique() -> None:
@@ -41,3 +49,102 @@ def test_parses_dirigeants_and_filters_personne_physique() -> None:
     assert [d.type_dirigeant for d in phys] == ["personne physique"]
     assert phys[0].nom == "NIOX-CHATEAU"
 
+
+
+def _company(siren: str, *people: tuple[str, str, str]) -> FranceSearchResult:
+    return FranceSearchResult(
+        siren=siren,
+        nom_raison_sociale=f"CO {siren}",
+        dirigeants=[
+            FranceDirigeant(
+                type_dirigeant="personne physique", nom=nom, prenoms=prenoms, date_de_naissance=born
+            )
+            for nom, prenoms, born in people
+        ],
+    )
+
+
+def test_person_key_folds_accents_case_and_extra_given_names() -> None:
+    a = FranceDirigeant(nom="Lefèvre", prenoms="Hélène Marie", date_de_naissance="1985-03")
+    b = FranceDirigeant(nom="LEFEVRE", prenoms="HELENE", date_de_naissance="1985-03-01")
+    assert person_key(a) == person_key(b)
+    assert person_key(FranceDirigeant(nom="LEFEVRE", prenoms="HELENE")) is None
+
+
+def test_person_index_links_serial_founders_and_replaces_stale_links() -> None:
+    index = PersonIndex()
+    index.add_companies(
+        [
+            _company("111111111", ("DUPONT", "JEAN", "1980-01")),
+            _company(
+                "222222222", ("Dupont", "Jean Paul", "1980-01"), ("MARTIN", "ANNE", "1990-05")
+            ),
+            _company("333333333", ("DUPONT", "JEAN", "1975-01")),  # a namesake
+        ]
+    )
+
+    serial = index.serial_founders()
+    assert [(p.display_name, sorted(p.sirens)) for p in serial] == [
+        ("JEAN DUPONT", ["111111111", "222222222"])
+    ]
+    assert [p.display_name for p in index.people_for("222222222") if len(p.sirens) > 1] == [
+        "JEAN DUPONT"
+    ]
+
+    index.add_company(_company("222222222", ("MARTIN", "ANNE", "1990-05")))
+    assert index.serial_founders() == []
+
+
+def test_person_index_refreshes_incrementally_from_detail_store(tmp_path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    index = PersonIndex()
+    save_details(_company("111111111", ("DUPONT", "JEAN", "1980-01")))
+    assert index.refresh_from_store() == 1
+
+    save_details(_company("222222222", ("DUPONT", "JEAN", "1980-01")))
+    assert index.refresh_from_store() == 1  # the first file is not read again
+    assert [sorted(p.sirens) for p in index.serial_founders()] == [["111111111", "222222222"]]
+
+    # A file stamped just before the previous scan (written during it, or a coarse
+    # mtime) is still picked up.
+    save_details(_company("333333333", ("MARTIN", "ANNE", "1990-05")))
+    path = tmp_path / ".cache" / "details" / "333333333.json"
+    os.utime(path, (time.time() - 1, time.time() - 1))
+    assert index.refresh_from_store() == 1
+
+
+def test_person_index_rescans_only_after_local_writes_or_min_interval(
+    tmp_path, monkeypatch
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    index = PersonIndex()
+    save_details(_company("111111111", ("DUPONT", "JEAN", "1980-01")))
+    assert index.refresh_from_store(min_interval=60) == 1
+
+    (tmp_path / ".cache" / "details" / "222222222.json").write_text(
+        _company("222222222", ("DUPONT", "JEAN", "1980-01")).model_dump_json()
+    )  # another process's write
+    assert index.refresh_from_store(min_interval=60) == 0
+    save_details(_company("333333333", ("MARTIN", "ANNE", "1990-05")))
+    assert index.refresh_from_store(min_interval=60) == 2
+
+
+def test_person_index_forgets_people_without_companies() -> None:
+    index = PersonIndex()
+    index.add_company(_company("111111111", ("DUPONT", "JEAN", "1980-01")))
+    index.add_company(_company("111111111", ("MARTIN", "ANNE", "1990-05")))
+    assert [p.display_name for p in index.people_for("111111111")] == ["ANNE MARTIN"]
+    assert len(index._display_names) == 1
+
+
+def test_person_index_skips_corrupt_store_files(tmp_path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    index = PersonIndex()
+    save_details(_company("111111111", ("DUPONT", "JEAN", "1980-01")))
+    store = tmp_path / ".cache" / "details"
+    (store / "222222222.json").write_text('{"siren": "2222')  # cut short by a crash
+    (store / "333333333.json").write_text('{"siren": null}')
+
+    assert index.refresh_from_store() == 1
+    assert index.company_name("111111111") != "111111111"
+    assert load_stored_details("222222222") is None
@@ -0,0 +1,189 @@
+import multiprocessing
+
+import pytest
+
+from invest_registry.clients.france import (
+    FranceCompanySearchClient,
+    FranceSearchParams,
+    collect_companies,
+)
+from invest_registry.harvest import (
+    HarvestStore,
+    _harvest_worker,
+    claim_order,
+    plan_units,
+    run_harvest,
+)
+from invest_registry.jobs import JobSpec, create_job, job_dir, load_job_info, load_job_records
+from invest_registry.mock_api import MockRegistry, MockRegistryServer
+from invest_registry.rate_limit import RateLimiter, SharedRateLimiter
+from invest_registry.settings import Settings
+
+_SEARCHES = [
+    FranceSearchParams(q="", activite_principale=naf) for naf in ("62.01Z", "58.29C", "70.22Z")
+]
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    registry = MockRegistry.synthetic(3_000, seed=5)
+    with MockRegistryServer(registry) as server:
+        yield server
+
+
+def _settings(server: MockRegistryServer) -> Settings:
+    return Settings(france_api_base_url=server.base_url, france_api_rate_limit_per_second=1_000)
+
+
+def _spec(target_count: int = 100_000) -> JobSpec:
+    return JobSpec(
+        searches=_SEARCHES, target_count=target_count, per_page=20, postal_code_prefix="75"
+    )
+
+
+def test_plan_units_and_claim_order() -> None:
+    units = plan_units([7, 2], first_pages=[1, 2], pages_per_unit=3)
+    assert [(u.search, u.first_page, u.last_page) for u in units] == [
+        (0, 1, 3),
+        (0, 4, 6),
+        (0, 7, 7),
+        (1, 2, 2),
+    ]
+    assert plan_units([7], max_pages_per_search=4, pages_per_unit=3)[-1].last_page == 4
+
+    # Own shard front to back, then the other shards back to front.
+    assert claim_order(6, 0, 2) == [0, 2, 4, 5, 3, 1]
+    assert claim_order(5, 2, 3) == [2, 3, 0, 4, 1]
+
+
+def test_harvest_matches_a_sequential_collect(server) -> None:
+    app_settings = _settings(server)
+    with FranceCompanySearchClient(
+        app_settings=app_settings, rate_limiter=RateLimiter(1_000)
+    ) as client:
+        expected = collect_companies(
+            client,
+            searches=_SEARCHES,
+            target_count=100_000,
+            per_page=20,
+            max_pages_per_search=None,
+            postal_code_prefix="75",
+        )
+    server.registry.requests = 0
+
+    info = create_job(_spec(), label="harvest")
+    done = run_harvest(
+        info.job_id, workers=3, pages_per_unit=2, app_settings=app_settings, poll_seconds=0.1
+    )
+
+    records = load_job_records(info.job_id)
+    assert done.status == "done"
+    assert done.records_kept == len(records) == len(expected)
+    assert {r.siren for r in records} == {r.siren for r in expected}
+    # One page-1 probe per search, then every reachable page exactly once.
+    assert server.registry.requests == done.pages_fetched == done.reachable_pages
+    assert load_job_info(info.job_id).searches == [
+        {"next_page": s["total_pages"] + 1, "total_pages": s["total_pages"]} for s in done.searches
+    ]
+
+
+def test_harvest_pauses_and_resumes_without_refetching_done_units(server) -> None:
+    app_settings = _settings(server)
+    info = create_job(_spec(), label="harvest")
+    store_root = job_dir(info.job_id) / "harvest"
+
+    paused = run_harvest(
+        info.job_id,
+        workers=2,
+        pages_per_unit=1,
+        app_settings=app_settings,
+        should_stop=lambda: any(store_root.glob("*.done")),
+        poll_seconds=0.05,
+    )
+    assert paused.status == "paused"
+    done_units = set(HarvestStore(store_root).done_units())
+    requests = server.registry.requests
+
+    done = run_harvest(
+        info.job_id, workers=2, pages_per_unit=1, app_settings=app_settings, poll_seconds=0.05
+    )
+    assert done.status == "done"
+    assert server.registry.requests - requests == done.reachable_pages - len(_SEARCHES) - len(
+        done_units
+    )
+    records = load_job_records(info.job_id)
+    assert len({r.siren for r in records}) == len(records) == done.records_kept
+
+
+def test_a_lone_worker_steals_every_other_shard(server) -> None:
+    app_settings = _settings(server)
+    info = create_job(_spec(), label="harvest")
+    store = HarvestStore(job_dir(info.job_id) / "harvest")
+    units = plan_units([4, 3, 2], pages_per_unit=1)
+    store.save_plan(units, pages_before=0)
+
+    _harvest_worker(
+        str(store.root),
+        _spec(),
+        frozenset(),
+        app_settings,
+        SharedRateLimiter(1_000),
+        multiprocessing.Value("q", 0),
+        multiprocessing.Event(),
+        worker=1,
+        n_workers=4,
+    )
+
+    assert set(store.done_units()) == {u.unit_id for u in units}
+    assert server.registry.requests == len(units)
+
+
+def test_harvest_stops_at_the_target(server) -> None:
+    info = create_job(_spec(target_count=15), label="harvest")
+
+    done = run_harvest(
+        info.job_id, workers=2, pages_per_unit=1, app_settings=_settings(server), poll_seconds=0.05
+    )
+
+    assert done.status == "done"
+    assert len(load_job_records(info.job_id)) == 15
+    assert done.pages_fetched < done.reachable_pages
+
+
+def test_only_fully_read_units_are_completed(server) -> None:
+    info = create_job(_spec(target_count=50), label="harvest")
+
+    done = run_harvest(
+        info.job_id, workers=2, pages_per_unit=3, app_settings=_settings(server), poll_seconds=0.05
+    )
+
+    assert done.status == "done"
+    assert len(load_job_records(info.job_id)) == 50
+    store = HarvestStore(job_dir(info.job_id) / "harvest")
+    units, _ = store.load_plan()
+    completed = store.done_units()
+    assert completed and len(completed) < len(units)
+    for unit_id, counters in completed.items():
+        assert counters["pages_fetched"] == units[unit_id].pages
+    assert done.pages_fetched < done.reachable_pages
+
+
+def test_no_unit_starts_once_the_target_is_reached(server) -> None:
+    store = HarvestStore(job_dir("reached") / "harvest")
+    store.save_plan(plan_units([4, 3, 2], pages_per_unit=1), pages_before=0)
+
+    _harvest_worker(
+        str(store.root),
+        _spec(target_count=10),
+        frozenset(),
+        _settings(server),
+        SharedRateLimiter(1_000),
+        multiprocessing.Value("q", 10),
+        multiprocessing.Event(),
+        worker=0,
+        n_workers=1,
+    )
+
+    assert store.done_units() == {}
+    assert server.registry.requests == 0
@@ -0,0 +1,108 @@
+"""Cold imports, measured with `python -X importtime` in a fresh interpreter.
+
+Pages are measured the way Streamlit runs them: streamlit is already loaded, then
+the page's top-level imports execute. The `DEFERRED` check always runs and is exact.
+Wall-clock budgets depend on the machine, so they only run when opted in:
+
+    IMPORT_TIME_BUDGETS=1 uv run pytest tests/test_import_time.py
+"""
+
+import ast
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+PAGES = ("1_Search.py", "2_Company_Deep_Dive.py")
+
+# Loaded on first use (a fetch, a retry, reading settings), never by a cold import.
+DEFERRED = ("httpx", "tenacity", "pydantic_settings")
+
+# Best-of-three cumulative import time, in ms.
+PACKAGE_BUDGET_MS = 400
+PAGE_BUDGET_MS = 500
+import_budget = pytest.mark.skipif(
+    not os.environ.get("IMPORT_TIME_BUDGETS"), reason="set IMPORT_TIME_BUDGETS=1 to check"
+)
+
+_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|( +)(\S+)")
+_MARK = "-- measure --"
+
+
+def _cold_import(code: str, *, preload: str = "") -> tuple[float, set[str]]:
+    """(ms, modules) for running `code` in a fresh interpreter, after `preload`."""
+    script = f"{preload}\nimport sys\nprint({_MARK!r}, file=sys.stderr, flush=True)\n{code}"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=ROOT,
+    )
+    total_us = 0
+    modules: set[str] = set()
+    measuring = False
+    for line in proc.stderr.splitlines():
+        if line == _MARK:
+            measuring = True
+            continue
+        m = _LINE.match(line)
+        if not (measuring and m):
+            continue
+        modules.add(m.group(3))
+        if len(m.group(2)) == 1:  # imported by `code` itself; includes its children
+            total_us += int(m.group(1))
+    return total_us / 1000, modules
+
+
+def _best_of(code: str, *, preload: str = "", runs: int = 3) -> tuple[float, set[str]]:
+    results = [_cold_import(code, preload=preload) for _ in range(runs)]
+    return min(ms for ms, _ in results), results[0][1]
+
+
+def _page_imports(page: str) -> str:
+    tree = ast.parse((ROOT / "pages" / page).read_text(encoding="utf-8"))
+    nodes = [n for n in tree.body if isinstance(n, (ast.Import, ast.ImportFrom))]
+    return "\n".join(ast.unparse(n) for n in nodes)
+
+
+def _deferred_loaded(modules: set[str]) -> list[str]:
+    return sorted(m for m in modules if m.split(".")[0] in DEFERRED)
+
+
+def test_package_cold_import_defers_http_and_settings():
+    _, modules = _cold_import("import invest_registry.clients.france")
+    assert _deferred_loaded(modules) == []
+
+
+@pytest.mark.parametrize("page", PAGES)
+def test_page_cold_import_defers_http_and_settings(page):
+    _, modules = _cold_import(_page_imports(page), preload="import streamlit")
+    assert _deferred_loaded(modules) == []
+
+
+@import_budget
+def test_package_cold_import_stays_within_budget():
+    ms, _ = _best_of("import invest_registry.clients.france")
+    assert ms < PACKAGE_BUDGET_MS, f"cold import took {ms:.0f} ms"
+
+
+@import_budget
+@pytest.mark.parametrize("page", PAGES)
+def test_page_cold_import_stays_within_budget(page):
+    ms, _ = _best_of(_page_imports(page), preload="import streamlit")
+    assert ms < PAGE_BUDGET_MS, f"{page} imports took {ms:.0f} ms"
+
+
+def test_settings_are_resolved_on_first_use():
+    code = (
+        "import sys\n"
+        "import invest_registry.settings as s\n"
+        "assert 'settings' not in vars(s)\n"
+        "assert s.settings is s.get_settings()\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=ROOT)
@@ -0,0 +1,111 @@
+import pytest
+
+from invest_registry.clients.france import FranceSearchParams
+from invest_registry.jobs import (
+    JobSpec,
+    create_job,
+    job_dir,
+    list_jobs,
+    load_job_info,
+    load_job_records,
+    run_job,
+)
+from invest_registry.models import FranceSearchResponse
+
+
+class _PagedClient:
+    def __init__(self, *, total_pages: int, fail_on_page: int | None = None) -> None:
+        self._total_pages = total_pages
+        self.fail_on_page = fail_on_page
+        self.calls: list[int] = []
+
+    def search(
+        self, *, search: FranceSearchParams, page: int = 1, per_page: int = 25
+    ) -> FranceSearchResponse:
+        if page == self.fail_on_page:
+            raise RuntimeError("boom")
+        self.calls.append(page)
+        results = [
+            {"siren": f"{page:03d}{i:06d}", "nom_raison_sociale": f"CO {page}-{i}"}
+            for i in range(2)
+        ]
+        return FranceSearchResponse.model_validate(
+            {
+                "page": page,
+                "per_page": per_page,
+                "total_pages": self._total_pages,
+                "total_results": self._total_pages * 2,
+                "results": results,
+            }
+        )
+
+
+@pytest.fixture(autouse=True)
+def _in_tmp_dir(tmp_path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+
+
+def _spec(target_count: int) -> JobSpec:
+    return JobSpec(
+        searches=[FranceSearchParams(q="", activite_principale="62.01Z")], target_count=target_count
+    )
+
+
+def test_job_pauses_and_resumes_without_repeating_pages() -> None:
+    info = create_job(_spec(8), label="test")
+    client = _PagedClient(total_pages=10)
+
+    run_job(info.job_id, client, should_stop=lambda: len(client.calls) >= 2)  # type: ignore[arg-type]
+    paused = load_job_info(info.job_id)
+    assert paused.status == "paused"
+    assert paused.records_kept == 4
+    assert paused.searches == [{"next_page": 3, "total_pages": 10}]
+
+    client = _PagedClient(total_pages=10)
+    done = run_job(info.job_id, client)  # type: ignore[arg-type]
+    assert client.calls == [3, 4]
+    assert done.status == "done"
+
+    records = load_job_records(info.job_id)
+    assert len(records) == 8
+    assert len({r.siren for r in records}) == 8
+    assert [j.job_id for j in list_jobs()] == [info.job_id]
+
+
+def test_job_resumes_after_failure() -> None:
+    info = create_job(_spec(6), label="test")
+
+    with pytest.raises(RuntimeError):
+        run_job(info.job_id, _PagedClient(total_pages=5, fail_on_page=2))  # type: ignore[arg-type]
+    failed = load_job_info(info.job_id)
+    assert failed.status == "failed"
+    assert failed.error == "boom"
+
+    client = _PagedClient(total_pages=5)
+    run_job(info.job_id, client)  # type: ignore[arg-type]
+    assert client.calls == [2, 3]
+    assert len(load_job_records(info.job_id)) == 6
+
+
+def test_record_line_cut_short_by_a_crash_is_dropped_on_resume() -> None:
+    info = create_job(_spec(6), label="test")
+    client = _PagedClient(total_pages=5)
+    run_job(info.job_id, client, should_stop=lambda: len(client.calls) >= 2)  # type: ignore[arg-type]
+    with (job_dir(info.job_id) / "records.ndjson").open("a", encoding="utf-8") as f:
+        f.write('{"siren": "0030000')  # the crash hit while page 3 was being written
+
+    assert len(load_job_records(info.job_id)) == 4
+    done = run_job(info.job_id, _PagedClient(total_pages=5))  # type: ignore[arg-type]
+    assert done.status == "done"
+    records = load_job_records(info.job_id)
+    assert len(records) == len({r.siren for r in records}) == 6
+
+
+def test_job_stopped_after_its_last_page_is_done() -> None:
+    info = create_job(_spec(10), label="test")
+    client = _PagedClient(total_pages=2)
+
+    done = run_job(info.job_id, client, should_stop=lambda: len(client.calls) >= 2)  # type: ignore[arg-type]
+
+    assert done.status == "done"
+    assert done.records_kept == 4
@@ -0,0 +1,59 @@
+import httpx
+import pytest
+
+from invest_registry.clients.france import FranceCompanySearchClient, FranceSearchParams
+from invest_registry.metrics import MetricsRegistry, metrics
+from invest_registry.rate_limit import RateLimiter
+from invest_registry.settings import Settings
+
+
+@pytest.fixture(autouse=True)
+def _fresh_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_registry_exports_prometheus_text_and_quantiles() -> None:
+    reg = MetricsRegistry()
+    reg.inc("hits_total", cache="a")
+    reg.inc("hits_total", 2, cache="a")
+    reg.set("pass_rate", 0.25)
+    for v in (0.01, 0.2, 0.2, 3.0):
+        reg.observe("latency_seconds", v, buckets=(0.1, 1.0))
+
+    assert reg.value("hits_total", cache="a") == 3
+    assert reg.quantile("latency_seconds", 0.5) == 1.0
+    assert reg.quantile("latency_seconds", 1.0) == float("inf")
+    text = reg.to_prometheus()
+    assert 'hits_total{cache="a"} 3' in text
+    assert "pass_rate 0.25" in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in text
+    assert "latency_seconds_count 4" in text
+    assert reg.snapshot()["histograms"]["latency_seconds"][0]["counts"] == [1, 2, 1]
+
+
+def test_client_records_latency_status_retries_and_bytes() -> None:
+    statuses = iter([503, 200])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        status = next(statuses)
+        body = {"results": [], "page": 1, "per_page": 1, "total_pages": 0, "total_results": 0}
+        return httpx.Response(status, json=body if status == 200 else {})
+
+    app_settings = Settings(http_max_retries=2)
+    client = FranceCompanySearchClient(
+        app_settings=app_settings,
+        http=httpx.Client(base_url="https://test", transport=httpx.MockTransport(handler)),
+        rate_limiter=RateLimiter(1000),
+    )
+    with client:
+        client.search(search=FranceSearchParams(q="x"), per_page=1)
+
+    assert metrics.value("france_api_requests_total", status="503") == 1
+    assert metrics.value("france_api_requests_total", status="200") == 1
+    assert metrics.value("france_api_retries_total") == 1
+    assert metrics.value("france_api_response_bytes_total") > 0
+    hist = metrics.snapshot()["histograms"]["france_api_request_seconds"][0]
+    assert hist["count"] == 2
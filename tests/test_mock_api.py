@@ -0,0 +1,103 @@
+import httpx
+import pytest
+
+from invest_registry.clients.france import (
+    RETRY_AFTER_MAX_SECONDS,
+    FranceCompanySearchClient,
+    FranceSearchParams,
+    _retry_after_seconds,
+    collect_companies,
+)
+from invest_registry.mock_api import Faults, MockRegistry, MockRegistryServer
+from invest_registry.rate_limit import RateLimiter
+from invest_registry.settings import Settings
+from invest_registry.synthetic import synthetic_results
+
+_FAST = Settings(http_max_retries=3, http_retry_backoff_seconds=0.0)
+
+
+def _client(registry: MockRegistry, app_settings: Settings = _FAST) -> FranceCompanySearchClient:
+    return FranceCompanySearchClient(
+        app_settings=app_settings,
+        http=httpx.Client(base_url="https://mock", transport=registry.transport()),
+        rate_limiter=RateLimiter(10_000),
+    )
+
+
+def test_mock_serves_api_paging_filters_and_include() -> None:
+    corpus = synthetic_results(300, seed=1, include_details=True)
+    registry = MockRegistry(corpus)
+    with _client(registry) as client:
+        search = FranceSearchParams(q="", activite_principale="62.01Z,58.29C")
+        first = client.search(search=search, page=1, per_page=25)
+        last = client.search(search=search, page=first.total_pages, per_page=25)
+        assert first.total_results == sum(
+            1 for r in corpus if r["activite_principale"] in {"62.01Z", "58.29C"}
+        )
+        assert len(last.results) == first.total_results - 25 * (first.total_pages - 1)
+        assert {r.activite_principale for r in first.results} <= {"62.01Z", "58.29C"}
+        assert first.results[0].dirigeants  # full payload without minimal
+
+        sections = client.search(
+            search=FranceSearchParams(q="", section_activite_principale="M,G"), per_page=25
+        )
+        assert sections.total_results == sum(
+            1 for r in corpus if r["activite_principale"] in {"70.22Z", "72.19Z", "47.91B"}
+        )
+
+        details = client.search(
+            search=FranceSearchParams(q="000000007", minimal=True, include="finances"), per_page=1
+        )
+        assert details.results[0].siren == "000000007"
+        assert details.results[0].finances and details.results[0].siege is None
+
+        with pytest.raises(ValueError):
+            client.search(search=search, per_page=26)
+
+
+def test_client_retries_5xx_bursts_and_honours_retry_after() -> None:
+    registry = MockRegistry.synthetic(
+        50,
+        faults=Faults(
+            error_rate=1.0, error_burst=2, rate_limit_per_second=1, retry_after_seconds=0
+        ),
+        clock=lambda: 0.0,  # frozen clock: the second request in the window gets a 429
+    )
+    with _client(registry) as client, pytest.raises(httpx.HTTPStatusError) as err:
+        client.search(search=FranceSearchParams(q=""), per_page=5)
+    assert err.value.response.status_code == 429
+    assert registry.status_counts == {503: 1, 429: 2}
+    assert _retry_after_seconds(err.value) == 0.0
+
+    def _429(retry_after: str) -> httpx.HTTPStatusError:
+        resp = httpx.Response(429, headers={"retry-after": retry_after})
+        request = httpx.Request("GET", "https://mock/search")
+        return httpx.HTTPStatusError("429", request=request, response=resp)
+
+    assert _retry_after_seconds(_429("3")) == 3.0
+    assert _retry_after_seconds(_429("3600")) == RETRY_AFTER_MAX_SECONDS
+    assert _retry_after_seconds(_429("Wed, 21 Oct 2015 07:28:00 GMT")) == 0.0
+    assert _retry_after_seconds(_429("soon")) is None
+
+
+def test_collect_companies_hits_pagination_cap() -> None:
+    registry = MockRegistry.synthetic(200, faults=Faults(max_page=2))
+    with _client(registry) as client, pytest.raises(httpx.HTTPStatusError):
+        collect_companies(
+            client,
+            searches=[FranceSearchParams(q="", etat_administratif=None)],
+            target_count=200,
+            max_pages_per_search=None,
+        )
+    assert registry.status_counts[400] == 1
+
+
+def test_mock_server_over_http() -> None:
+    registry = MockRegistry.synthetic(30)
+    with MockRegistryServer(registry) as server:
+        app_settings = Settings(france_api_base_url=server.base_url, http_max_retries=1)
+        with FranceCompanySearchClient(
+            app_settings=app_settings, rate_limiter=RateLimiter(1000)
+        ) as client:
+            resp = client.search(search=FranceSearchParams(q=""), page=2, per_page=25)
+    assert (resp.total_pages, len(resp.results)) == (2, 5)
@@ -0,0 +1,42 @@
+from invest_registry.clients.france import FranceSearchParams
+from invest_registry.naf import (
+    NAF_CODES_PER_REQUEST,
+    expand_naf,
+    naf_index,
+    plan_naf_searches,
+    section_of,
+)
+
+_TEMPLATE = FranceSearchParams(q="", tranche_effectif_salarie="00,01")
+
+
+def test_index_covers_every_level_of_naf_rev2() -> None:
+    index = naf_index()
+    subclasses = [node for node in index if len(node) == 6]
+    assert len(subclasses) == 732
+    assert sum(len(n) == 5 for n in index) == 615  # classes
+    assert sum(len(n) == 4 for n in index) == 272  # groups
+    assert sum(len(n) == 2 for n in index) == 88  # divisions
+    assert sorted(n for n in index if len(n) == 1) == list("ABCDEFGHIJKLMNOPQRSTU")
+    assert sum(len(index[s]) for s in "ABCDEFGHIJKLMNOPQRSTU") == 732
+
+    assert expand_naf("62") == ("62.01Z", "62.02A", "62.02B", "62.03Z", "62.09Z")
+    assert expand_naf("58.2") == ("58.21Z", "58.29A", "58.29B", "58.29C")
+    assert expand_naf(" 62.01 ") == ("62.01Z",)
+    assert expand_naf("j")[:2] == ("58.11Z", "58.12Z")
+    assert expand_naf("62.5") == ()
+    assert section_of("62.01Z") == "J" and section_of("04.00Z") is None
+
+
+def test_planner_uses_sections_and_chunked_lists() -> None:
+    codes = expand_naf("J") + expand_naf("M") + expand_naf("47") + ("01.11Z",)
+
+    searches = plan_naf_searches(codes, _TEMPLATE)
+
+    assert searches[0].section_activite_principale == "J,M"
+    assert searches[0].activite_principale is None
+    listed = [c for s in searches[1:] for c in s.activite_principale.split(",")]
+    assert listed == sorted(("01.11Z",) + expand_naf("47"))
+    assert len(searches) == 1 + -(-len(listed) // NAF_CODES_PER_REQUEST)
+    assert all(s.tranche_effectif_salarie == "00,01" for s in searches)
+    assert plan_naf_searches([], _TEMPLATE) == []
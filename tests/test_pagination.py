@@ -1,6 +1,6 @@
 import pytest
 
-from invest_registry.pagination import paginate  # type: ignore[import-untyped]
+from invest_registry.pagination import page_cursor, page_slice, paginate  # type: ignore[import-untyped]
 
 
 def test_paginate_returns_total_pages_and_slice() -> None:
@@ -27,3 +27,26 @@ def test_paginate_rejects_non_positive_page_size() -> None:
     with pytest.raises(ValueError):
         paginate([1, 2, 3], page=1, page_size=0)
 
+
+
+def test_page_cursor_navigates_and_clamps() -> None:
+    cursor = page_cursor(25, page=99, page_size=10)
+    assert (cursor.page, cursor.total_pages, cursor.start, cursor.end) == (3, 3, 20, 25)
+    assert cursor.has_prev and not cursor.has_next
+    assert cursor.prev().page == 2
+    assert cursor.next().page == 3
+
+
+def test_page_slice_follows_order_permutation() -> None:
+    items = ["a", "b", "c", "d", "e"]
+    order = [4, 3, 2, 1, 0]
+    cursor = page_cursor(len(items), page=2, page_size=2)
+    assert page_slice(items, cursor) == ["c", "d"]
+    assert page_slice(items, cursor, order=order) == ["c", "b"]
+
+
+def test_page_cursor_empty() -> None:
+    cursor = page_cursor(0, page=1, page_size=10)
+    assert cursor.total_pages == 0
+    assert page_slice([], cursor) == []
+    assert not cursor.has_prev and not cursor.has_next
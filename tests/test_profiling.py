@@ -0,0 +1,49 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from invest_registry.profiling import profile_run, span, trace_path
+
+
+def test_span_is_a_no_op_outside_a_profiled_run() -> None:
+    with span("anything"):
+        pass
+
+
+def test_profile_run_records_nested_spans_and_appends_trace(tmp_path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+
+    with pytest.raises(RuntimeError), profile_run("Search") as profile:
+        with span("fetch_records"):
+            with span("http"):
+                pass
+            with span("http"):
+                pass
+        raise RuntimeError("stopped early")  # e.g. st.stop()
+
+    assert [(s.name, s.depth) for s in profile.spans] == [
+        ("fetch_records", 0),
+        ("http", 1),
+        ("http", 1),
+    ]
+    rows = {r["span"]: r for r in profile.breakdown()}
+    assert rows["http"]["calls"] == 2
+    assert profile.total_ms >= rows["fetch_records"]["ms"]
+
+    lines = trace_path().read_text(encoding="utf-8").splitlines()
+    assert json.loads(lines[-1])["label"] == "Search"
+
+
+def test_sampling_profiler_writes_folded_stacks(tmp_path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+
+    def busy() -> int:
+        return sum(i * i for i in range(300_000))
+
+    with profile_run("Deep dive", sample=True, trace=False) as profile:
+        busy()
+
+    assert profile.samples > 0
+    assert profile.folded_path is not None
+    assert "test_profiling.py:busy" in Path(profile.folded_path).read_text(encoding="utf-8")
@@ -0,0 +1,63 @@
+from invest_registry.clients.france import FranceSearchParams
+from invest_registry.pulls import (
+    AdvancedOptions,
+    cache_key,
+    normalize_naf_override,
+    override_searches,
+    pull_plan,
+)
+
+
+def test_normalize_naf_override_keeps_valid_codes_and_reports_the_rest() -> None:
+    assert normalize_naf_override(" 62.01z, 58.29C~ ,6201") == ("62.01Z,58.29C", ["6201"])
+    assert normalize_naf_override("") == (None, [])
+    assert normalize_naf_override("j, 62, 58.2,62.01, 62, 62.5, 99.0") == (
+        "J,62,58.2,62.01,99.0",
+        ["62.5"],
+    )
+
+
+def test_naf_override_replaces_pack_searches() -> None:
+    pack = [FranceSearchParams(q="", activite_principale=naf) for naf in ("58.29C", "62.01Z")]
+
+    out = override_searches(
+        pack,
+        q="data",
+        activite_principale="70.22Z",
+        tranche_effectif_salarie=None,
+        etat_administratif=None,
+    )
+
+    assert [(s.q, s.activite_principale) for s in out] == [("data", "70.22Z")]
+
+
+def test_naf_prefix_override_expands_into_few_searches() -> None:
+    out = override_searches(
+        [],
+        q="",
+        activite_principale="J,62,70.2",
+        tranche_effectif_salarie="00",
+        etat_administratif="A",
+    )
+
+    # Division 62 is inside section J: one section search, one list for the 70.2 classes.
+    assert [(s.section_activite_principale, s.activite_principale) for s in out] == [
+        ("J", None),
+        (None, "70.21Z,70.22Z"),
+    ]
+    assert {s.tranche_effectif_salarie for s in out} == {"00"}
+
+
+def test_pull_plan_and_cache_key_follow_the_options() -> None:
+    adv = AdvancedOptions(max_pages_per_search=3, employer_filter="yes")
+
+    searches, filters = pull_plan(pack_name="blossom_like_france", paris_only=True, adv=adv)
+
+    assert [s.activite_principale for s in searches] == ["58.29C,62.01Z"]  # one search
+    assert filters["postal_code_prefix"] == "75"
+    assert filters["is_employer"] is True
+    assert filters["max_pages_per_search"] == 3
+    key = cache_key(pack_name="blossom_like_france", paris_only=True, target_count=50, adv=adv)
+    assert key != cache_key(
+        pack_name="blossom_like_france", paris_only=True, target_count=50, adv=AdvancedOptions()
+    )
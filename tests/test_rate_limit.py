@@ -0,0 +1,73 @@
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+from invest_registry.rate_limit import RateLimiter, SharedRateLimiter
+
+
+def test_burst_then_rate_limited() -> None:
+    limiter = RateLimiter(10.0, burst=2)
+    assert limiter.acquire(timeout=0)
+    assert limiter.acquire(timeout=0)
+    assert not limiter.acquire(timeout=0)
+
+    start = time.monotonic()
+    assert limiter.acquire(timeout=1)
+    assert time.monotonic() - start >= 0.05
+
+
+def test_low_priority_keeps_a_reserve_for_normal_requests() -> None:
+    limiter = RateLimiter(1.0, burst=3, low_priority_reserve=1)
+    assert limiter.acquire(priority="low", timeout=0)
+    assert limiter.acquire(priority="low", timeout=0)
+    # One token left: low priority must not take it, normal priority may.
+    assert not limiter.acquire(priority="low", timeout=0)
+    assert limiter.acquire(priority="normal", timeout=0)
+
+
+def test_low_priority_yields_to_waiting_normal_requests() -> None:
+    limiter = RateLimiter(20.0, burst=1, low_priority_reserve=0)
+    assert limiter.acquire(timeout=0)
+    order: list[str] = []
+
+    def take(priority: str) -> None:
+        limiter.acquire(priority=priority, timeout=2)
+        order.append(priority)
+
+    normal = threading.Thread(target=take, args=("normal",))
+    normal.start()
+    time.sleep(0.01)
+    low = threading.Thread(target=take, args=("low",))
+    low.start()
+    normal.join()
+    low.join()
+    assert order == ["normal", "low"]
+
+
+def test_rejects_unknown_priority() -> None:
+    with pytest.raises(ValueError):
+        RateLimiter(1.0).acquire(priority="urgent")
+
+
+def test_shared_limiter_budget_spans_processes() -> None:
+    ctx = multiprocessing.get_context("spawn")
+    limiter = SharedRateLimiter(0.01, burst=1, context=ctx)
+
+    child = ctx.Process(target=limiter.acquire, kwargs={"timeout": 0})
+    child.start()
+    child.join()
+
+    assert child.exitcode == 0
+    assert not limiter.acquire(timeout=0)  # the child took the only token
+
+
+def test_shared_limiter_refills_at_the_rate() -> None:
+    limiter = SharedRateLimiter(20.0, burst=1)
+    assert limiter.acquire(timeout=0)
+    assert not limiter.acquire(priority="low", timeout=0)
+
+    start = time.monotonic()
+    assert limiter.acquire(timeout=1)
+    assert time.monotonic() - start >= 0.04
@@ -0,0 +1,82 @@
+from datetime import date
+
+from invest_registry.financials import FinancialYear, compute_metrics
+from invest_registry.results import ResultView
+
+
+def _row(siren: str, name: str, created: str | None) -> dict:
+    return {
+        "country": "FR",
+        "siren": siren,
+        "siret": None,
+        "name": name,
+        "naf": None,
+        "creation_date": created,
+        "address": None,
+        "postal_code": None,
+        "commune": None,
+        "departement": None,
+        "region": None,
+        "employee_band": None,
+        "employee_band_year": None,
+        "is_employer": None,
+        "source": "test",
+    }
+
+
+def test_result_view_serves_sorted_pages() -> None:
+    view = ResultView.from_rows(
+        [
+            _row("1", "beta", "2022-01-01"),
+            _row("2", "Alpha", None),
+            _row("3", "gamma", "2024-01-01"),
+        ]
+    )
+
+    cursor = view.cursor(page=1, page_size=2)
+    assert [r.siren for r in view.page(cursor, sort="newest")] == ["3", "1"]
+    assert [r.siren for r in view.page(cursor.next(), sort="newest")] == ["2"]
+    assert [r.siren for r in view.page(cursor, sort="name")] == ["2", "1"]
+    assert view.records[0].creation_date == date(2022, 1, 1)
+
+
+def test_result_view_memoizes_orders() -> None:
+    view = ResultView.from_rows([_row("1", "a", None), _row("2", "b", "2020-01-01")])
+    assert view.order("oldest") is view.order("oldest")
+    assert view.order("oldest") == [1, 0]
+    assert sorted(view.order("score")) == [0, 1]
+
+
+def test_result_view_filters_and_builds_table_columns() -> None:
+    view = ResultView.from_rows(
+        [
+            _row("111", "Acme Data", "2023-01-01"),
+            _row("222", "Other", "2024-01-01"),
+            _row("333", "acme labs", "2021-01-01"),
+        ]
+    )
+
+    order = view.filtered_order("newest", " ACME ")
+    assert order == [0, 2]
+    assert view.filtered_order("newest", "") == view.order("newest")
+
+    table = view.table(order)
+    assert table["siren"] == ["111", "333"]
+    assert table["inpi"][0] == "https://data.inpi.fr/entreprises/111"
+
+
+def test_result_view_sorts_by_attached_financials() -> None:
+    view = ResultView.from_rows([_row("1", "a", None), _row("2", "b", None), _row("3", "c", None)])
+    assert view.table([0])["yoy_growth"] == [None]
+
+    view.attach_financials(
+        compute_metrics(
+            {
+                "1": [FinancialYear(2022, 100.0, 1.0), FinancialYear(2023, 110.0, 1.0)],
+                "3": [FinancialYear(2022, 100.0, 1.0), FinancialYear(2023, 300.0, 1.0)],
+            }
+        )
+    )
+    assert view.order("growth") == [2, 0, 1]
+    assert view.order("score")[0] == 2
+    assert view.table([2, 1])["revenue"] == [300.0, None]
@@ -0,0 +1,68 @@
+import multiprocessing
+
+import numpy as np
+
+from invest_registry.reviewed import MERGE_EVERY, SirenSet
+
+
+def test_membership_is_exact_and_ignores_malformed_sirens() -> None:
+    sirens = SirenSet()
+
+    assert sirens.add(["794598813", "000000042", "794598813", "not-a-siren", "123"]) == 2
+    assert sirens.add(["794598813"]) == 0
+
+    assert "794598813" in sirens and "000000042" in sirens
+    assert "794598814" not in sirens and "not-a-siren" not in sirens
+    assert sirens.contains_many(["000000042", "999999999", "x"]).tolist() == [True, False, False]
+    assert len(sirens) == 2
+
+
+def test_large_sets_stay_compact_and_merge_in_batches(tmp_path) -> None:
+    rng = np.random.default_rng(0)
+    values = rng.choice(999_999_999, size=200_000, replace=False)
+    path = tmp_path / "reviewed.npy"
+    sirens = SirenSet(path)
+
+    assert sirens.add(f"{v:09d}" for v in values) == len(values)
+    sirens.add(f"{v:09d}" for v in range(1, MERGE_EVERY // 2))  # stays buffered
+    sirens.save()
+
+    assert path.stat().st_size < 4 * (len(values) + MERGE_EVERY) + 256
+    reloaded = SirenSet(path)
+    assert len(reloaded) == len(sirens)
+    assert reloaded.contains_many(f"{v:09d}" for v in values[:1000]).all()
+
+
+def test_concurrent_writers_are_merged_on_save(tmp_path) -> None:
+    path = tmp_path / "reviewed.npy"
+    first, second = SirenSet(path), SirenSet(path)
+
+    first.add(["111111111"])
+    first.save()
+    second.add(["222222222"])
+    second.save()
+    first.reload()
+
+    for sirens in (first, second):
+        assert sirens.contains_many(["111111111", "222222222"]).all()
+        assert len(sirens) == 2
+
+
+def _mark(path, start: int) -> None:
+    sirens = SirenSet(path)
+    for v in range(start, start + 100):
+        sirens.add([f"{v:09d}"])
+        sirens.save()
+
+
+def test_concurrent_processes_do_not_lose_additions(tmp_path) -> None:
+    path = tmp_path / "reviewed.npy"
+    ctx = multiprocessing.get_context("spawn")
+    children = [ctx.Process(target=_mark, args=(path, start)) for start in (1, 1001)]
+    for child in children:
+        child.start()
+    for child in children:
+        child.join()
+
+    assert [child.exitcode for child in children] == [0, 0]
+    assert len(SirenSet(path)) == 200
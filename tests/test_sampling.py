@@ -0,0 +1,104 @@
+from dataclasses import replace
+from datetime import date
+
+import httpx
+import pytest
+
+from invest_registry.clients.france import FranceCompanySearchClient, FranceSearchParams
+from invest_registry.mock_api import Faults, MockRegistry
+from invest_registry.pulls import years_ago
+from invest_registry.rate_limit import RateLimiter
+from invest_registry.sampling import sample_estimate
+from invest_registry.settings import Settings
+from invest_registry.synthetic import synthetic_results
+
+_DEPARTEMENTS = ("75", "92", "69", "13")
+_STRATA = [
+    FranceSearchParams(q="", activite_principale="62.01Z", departement=d) for d in _DEPARTEMENTS
+]
+_CUTOFF = years_ago(date.today(), 5)
+
+
+@pytest.fixture(scope="module")
+def corpus() -> list[dict]:
+    return synthetic_results(30_000, seed=2)
+
+
+def _client(registry: MockRegistry) -> FranceCompanySearchClient:
+    return FranceCompanySearchClient(
+        app_settings=Settings(),
+        http=httpx.Client(base_url="https://mock", transport=registry.transport()),
+        rate_limiter=RateLimiter(10_000),
+    )
+
+
+def _true_share(corpus: list[dict]) -> tuple[float, int]:
+    population = [
+        r
+        for r in corpus
+        if r["activite_principale"] == "62.01Z" and r["siege"]["departement"] in _DEPARTEMENTS
+    ]
+    young = sum(date.fromisoformat(r["date_creation"]) >= _CUTOFF for r in population)
+    return young / len(population), len(population)
+
+
+def test_estimate_stops_once_the_interval_is_tight(corpus) -> None:
+    truth, population = _true_share(corpus)
+    registry = MockRegistry(corpus)
+    rounds = []
+    with _client(registry) as client:
+        estimate = sample_estimate(
+            client, _STRATA, min_creation_date=_CUTOFF, margin=0.03, seed=1, on_round=rounds.append
+        )
+
+    assert estimate.stopped == "margin"
+    assert estimate.margin <= 0.03
+    assert estimate.low <= truth <= estimate.high
+    assert estimate.population == population
+    assert estimate.count_low <= truth * population <= estimate.count_high
+    total_pages = sum(s.pages_total for s in estimate.strata)
+    assert estimate.pages_fetched < total_pages / 2
+    # One count request per stratum, then only the sampled pages.
+    assert registry.requests == len(_STRATA) + estimate.pages_fetched
+    assert [r.pages_fetched for r in rounds] == sorted(r.pages_fetched for r in rounds)
+    assert all(s.pages_sampled >= 2 for s in estimate.strata)
+
+
+def test_reading_every_page_gives_the_exact_share(corpus) -> None:
+    truth, _ = _true_share(corpus)
+    with _client(MockRegistry(corpus)) as client:
+        estimate = sample_estimate(
+            client, _STRATA, min_creation_date=_CUTOFF, margin=0.0, max_pages=10_000
+        )
+
+    assert estimate.stopped == "exhausted"
+    assert estimate.low == estimate.high == pytest.approx(truth)
+    assert estimate.pages_fetched == sum(s.pages_total for s in estimate.strata)
+
+
+def test_page_budget_and_empty_strata(corpus) -> None:
+    strata = _STRATA + [FranceSearchParams(q="", activite_principale="01.11Z")]  # no company
+    with _client(MockRegistry(corpus)) as client:
+        estimate = sample_estimate(
+            client, strata, min_creation_date=_CUTOFF, margin=0.001, max_pages=12, seed=3
+        )
+
+    assert estimate.stopped == "budget"
+    assert estimate.pages_fetched == 12
+    assert estimate.strata[-1].population == estimate.strata[-1].pages_sampled == 0
+    assert 0.0 <= estimate.low < estimate.share < estimate.high <= 1.0
+
+
+def test_strata_past_the_page_cap_are_refused_before_sampling(corpus) -> None:
+    registry = MockRegistry(corpus, faults=Faults(max_page=10))
+    with _client(registry) as client:
+        with pytest.raises(ValueError, match="first 250 companies.*departement=75"):
+            sample_estimate(client, _STRATA, min_creation_date=_CUTOFF, max_page=10, seed=1)
+        assert registry.requests == len(_STRATA)  # count requests only
+
+        small = [replace(s, tranche_effectif_salarie="11") for s in _STRATA]
+        estimate = sample_estimate(
+            client, small, min_creation_date=_CUTOFF, margin=0.0, max_page=10, max_pages=100
+        )
+    assert estimate.stopped == "exhausted"
+    assert all(s.pages_total <= 10 for s in estimate.strata)
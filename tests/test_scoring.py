@@ -1,7 +1,82 @@
-from invest_registry.scoring import employee_band_label
+from datetime import date
+
+import numpy as np
+import pytest
+
+from invest_registry.models import CompanyRecord
+from invest_registry.query_packs import get_query_pack
+from invest_registry.scoring import (
+    ScoringFeatures,
+    ScoringWeights,
+    employee_band_label,
+    rank_records,
+    score_features,
+    top_k,
+)
 
 
 def test_employee_band_label_mapping() -> None:
     assert employee_band_label("12") == "20-49"
     assert employee_band_label("NN") == "unknown"
     assert employee_band_label(None) is None
+
+
+def _record(siren: str, **kw: object) -> CompanyRecord:
+    base: dict[str, object] = {
+        "country": "FR",
+        "siren": siren,
+        "siret": None,
+        "name": siren,
+        "naf": None,
+        "creation_date": None,
+        "address": None,
+        "postal_code": None,
+        "commune": None,
+        "departement": None,
+        "region": None,
+        "employee_band": None,
+        "employee_band_year": None,
+        "is_employer": None,
+        "source": "test",
+    }
+    base.update(kw)
+    return CompanyRecord.model_validate(base)
+
+
+def test_score_features_combines_weighted_factors() -> None:
+    today = date(2025, 1, 1)
+    records = [
+        _record("1", creation_date=date(2024, 1, 1), naf="62.01Z", is_employer=True),
+        _record("2", creation_date=date(2010, 1, 1), naf="62.01Z", is_employer=True),
+        _record("3"),
+    ]
+    weights = ScoringWeights(
+        age=1.0, employee_band=0.0, employer=0.5, naf=2.0, growth=0.0,
+        max_age_years=10.0, naf_weights={"62.01Z": 1.0},
+    )
+    scores = score_features(ScoringFeatures.from_records(records, today=today), weights)
+
+    assert scores[0] > scores[1] > scores[2]
+    assert scores[1] == pytest.approx(2.5)  # too old for any age credit
+    assert scores[2] == 0.0  # unknown everything contributes nothing
+
+
+def test_growth_is_used_when_available() -> None:
+    records = [_record("1"), _record("2")]
+    features = ScoringFeatures.from_records(records, growth_by_siren={"2": 0.4})
+    scores = score_features(features, ScoringWeights(growth=1.0))
+    assert list(scores) == pytest.approx([0.0, 0.4])
+
+
+def test_top_k_returns_best_first_without_full_sort() -> None:
+    scores = np.array([0.1, 0.9, 0.5, 0.7, 0.3])
+    assert list(top_k(scores, 3)) == [1, 3, 2]
+    assert list(top_k(scores, 10)) == [1, 3, 2, 4, 0]
+    assert list(top_k(scores, 0)) == []
+
+
+def test_rank_records_uses_pack_weights() -> None:
+    records = [_record("a", naf="62.01Z"), _record("b", naf="58.29C")]
+    weights = get_query_pack("blossom_like_france").weights
+    ranked = rank_records(records, weights, k=1)
+    assert [r.siren for r, _ in ranked] == ["b"]
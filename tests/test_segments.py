@@ -0,0 +1,88 @@
+from collections import Counter
+
+import httpx
+import pytest
+
+from invest_registry.clients.france import FranceCompanySearchClient, FranceSearchParams
+from invest_registry.mock_api import MockRegistry
+from invest_registry.rate_limit import RateLimiter
+from invest_registry.segments import CountCache, market_map
+from invest_registry.settings import Settings
+from invest_registry.synthetic import synthetic_results
+
+_DIMENSIONS = {
+    "naf": ["62", "58.29C", "70.22Z", "01.11Z"],  # no company in 01.11Z
+    "departement": ["75", "69", "92"],
+    "tranche_effectif_salarie": ["00", "01", "11"],
+}
+
+
+@pytest.fixture
+def corpus() -> list[dict]:
+    return synthetic_results(2_000, seed=4, include_details=True)
+
+
+def _client(registry: MockRegistry) -> FranceCompanySearchClient:
+    return FranceCompanySearchClient(
+        app_settings=Settings(),
+        http=httpx.Client(base_url="https://mock", transport=registry.transport()),
+        rate_limiter=RateLimiter(10_000),
+    )
+
+
+def _naf_group(naf: str) -> str:
+    return "62" if naf.startswith("62") else naf
+
+
+def test_market_map_matches_the_corpus_and_skips_empty_values(corpus) -> None:
+    registry = MockRegistry(corpus)
+    with _client(registry) as client:
+        result = market_map(
+            client, _DIMENSIONS, base=FranceSearchParams(q="", etat_administratif="A")
+        )
+
+    expected = Counter(
+        (
+            _naf_group(r["activite_principale"]),
+            siege["departement"],
+            siege["tranche_effectif_salarie"],
+        )
+        for r in corpus
+        for siege in [r["siege"]]
+    )
+    assert len(result.cells) == 4 * 3 * 3
+    assert all(count == expected[values] for values, count in result.cells.items())
+    assert result.total == len(corpus)
+    assert result.marginals["naf"]["01.11Z"] == 0
+    # 1 total + 10 single values + the 27 cells without 01.11Z; 62 is a single code list.
+    assert result.pruned == 9
+    assert result.requests == registry.requests == 1 + 10 + 27
+    assert sum(result.pivot("departement", "naf")["75"].values()) == sum(
+        c for values, c in result.cells.items() if values[1] == "75"
+    )
+    first_row = {"naf": "62", "departement": "75", "tranche_effectif_salarie": "00"}
+    assert result.rows()[0] == {**first_row, "count": result.cells[("62", "75", "00")]}
+
+
+def test_counts_are_cached_across_runs(corpus, tmp_path) -> None:
+    registry = MockRegistry(corpus)
+    with _client(registry) as client:
+        first = market_map(client, _DIMENSIONS, cache=CountCache(tmp_path / "counts.json"))
+        requests = registry.requests
+        again = market_map(client, _DIMENSIONS, cache=CountCache(tmp_path / "counts.json"))
+
+    assert again.cells == first.cells
+    assert (again.requests, again.cached) == (0, requests)
+    assert registry.requests == requests
+
+
+def test_unknown_and_overlapping_dimension_values_are_rejected(corpus) -> None:
+    registry = MockRegistry(corpus)
+    with _client(registry) as client:
+        with pytest.raises(ValueError, match="region"):
+            market_map(client, {"region": ["11"]})
+        with pytest.raises(ValueError, match="62.5"):
+            market_map(client, {"naf": ["62.5"]})
+        with pytest.raises(ValueError, match="62 and 62.01Z overlap"):
+            market_map(client, {"naf": ["62", "58.29C", "62.01Z"]})
+    assert registry.requests == 0
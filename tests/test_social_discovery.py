@@ -1,5 +1,19 @@
+import multiprocessing
+import sys
+
+from invest_registry import social_discovery
+from invest_registry.models import FranceSearchResult
 from invest_registry.scoring import employee_band_label
-from invest_registry.social_discovery import google_search_url, linkedin_people_query, x_people_query
+from invest_registry.settings import Settings
+from invest_registry.social_discovery import (
+    QueryBudget,
+    SocialCandidate,
+    discover_founder_socials,
+    google_search_url,
+    linkedin_people_query,
+    normalize_query,
+    x_people_query,
+)
 
 
 def test_employee_band_label_returns_human_range() -> None:
@@ -23,3 +37,104 @@ def test_google_search_url_encodes_query() -> None:
     assert url.startswith("https://www.google.com/search?q=")
     assert "linkedin.com%2Fin" in url or "linkedin.com%2Fin" in url
 
+
+
+def _company(siren: str, *people: tuple[str, str]) -> FranceSearchResult:
+    return FranceSearchResult.model_validate(
+        {
+            "siren": siren,
+            "nom_raison_sociale": f"CO {siren}",
+            "dirigeants": [
+                {"type_dirigeant": "personne physique", "prenoms": first, "nom": last}
+                for first, last in people
+            ]
+            + [{"type_dirigeant": "personne morale", "denomination": "HOLDCO"}],
+        }
+    )
+
+
+def _fake_search(calls: list[str]):
+    def search(*, query, kind, app_settings, max_results, http):
+        calls.append(query)
+        return [SocialCandidate(title=query, url=f"https://example.com/{len(calls)}")]
+
+    return search
+
+
+def test_batch_discovery_caches_and_reports_savings(tmp_path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    calls: list[str] = []
+    monkeypatch.setattr(social_discovery, "search_candidates", _fake_search(calls))
+    app_settings = Settings(search_provider="serpapi", serpapi_api_key="k")
+    shortlist = [_company("1", ("Jane", "Doe"), ("John", "Roe")), _company("2", ("Ann", "Poe"))]
+
+    first = discover_founder_socials(shortlist, app_settings=app_settings)
+    assert first.queries_made == 6
+    assert len(first.candidates) == 6
+    assert len(calls) == 6
+
+    second = discover_founder_socials(shortlist, app_settings=app_settings)
+    assert second.queries_made == 0
+    assert second.cache_hits == 6
+    assert second.queries_saved == 6
+    assert len(calls) == 6
+
+
+def test_batch_discovery_stops_at_daily_budget(tmp_path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    calls: list[str] = []
+    monkeypatch.setattr(social_discovery, "search_candidates", _fake_search(calls))
+    app_settings = Settings(
+        search_provider="serpapi", serpapi_api_key="k", social_daily_query_budget=3
+    )
+
+    report = discover_founder_socials(
+        [_company("1", ("Jane", "Doe"), ("John", "Roe"), ("Ann", "Poe"))],
+        app_settings=app_settings,
+    )
+    assert report.queries_made == 3
+    assert report.skipped_over_budget == 3
+    assert len(calls) == 3
+    assert QueryBudget(3).remaining() == 0
+
+
+def test_normalize_query_ignores_case_and_spacing() -> None:
+    assert normalize_query('  "Jane  DOE" site:linkedin.com/in ') == '"jane doe" site:linkedin.com/in'
+
+
+def test_batch_discovery_counts_failed_queries_and_keeps_the_rest(tmp_path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    calls: list[str] = []
+    ok = _fake_search(calls)
+
+    def flaky(*, query, **kwargs):
+        if "Roe" in query:
+            raise RuntimeError("HTTP 502")
+        return ok(query=query, **kwargs)
+
+    monkeypatch.setattr(social_discovery, "search_candidates", flaky)
+    app_settings = Settings(search_provider="serpapi", serpapi_api_key="k")
+
+    report = discover_founder_socials(
+        [_company("1", ("Jane", "Doe"), ("John", "Roe"))], app_settings=app_settings
+    )
+    assert report.failed == 2
+    assert report.queries_made == 2
+    assert {fq.person_name for fq in report.candidates} == {"Jane Doe"}
+
+
+def _spend(root, attempts: int) -> None:
+    budget = QueryBudget(30, root=root)
+    sys.exit(sum(budget.try_spend() for _ in range(attempts)))
+
+
+def test_budget_is_not_overspent_by_concurrent_processes(tmp_path) -> None:
+    ctx = multiprocessing.get_context("spawn")
+    children = [ctx.Process(target=_spend, args=(tmp_path, 20)) for _ in range(3)]
+    for child in children:
+        child.start()
+    for child in children:
+        child.join()
+
+    assert sum(child.exitcode for child in children) == 30
+    assert QueryBudget(30, root=tmp_path).used() == 30
@@ -0,0 +1,48 @@
+import json
+
+from invest_registry.models import CompanyRecord
+from invest_registry.storage import (
+    cache_path,
+    iter_cached_records,
+    load_cached_records,
+    save_cached_records,
+)
+
+
+def _record(siren: str) -> CompanyRecord:
+    return CompanyRecord(
+        country="FR",
+        siren=siren,
+        siret=None,
+        name=siren,
+        naf=None,
+        creation_date=None,
+        address=None,
+        postal_code=None,
+        commune=None,
+        departement=None,
+        region=None,
+        employee_band=None,
+        employee_band_year=None,
+        is_employer=None,
+        source="test",
+    )
+
+
+def test_records_round_trip_through_ndjson_cache(tmp_path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    assert load_cached_records("k") is None
+
+    save_cached_records("k", iter([_record("1"), _record("2")]))
+    assert [r.siren for r in iter_cached_records("k")] == ["1", "2"]
+    assert len(cache_path("k").read_text(encoding="utf-8").splitlines()) == 2
+
+
+def test_legacy_json_cache_is_still_readable(tmp_path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    legacy = cache_path("old", suffix=".json")
+    legacy.write_text(json.dumps([_record("9").model_dump(mode="json")]), encoding="utf-8")
+
+    cached = load_cached_records("old")
+    assert cached is not None
+    assert [r.siren for r in cached] == ["9"]
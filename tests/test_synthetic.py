@@ -0,0 +1,16 @@
+from datetime import date
+
+from invest_registry.models import FranceSearchResponse
+from invest_registry.synthetic import synthetic_page, synthetic_results
+
+
+def test_synthetic_corpus_is_deterministic_and_pages_like_the_api() -> None:
+    today = date(2025, 1, 1)
+    corpus = synthetic_results(60, seed=3, today=today, include_details=True)
+    assert corpus == synthetic_results(60, seed=3, today=today, include_details=True)
+    assert len({r["siren"] for r in corpus}) == 60
+
+    resp = FranceSearchResponse.model_validate(synthetic_page(corpus, page=3, per_page=25))
+    assert (resp.total_pages, resp.total_results) == (3, 60)
+    assert [r.siren for r in resp.results] == [f"{i:09d}" for i in range(50, 60)]
+    assert resp.results[0].dirigeants and resp.results[0].finances
@@ -0,0 +1,159 @@
+import pytest
+
+from invest_registry.clients.france import FranceSearchParams
+from invest_registry.models import FranceSearchResponse
+from invest_registry.watchlist import (
+    DEFAULT_INTERVAL_SECONDS,
+    MIN_INTERVAL_SECONDS,
+    WATCH_INCLUDE,
+    Watchlist,
+)
+
+_DAY = 24 * 60 * 60
+
+
+def _company(siren: str) -> dict:
+    return {
+        "siren": siren,
+        "nom_raison_sociale": f"ACME {siren}",
+        "etat_administratif": "A",
+        "siege": {"tranche_effectif_salarie": "01", "caractere_employeur": "O"},
+        "dirigeants": [{"nom": "DOE", "prenoms": "Jane", "qualite": "Président"}],
+        "finances": {"2023": {"ca": 100_000, "resultat_net": 5_000}},
+    }
+
+
+class _FakeRegistry:
+    def __init__(self, sirens: list[str]) -> None:
+        self.companies = {s: _company(s) for s in sirens}
+        self.calls: list[FranceSearchParams] = []
+        self.failing: set[str] = set()
+
+    def search(
+        self, *, search: FranceSearchParams, page: int = 1, per_page: int = 25
+    ) -> FranceSearchResponse:
+        self.calls.append(search)
+        if search.q in self.failing:
+            raise RuntimeError("upstream 503")
+        found = [self.companies[search.q]] if search.q in self.companies else []
+        return FranceSearchResponse.model_validate(
+            {
+                "page": 1,
+                "per_page": per_page,
+                "total_pages": 1,
+                "total_results": len(found),
+                "results": found,
+            }
+        )
+
+
+@pytest.fixture
+def watchlist(tmp_path) -> Watchlist:
+    return Watchlist(tmp_path / "watchlist")
+
+
+def test_first_check_is_a_baseline_then_only_moved_fields_are_reported(watchlist, tmp_path) -> None:
+    registry = _FakeRegistry(["111111111", "222222222"])
+    assert watchlist.add(["111111111", "222222222", "not-a-siren"], now=0) == 2
+
+    baseline = watchlist.refresh(registry, now=0)  # type: ignore[arg-type]
+    assert (baseline.checked, baseline.changes) == (2, ())
+    assert {c.include for c in registry.calls} == {WATCH_INCLUDE}
+
+    acme = registry.companies["111111111"]
+    acme["dirigeants"].append({"nom": "ROE", "prenoms": "Max", "qualite": "Directeur général"})
+    acme["siege"]["tranche_effectif_salarie"] = "11"
+    acme["finances"]["2024"] = {"ca": 150_000}
+    acme["etat_administratif"] = "C"
+
+    report = watchlist.refresh(registry, now=2 * _DAY)  # type: ignore[arg-type]
+    assert (report.checked, report.changed) == (2, 1)
+    changes = {c.field: (c.before, c.after) for c in report.changes}
+    assert changes == {
+        "dirigeants": ([], ["ROE Max (Directeur général)"]),
+        "employee_band": ("01", "11"),
+        "etat_administratif": ("A", "C"),
+        "financial_years": ([], [2024]),
+    }
+
+    # The feed and the entries survive a restart.
+    reopened = Watchlist(tmp_path / "watchlist")
+    assert [c.field for c in reopened.iter_changes(siren="111111111")] == list(changes)
+    assert list(reopened.iter_changes(since=3 * _DAY)) == []
+    assert reopened.entries()[0].values["employee_band"] == "11"
+    assert reopened.recent_changes("111111111") == list(report.changes)
+    assert reopened.recent_changes("222222222") == []
+
+
+def test_intervals_adapt_and_due_entries_come_most_urgent_first(watchlist) -> None:
+    registry = _FakeRegistry(["111111111", "222222222", "333333333"])
+    watchlist.add(["111111111", "222222222"], now=0)
+    watchlist.add(["333333333"], priority=5.0, now=0)
+    assert next(e.siren for e in watchlist.due(now=0)) == "333333333"
+
+    watchlist.refresh(registry, now=0)  # type: ignore[arg-type]
+    assert watchlist.due(now=_DAY / 2) == []
+    registry.companies["222222222"]["siege"]["caractere_employeur"] = "N"
+
+    registry.calls.clear()
+    watchlist.refresh(registry, now=10 * _DAY)  # type: ignore[arg-type]
+    entries = {e.siren: e for e in watchlist.entries()}
+    assert entries["222222222"].interval_seconds == max(
+        MIN_INTERVAL_SECONDS, 1.5 * DEFAULT_INTERVAL_SECONDS / 2
+    )
+    assert entries["111111111"].interval_seconds == 1.5 * 1.5 * DEFAULT_INTERVAL_SECONDS
+    # The changing company is due again before the quiet ones.
+    assert watchlist.due(now=11 * _DAY + 1) == [entries["222222222"]]
+
+    registry.calls.clear()
+    watchlist.refresh(registry, limit=1, now=30 * _DAY)  # type: ignore[arg-type]
+    assert [c.q for c in registry.calls] == ["333333333"]
+
+
+def test_failures_and_unknown_sirens_do_not_stop_the_batch(watchlist) -> None:
+    registry = _FakeRegistry(["111111111"])
+    registry.failing.add("222222222")
+    watchlist.add(["111111111", "222222222", "999999999"], now=0)
+
+    report = watchlist.refresh(registry, batch_size=2, now=0)  # type: ignore[arg-type]
+
+    assert (report.checked, report.missing, report.failed) == (2, 1, 1)
+    assert [e.siren for e in watchlist.due(now=1)] == ["222222222"]
+
+
+def test_concurrent_writers_keep_each_others_changes(tmp_path) -> None:
+    registry = _FakeRegistry(["111111111", "222222222", "333333333"])
+    cli, page = Watchlist(tmp_path / "watchlist"), Watchlist(tmp_path / "watchlist")
+
+    cli.add(["111111111", "222222222"], now=0)
+    page.add(["333333333"], now=0)  # loaded before the CLI's additions
+    assert len(Watchlist(tmp_path / "watchlist")) == 3
+
+    page.remove(["222222222"])
+    cli.refresh(registry, now=0)  # type: ignore[arg-type]
+    watched = Watchlist(tmp_path / "watchlist")
+    assert sorted(e.siren for e in watched.entries()) == ["111111111", "333333333"]
+    assert all(e.checks == 1 for e in watched.entries())
+
+
+def test_overlapping_refreshes_record_each_check_once(tmp_path) -> None:
+    registry = _FakeRegistry(["111111111"])
+    first, second = Watchlist(tmp_path / "watchlist"), Watchlist(tmp_path / "watchlist")
+    first.add(["111111111"], now=0)
+    first.refresh(registry, now=0)  # type: ignore[arg-type]
+    registry.companies["111111111"]["siege"]["tranche_effectif_salarie"] = "11"
+
+    class _Overlapping:
+        """Runs `second`'s refresh while `first`'s request is in flight."""
+
+        def search(self, **kwargs) -> FranceSearchResponse:
+            second.refresh(registry, force=True, now=_DAY)  # type: ignore[arg-type]
+            return registry.search(**kwargs)
+
+    late = first.refresh(_Overlapping(), force=True, now=_DAY)  # type: ignore[arg-type]
+
+    assert (late.checked, late.changed, late.changes) == (1, 0, ())
+    assert [c.field for c in Watchlist(tmp_path / "watchlist").iter_changes()] == [
+        "employee_band"
+    ]
+    assert Watchlist(tmp_path / "watchlist").entries()[0].checks == 2